@@ -1,7 +1,6 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, PhotoImage, messagebox, simpledialog
 import ttkbootstrap as ttk
-import matplotlib.pyplot as plt
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.backends.backend_pdf import PdfPages
@@ -9,10 +8,14 @@ import numpy as np
 import sys
 import os
 import subprocess
+import multiprocessing
 import spm1d as spm
 import re
 import webbrowser
 import ToolboxFunctions as bf
+from ToolboxScheduler import JobScheduler
+import EventCompile
+from EventPickWindow import EventPickWindow, auto_pick_events, event_session_cube
 import ast
 import traceback
 from PIL import Image, ImageTk
@@ -20,7 +23,6 @@ from PIL import Image, ImageTk
 script_dir = os.path.dirname(os.path.abspath(__file__))
 os.chdir(script_dir)
 param_dir = None
-python_exe = sys.executable
 
 
 def open_program_docs():
@@ -307,7 +309,7 @@ def open_batch_tab():
         X = int(components[0])
         Y = int(components[1])
         Z = int(components[2])
-        batch_stop = bf.batch(
+        batch_args = (
             batch_in_entry.get(),
             batch_search_entry.get(),
             batch_out_entry.get(),
@@ -318,11 +320,19 @@ def open_batch_tab():
             Z,
             batch_normalized.get(),
         )
-        if batch_stop:
-            return
-        messagebox.showinfo(
-            "Batch Successful",
-            f"Data has been compiled here: {batch_out_entry.get()}",
+
+        def batch_done(batch_stop):
+            if batch_stop:
+                return
+            messagebox.showinfo(
+                "Batch Successful",
+                f"Data has been compiled here: {batch_args[2]}",
+            )
+
+        job_scheduler.submit(
+            "Batch",
+            lambda job: bf.batch(*batch_args, progress=job.progress),
+            on_done=batch_done,
         )
 
     def batch_in():
@@ -405,7 +415,11 @@ def open_normalize_tab():
             norm_out.set(out_direc)
 
     def toolbox_normalize():
-        bf.normalize(norm_in.get(), norm_out.get())
+        norm_args = (norm_in.get(), norm_out.get())
+        job_scheduler.submit(
+            "Normalize",
+            lambda job: bf.normalize(*norm_args, progress=job.progress),
+        )
 
     normalize_label.pack(fill="x", anchor="n", expand=True)
     normalize_frame = ttk.Frame(normalize_tab)
@@ -445,8 +459,6 @@ def open_quality_check_tab():
             qual_in.set(in_direc)
 
     def toolbox_quality_check():
-        nonlocal plots_out
-
         qual_check_in = qual_in.get()
         if not qual_in.get():
             messagebox.showerror(
@@ -478,14 +490,31 @@ def open_quality_check_tab():
                     icon="error",
                 )
                 return
-        for sub in range(0, len(quality_subject)):
-            plots_out += bf.quality_check(qual_check_in, int(quality_subject[sub]))
-        qual_plot_num = 0
         messagebox.showinfo(
             "Creating Plots",
-            "Please wait a moment while plots are created.\n\nYou can cycle through plots with Left and Right arrow keys.",
+            "Plots are being created in the background. Progress is shown at the bottom of the main window.\n\nYou can cycle through plots with Left and Right arrow keys.",
+        )
+
+        def run_quality_check(job):
+            figures = []
+            for sub in range(0, len(quality_subject)):
+                job.progress(
+                    sub,
+                    len(quality_subject),
+                    f"Plotting subject {int(quality_subject[sub]) + 1}",
+                )
+                figures += bf.quality_check(qual_check_in, int(quality_subject[sub]))
+            return figures
+
+        job_scheduler.submit(
+            "Quality Check", run_quality_check, on_done=show_quality_window
         )
 
+    def show_quality_window(figures):
+        nonlocal plots_out
+        plots_out += figures
+        qual_plot_num = 0
+
         def exit_qual(qual_window):
             qual_window.destroy()
 
@@ -607,7 +636,7 @@ def open_quality_check_tab():
 
 ##################### Event Pick Tab ######################
 def open_eventpick_tab():
-    global event_data_in, event_data_out, event_subject, event_condition, event_listbox
+    global event_data_in, event_data_out, event_subject, event_condition, event_count, event_listbox
     if check_tab_exists("Event Pick"):
         return
     eventpick_tab = ttk.Frame(main_tab)
@@ -619,7 +648,7 @@ def open_eventpick_tab():
     )
     eventpick_label.pack(fill="x", anchor="n", expand=True)
 
-    def toolbox_eventpick(event_data_in, event_data_out):
+    def check_event_inputs(event_data_in, event_data_out):
         if event_data_in == "" or event_data_out == "":
             tk.messagebox.showerror(
                 "Error", "Input and/or Output cannot be empty strings.", icon="error"
@@ -662,10 +691,29 @@ def open_eventpick_tab():
         stripped_vars = [
             re.sub(pattern, "", var) for var in flattened_vars
         ]  # applies regex pattern
+        if not event_count.get().isdigit() or int(event_count.get()) < 1:
+            tk.messagebox.showerror(
+                "Error", "Events per Trial must be a whole number of at least 1.", icon="error"
+            )
+            return
+        return var_bool_array, stripped_vars
+
+    def event_plot_titles(stripped_vars, trials):
+        return [
+            var.replace(" ", "_") if var[-1] in ["X", "Y", "Z"] else var
+            for var in stripped_vars
+            for _ in range(trials)
+        ]  # one title per plot, repeated for each trial
+
+    def toolbox_eventpick(event_data_in, event_data_out):
+        event_inputs = check_event_inputs(event_data_in, event_data_out)
+        if event_inputs is None:
+            return
+        var_bool_array, stripped_vars = event_inputs
         data_cube, file_vars, _, components = bf.batch_reshape(
             event_data_in
         )  # reshapes the input data
-        if int(event_subject.get()) > data_cube.shape[2]:
+        if not 1 <= int(event_subject.get()) <= data_cube.shape[2]:
             tk.messagebox.showerror(
                 "Error",
                 f"Subject {event_subject.get()} does not exist in the input data of subject count {data_cube.shape[2]}.",
@@ -673,68 +721,66 @@ def open_eventpick_tab():
             )
             return
         trials = int(data_cube.shape[1] / len(var_bool_array))  # number of trials
-        sub_titles = []  # list of subjects
-        var_titles = []  # list of variables
-
-        for var_idx in range(sum(var_bool_array)):  # for each variable selected
-            for trial_idx in range(trials):  # for each trial
-                sub_titles.append(
-                    f"S{int(event_subject.get())}C{int(event_condition.get())}T{trial_idx+1}"
-                )  # creates plot titles, such as "S1C1T1"
-                var_titles.append(
-                    f"{str(stripped_vars[var_idx])}"
-                )  # creates plot subtitles
-        data_to_plot = np.full(
-            (
-                data_cube.shape[0],
-                (sum(var_bool_array) * trials),
-                1,
-            ),
-            np.nan,
-        )  # creates an empty array to fill with data
-        var_bool_array = np.array(var_bool_array)  # converts list to array
-        var_count = sum(var_bool_array)
-        for i in range(trials):  # for each trial
-            start_col = i * len(
-                var_bool_array
-            )  # start column, based on amount of variables
-            end_col = (i + 1) * len(var_bool_array)  # end column
-            selected_columns = data_cube[
-                :, start_col:end_col, int(event_subject.get()) - 1
-            ][
-                :, var_bool_array.astype(bool), None
-            ]  # uses boolean mask to select columns
-            data_to_plot[:, i * var_count : (i + 1) * var_count] = (
-                selected_columns  # fills the empty array with the selected columns
+        var_titles = event_plot_titles(stripped_vars, trials)
+        EventPickWindow(
+            root,
+            event_session_cube(
+                data_cube, var_bool_array
+            ),  # every subject, loaded once and handed over in memory
+            event_subject.get(),
+            event_condition.get(),
+            trials,
+            var_titles,
+            event_data_out,
+            n_events=int(event_count.get()),
+        )
+
+    def toolbox_autopick(event_data_in, event_data_out):
+        event_inputs = check_event_inputs(event_data_in, event_data_out)
+        if event_inputs is None:
+            return
+        var_bool_array, stripped_vars = event_inputs
+        condition = event_condition.get()
+        n_events = int(event_count.get())
+        if not condition.isdigit():
+            tk.messagebox.showerror(
+                "Error", "Please enter ONE condition number.", icon="error"
             )
-        data_2d = data_to_plot.reshape(data_to_plot.shape[0], trials * var_count)
-        reordered_data = np.empty((data_to_plot.shape[0], var_count * trials))
-        for variable in range(var_count):
-            for trial in range(trials):
-                original_column_index = trial * var_count + variable
-                reordered_column_index = variable * trials + trial
-                reordered_data[:, reordered_column_index] = data_2d[
-                    :, original_column_index
-                ]
-        np.save("reordered_data.npy", reordered_data)
-        for i in range(
-            len(var_titles)
-        ):  # Loop to replace spaces with underscores for plot titles
-            if var_titles[i][-1] in ["X", "Y", "Z"]:
-                var_titles[i] = var_titles[i].replace(" ", "_")
-        var_titles_str = " ".join(var_titles)
-        subprocess.call(
-            [
-                python_exe,
-                "EventPickWindow.py",
-                event_subject.get(),
-                event_condition.get(),
-                "reordered_data.npy",
-                str(trials),
-                var_titles_str,
+            return
+        existing = [
+            file
+            for file in os.listdir(event_data_out)
+            if re.match(rf"^S\d+_C{condition}_Events\.npz$", file)
+        ]
+        if existing and not messagebox.askyesno(
+            "File Exists",
+            f"{len(existing)} event file(s) for condition {condition} already exist in {event_data_out}. Overwrite them?",
+            icon="question",
+        ):
+            return
+
+        def run_autopick(job):
+            data_cube, _, _, _ = bf.batch_reshape(event_data_in)
+            trials = int(data_cube.shape[1] / len(var_bool_array))
+            var_titles = event_plot_titles(stripped_vars, trials)
+            return auto_pick_events(
+                data_cube,
+                var_bool_array,
+                var_titles,
+                condition,
                 event_data_out,
-            ]
-        )
+                n_events=n_events,
+                progress=job.progress,
+            )
+
+        def autopick_done(review_rows):
+            review_path = os.path.join(event_data_out, f"C{condition}_Auto_Review.txt")
+            messagebox.showinfo(
+                "Auto Pick Complete",
+                f"Events for all subjects have been saved here: {event_data_out}\n\n{len(review_rows)} trial(s) had an unexpected number of peaks or troughs and should be reviewed. See:\n\t{review_path}",
+            )
+
+        job_scheduler.submit("Auto Pick", run_autopick, on_done=autopick_done)
 
     def raw_data_direc():
         in_direc = filedialog.askopenfilename(
@@ -816,11 +862,19 @@ def open_eventpick_tab():
     event_condition = create_label_entry(
         eventpick_frame, "Condition Number (enter ONE):", 10, "top"
     )
+    event_count = create_label_entry(
+        eventpick_frame, "Events per Trial:", 10, "top", default_val=3
+    )
     execute_function_button(
         eventpick_frame,
         "Pick Events",
         lambda: toolbox_eventpick(event_data_in.get(), event_data_out.get()),
     )
+    execute_function_button(
+        eventpick_frame,
+        "Auto Pick All Subjects",
+        lambda: toolbox_autopick(event_data_in.get(), event_data_out.get()),
+    )
 
 
 def entry_dbl_click(event):
@@ -837,7 +891,7 @@ def open_eventcompile_tab():
     main_tab.select(compile_tab)
     compile_label = tk.Label(
         compile_tab,
-        text="This function allows you to aggregate your picked events in table outputs.\n\nNOTE: This function requires you to set an input directory that contains only\nCSV Event Output files generated by the Biomechanics Toolbox.\n\nTwo files will be generated:\n\tOne containing averaged events with individual subject values for all conditions\n\tOne containing average events across all subjects for all conditions",
+        text="This function allows you to aggregate your picked events in table outputs.\n\nNOTE: This function requires you to set an input directory that contains only\nEvent Output files (S1_C1_Events.npz) generated by the Biomechanics Toolbox.\n\nTwo files will be generated:\n\tOne containing averaged events with individual subject values for all conditions\n\tOne containing average events across all subjects for all conditions",
     )
     compile_label.pack(fill="x", anchor="n", expand=False)
 
@@ -880,13 +934,57 @@ def open_eventcompile_tab():
             else:
                 return
 
-        subprocess.call(
-            [
-                python_exe,
-                "EventCompile.py",
-                compile_in.get(),
-                compile_out.get(),
-            ]
+        events_dir = compile_in.get()
+        output_dir = compile_out.get()
+        if not EventCompile.confirm_compile():
+            return
+
+        def run_compile(job):
+            job.progress(0, None, "Compiling events")
+            try:
+                return EventCompile.compile_event_tables(
+                    events_dir,
+                    on_mismatch=lambda file_name, ref_file: job.call_ui(
+                        EventCompile.ask_ignore_mismatch, file_name, ref_file, events_dir
+                    ),
+                    progress=job.progress,
+                )
+            except ValueError as e:
+                job.call_ui(messagebox.showerror, "Error", str(e))
+                return None
+
+        def compile_done(tables):
+            if tables is not None:
+                EventCompile.save_compiled_events(*tables, initialdir=output_dir)
+
+        job_scheduler.submit("Compile Events", run_compile, on_done=compile_done)
+
+    def toolbox_export_event_csvs(compile_in, compile_out):
+        if not os.path.exists(compile_in.get()):
+            messagebox.showerror(
+                "Directory Error",
+                f"No directory with the name '{compile_in.get()}' exists.",
+                icon="error",
+            )
+            return
+        if not os.path.exists(compile_out.get()):
+            result = messagebox.askyesno(
+                "Directory Error",
+                f"No directory with the name '{compile_out.get()}' exists. Create it?",
+                icon="question",
+            )
+            if result:
+                os.makedirs(compile_out.get())
+            else:
+                return
+        try:
+            file_paths = EventCompile.export_event_csvs(compile_in.get(), compile_out.get())
+        except (ValueError, PermissionError) as e:
+            messagebox.showerror("Export Failed", str(e))
+            return
+        messagebox.showinfo(
+            "Export Successful",
+            f"{len(file_paths)} event CSV file(s) have been saved here: {compile_out.get()}",
         )
 
     compile_frame = ttk.Frame(compile_tab)
@@ -900,6 +998,11 @@ def open_eventcompile_tab():
         "Compile Events",
         lambda: toolbox_compile_events(compile_in, compile_out),
     )
+    execute_function_button(
+        compile_frame,
+        "Export Event CSVs",
+        lambda: toolbox_export_event_csvs(compile_in, compile_out),
+    )
 
 
 ##################### Ensemble Tab ######################
@@ -1046,83 +1149,104 @@ def open_ensemble_tab():
                 )
                 if selected
             ]
-            norm_cube, _, _, _ = bf.batch_reshape(ensemble_in)
+        except ValueError as e:
+            tk.messagebox.showerror("Value Error", str(e))
+            return
+        mean_color = str(ens_mean_color.get())
+        std_color = str(ens_std_color.get())
+        y_line = y_line_var.get()
+        dpi = int(ensemble_dpi.get())
 
-            if norm_cube.ndim != 3:
-                raise ValueError(
-                    "Data input does not have 3 dimensions. Check the batch() function output."
-                )
-            are_floats = np.all(np.isfinite(norm_cube))  # Check for NaNs
-            if not are_floats:
-                raise ValueError(
-                    "Data input contains NaNs. Check the batch() function output."
-                )
-            if norm_cube.shape[0] != 101:
-                raise ValueError(
-                    "This data doesn't look normalized to 101 data points. Check the bbatch/normalize function output."
-                )
-            ensemble_means, ensemble_std = bf.process_cube(norm_cube, var_bool_array)
+        def run_ensemble(job):
+            try:
+                norm_cube, _, _, _ = bf.batch_reshape(ensemble_in)
 
-            if "ensemble_means" not in locals() or np.size(ensemble_means) == 0:
-                raise ValueError(
-                    "Ensemble_means is either not defined or has size 0. Check the bf.process_cube() function."
-                )
-            if "ensemble_std" not in locals() or np.size(ensemble_std) == 0:
-                raise ValueError(
-                    "Ensemble_std is either not defined or has size 0. Check the bf.process_cube() function."
+                if norm_cube.ndim != 3:
+                    raise ValueError(
+                        "Data input does not have 3 dimensions. Check the batch() function output."
+                    )
+                are_floats = np.all(np.isfinite(norm_cube))  # Check for NaNs
+                if not are_floats:
+                    raise ValueError(
+                        "Data input contains NaNs. Check the batch() function output."
+                    )
+                if norm_cube.shape[0] != 101:
+                    raise ValueError(
+                        "This data doesn't look normalized to 101 data points. Check the bbatch/normalize function output."
+                    )
+                ensemble_means, ensemble_std = bf.process_cube(
+                    norm_cube, var_bool_array
                 )
 
-            flattened_axes = [
-                item.strip() for sublist in axes for item in sublist.split(",")
-            ]
-            x_axes = flattened_axes[0::2]
-            y_axes = flattened_axes[1::2]
-            plots_out = []
-            for i in range(sum(var_bool_array)):
-                plots_out.append(
-                    bf.ensemble_plot(
-                        ensemble_means[:, i],
-                        ensemble_std[:, i],
-                        mean_color=str(ens_mean_color.get()),
-                        std_color=str(ens_std_color.get()),
-                        title=f"{selected_vars[i]}",
-                        xlabel=f"{x_axes[i]}",
-                        ylabel=f"{y_axes[i]}",
-                        legend_labels=["Mean", "Std Dev"],
-                        y_line=y_line_var.get(),
+                if "ensemble_means" not in locals() or np.size(ensemble_means) == 0:
+                    raise ValueError(
+                        "Ensemble_means is either not defined or has size 0. Check the bf.process_cube() function."
                     )
-                )
-            if plots_out == []:
-                raise ValueError(
-                    "Plots_out is empty. Check the bf.ensemble_plot() function."
-                )
-            for i, (fig, _) in enumerate(plots_out):
-                output_tiff_path = os.path.join(
-                    ensemble_out, f"{selected_vars[i]}.tiff"
-                )
-                if os.path.exists(output_tiff_path):
-                    response = messagebox.askyesno(
-                        "File Already Exists",
-                        f"The file {output_tiff_path} already exists. Do you want to overwrite it?",
-                        icon="question",
+                if "ensemble_std" not in locals() or np.size(ensemble_std) == 0:
+                    raise ValueError(
+                        "Ensemble_std is either not defined or has size 0. Check the bf.process_cube() function."
                     )
-                    if not response:
-                        continue
-                fig.set_size_inches(4.5, 3.5)
-                fig.savefig(
-                    output_tiff_path,
-                    format="tiff",
-                    dpi=int(ensemble_dpi.get()),
-                    bbox_inches="tight",
-                )
-                plt.close(fig)
+
+                flattened_axes = [
+                    item.strip() for sublist in axes for item in sublist.split(",")
+                ]
+                x_axes = flattened_axes[0::2]
+                y_axes = flattened_axes[1::2]
+                plots_out = []
+                for i in range(sum(var_bool_array)):
+                    job.progress(i, sum(var_bool_array), f"Plotting {selected_vars[i]}")
+                    plots_out.append(
+                        bf.ensemble_plot(
+                            ensemble_means[:, i],
+                            ensemble_std[:, i],
+                            mean_color=mean_color,
+                            std_color=std_color,
+                            title=f"{selected_vars[i]}",
+                            xlabel=f"{x_axes[i]}",
+                            ylabel=f"{y_axes[i]}",
+                            legend_labels=["Mean", "Std Dev"],
+                            y_line=y_line,
+                        )
+                    )
+                if plots_out == []:
+                    raise ValueError(
+                        "Plots_out is empty. Check the bf.ensemble_plot() function."
+                    )
+                for i, (fig, _) in enumerate(plots_out):
+                    job.progress(i, len(plots_out), f"Saving {selected_vars[i]}")
+                    output_tiff_path = os.path.join(
+                        ensemble_out, f"{selected_vars[i]}.tiff"
+                    )
+                    if os.path.exists(output_tiff_path):
+                        response = job.call_ui(
+                            messagebox.askyesno,
+                            "File Already Exists",
+                            f"The file {output_tiff_path} already exists. Do you want to overwrite it?",
+                            icon="question",
+                        )
+                        if not response:
+                            continue
+                    fig.set_size_inches(4.5, 3.5)
+                    fig.savefig(
+                        output_tiff_path,
+                        format="tiff",
+                        dpi=dpi,
+                        bbox_inches="tight",
+                    )
+            except ValueError as e:
+                job.call_ui(tk.messagebox.showerror, "Value Error", str(e))
+                return True
+            return False
+
+        def ensemble_done(ensemble_stop):
+            if ensemble_stop:
+                return
             messagebox.showinfo(
                 "Save Complete",
                 f"All ensemble plots have been saved here: {ensemble_out}",
             )
-        except ValueError as e:
-            tk.messagebox.showerror("Value Error", str(e))
-            return
+
+        job_scheduler.submit("Ensemble", run_ensemble, on_done=ensemble_done)
 
     label_frame = ttk.Frame(ensemble_tab)
     label_frame.pack(expand=1, side="top", anchor="n")
@@ -1236,7 +1360,7 @@ def open_ensemble_tab():
 
 ##################### SPM Tab ######################
 def open_spm_tab():
-    global selected_group, group_names, group_dropdown, test_dropdown, spm_x_label, spm_y_box
+    global selected_group, group_names, group_dropdown, test_dropdown, spm_x_label, spm_y_box, condition_dropdown, condition_names
     if check_tab_exists("SPM"):
         return
     spm_tab = ttk.Frame(main_tab)
@@ -1352,7 +1476,7 @@ def open_spm_tab():
 
     def on_group_selected(event):
         nonlocal options
-        global spm_y_box, entry_boxes, output_box, alpha, equal_var, two_tail, spm_dpi, spm_y_box, spm_x_label, g1_color, g2_color, g3_color
+        global spm_y_box, entry_boxes, output_box, alpha, equal_var, two_tail, spm_dpi, spm_y_box, spm_x_label, group_colors, group_names, condition_names, spm_tiff, spm_pdf, spm_png, spm_nonparam, spm_iterations, spm_seed, spm_vector
 
         def get_y_labels(entry):
             plot_y_labels = filedialog.askopenfilename(
@@ -1365,7 +1489,22 @@ def open_spm_tab():
                 return
             entry.set(plot_y_labels)
 
+        def update_test_options(*args):
+            test_options = bf.spm_test_options(
+                int(selected_group), selected_conditions, spm_vector.get()
+            )
+            if not test_options:
+                test_options = [
+                    "No vector-field tests for two-way designs!"
+                    if spm_vector.get() and selected_conditions > 1
+                    else "Two-way designs need 2+ groups!"
+                ]
+            test_dropdown["values"] = test_options
+            if test_dropdown.get() not in test_options:
+                test_dropdown.set(test_options[0])
+
         selected_group = group_dropdown.get()
+        selected_conditions = int(condition_dropdown.get())
 
         if options is not None:
             options.destroy()
@@ -1394,42 +1533,59 @@ def open_spm_tab():
         )
         spm_dpi = create_label_entry(
             parent=options,
-            label_text="TIFF DPI:",
+            label_text="DPI:",
             width=10,
             default_val=300,
             side="top",
         )
+        spm_tiff = create_checkbox(
+            parent=options, label_text="TIFF Plots", default_value=True
+        )
+        spm_pdf = create_checkbox(
+            parent=options, label_text="PDF Plots", default_value=True
+        )
+        spm_png = create_checkbox(
+            parent=options, label_text="PNG Plots", default_value=False
+        )
+        spm_nonparam = create_checkbox(
+            parent=options, label_text="Non-parametric", default_value=False
+        )
+        spm_iterations = create_label_entry(
+            parent=options,
+            label_text="Permutations:",
+            width=10,
+            default_val=10000,
+            side="top",
+        )
+        spm_seed = create_label_entry(
+            parent=options,
+            label_text="Random Seed:",
+            width=10,
+            default_val=0,
+            side="top",
+        )
+        spm_vector = create_checkbox(
+            parent=options, label_text="Vector Field (X/Y/Z)", default_value=False
+        )
+        spm_vector.trace_add("write", update_test_options)
 
-        if selected_group in {"1", "2", "3"}:
-            g1_label, g1_color = create_dropdown(
-                parent=options,
-                label_text="Group 1 Color:",
-                options=color_choices,
-            )
-            g1_color.set(color_choices[0])
-
-        if selected_group in {"2", "3"}:
-            g2_label, g2_color = create_dropdown(
-                parent=options,
-                label_text="Group 2 Color:",
-                options=color_choices,
-            )
-            g2_color.set(color_choices[1])
-
-        if selected_group == "3":
-            g3_label, g3_color = create_dropdown(
+        group_colors = []
+        for group_num in range(1, int(selected_group) + 1):
+            group_color_label, group_color = create_dropdown(
                 parent=options,
-                label_text="Group 3 Color:",
+                label_text=f"Group {group_num} Color:",
                 options=color_choices,
             )
-            g3_color.set(color_choices[2])
-            plot_x_label = create_label_entry(
-                parent=options,
-                label_text="Plot X Label:",
-                width=20,
-                default_val="Percent of 'X'",
-                side="top",
-            )
+            group_color.set(color_choices[(group_num - 1) % len(color_choices)])
+            group_colors.append(group_color)
+        plot_x_label = create_label_entry(
+            parent=options,
+            label_text="Plot X Label:",
+            width=20,
+            default_val="Percent of 'X'",
+            side="top",
+        )
+        spm_x_label = plot_x_label
         group_names = create_label_entry(
             parent=options,
             label_text="Group Names:",
@@ -1437,6 +1593,13 @@ def open_spm_tab():
             default_val="Control, Experimental",
             side="top",
         )
+        condition_names = create_label_entry(
+            parent=options,
+            label_text="Condition Names:",
+            width=20,
+            default_val="Pre, Post",
+            side="top",
+        )
         spm_y_box = create_label_entry(
             parent=options,
             label_text="Y-Label File",
@@ -1449,40 +1612,17 @@ def open_spm_tab():
         for widget in entry_frame.winfo_children():
             widget.destroy()
 
-        if selected_group == "1":
-            test_options = ["One-sample t test"]
-            entry_labels, entry_boxes, entry_buttons = create_entry_in(
-                entry_frame, ["Group 1 Data:"]
-            )
-            output_label, output_box, output_button = create_entry_out(
-                entry_frame, ["Output Directory:"]
-            )
-        elif selected_group == "2":
-            test_options = ["Paired t test", "Two-sample t test"]
-            entry_labels, entry_boxes, entry_buttons = create_entry_in(
-                entry_frame, ["Group 1 Data:", "Group 2 Data:"]
-            )
-            output_label, output_box, output_button = create_entry_out(
-                entry_frame, ["Output Directory:"]
-            )
-        elif selected_group == "3":
-            test_options = [
-                "One-way ANOVA",
-                "One-way Rep. Meas.",
-                "Two-way ANOVA",
-                "Two-way Rep. Meas.",
-            ]
-            entry_labels, entry_boxes, entry_buttons = create_entry_in(
-                entry_frame, ["Group 1 Data:", "Group 2 Data:", "Group 3 Data:"]
-            )
-            output_label, output_box, output_button = create_entry_out(
-                entry_frame, ["Output Directory:"]
-            )
-        else:
-            test_options = ["Select group(s) first!"]
-            entry_labels, entry_boxes, entry_buttons = create_entry_in(
-                entry_frame, ["Select group(s) first!"]
-            )
+        entry_labels, entry_boxes, entry_buttons = create_entry_in(
+            entry_frame,
+            [
+                f"{spm_batch_label(group_idx, condition_idx, selected_conditions)}:"
+                for group_idx in range(int(selected_group))
+                for condition_idx in range(selected_conditions)
+            ],
+        )
+        output_label, output_box, output_button = create_entry_out(
+            entry_frame, ["Output Directory:"]
+        )
         execute_function_button(
             entry_frame,
             "Perform Analysis",
@@ -1493,17 +1633,22 @@ def open_spm_tab():
                 equal_var,
                 two_tail,
                 spm_dpi,
-                g1_color,
-                g2_color,
+                group_colors,
                 plot_x_label,
                 group_names,
             ),
         )
+        execute_function_button(
+            entry_frame,
+            "Render From Results",
+            lambda: toolbox_spm_render(
+                spm_dpi, group_colors, plot_x_label, group_names
+            ),
+        )
         for button in entry_buttons:
             button.configure(bg="#228B22", cursor="hand2")
         output_button[0].configure(bg="#0047AB", cursor="hand2")
-        test_dropdown["values"] = test_options
-        test_dropdown.set(test_options[0])
+        update_test_options()
 
     def toolbox_spm(
         entry_boxes,
@@ -1512,32 +1657,129 @@ def open_spm_tab():
         equal_var,
         two_tail,
         dpi,
-        g1_color,
-        g2_color,
+        group_colors,
         plot_x_label,
         group_names,
     ):
-        bf.spm_analysis(
-            g1_in=entry_boxes[0].get(),
-            g2_in=entry_boxes[1].get(),
+        condition_count = int(condition_dropdown.get())
+        test_options = bf.spm_test_options(
+            len(entry_boxes) // condition_count, condition_count, spm_vector.get()
+        )
+        if test_dropdown.get() not in test_options:
+            messagebox.showerror(
+                "Error",
+                f"Select one of the available tests: {', '.join(test_options)}."
+                if test_options
+                else "No vector-field tests for two-way designs! Untick Vector Field to test each component."
+                if spm_vector.get() and condition_count > 1
+                else "No SPM test is available for this design. Two-way designs need 2+ groups.",
+            )
+            return
+        spm_kwargs = dict(
+            group_inputs=[entry_box.get() for entry_box in entry_boxes],
             output_path=output_box[0].get(),
             group_names=group_names.get(),
-            selected_group=group_dropdown.get(),
+            condition_count=condition_count,
+            condition_names=condition_names.get(),
             select_a_test=test_dropdown.get(),
             alpha=alpha.get(),
             equal_var=equal_var.get(),
             two_tail=two_tail.get(),
-            dpi=int(dpi.get()),
-            g1_color=g1_color.get(),
-            g2_color=g2_color.get(),
+            dpi=dpi.get(),
+            group_colors=[group_color.get() for group_color in group_colors],
             plot_x_label=plot_x_label.get(),
             plot_y_labels=spm_y_box.get(),
+            plot_formats=spm_plot_formats(),
+            nonparametric=spm_nonparam.get(),
+            iterations=spm_iterations.get(),
+            seed=spm_seed.get(),
+            vector_field=spm_vector.get(),
         )
+        job_scheduler.submit(
+            "SPM",
+            lambda job: bf.spm_analysis(**spm_kwargs, progress=job.progress),
+        )
+
+    def spm_plot_formats():
+        return tuple(
+            plot_format
+            for plot_format, checkbox in zip(
+                bf.SPM_PLOT_FORMATS, (spm_tiff, spm_pdf, spm_png)
+            )
+            if checkbox.get()
+        )
+
+    def toolbox_spm_render(dpi, group_colors, plot_x_label, group_names):
+        plot_formats = spm_plot_formats()
+        if not plot_formats:
+            messagebox.showerror(
+                "Error", "Select at least one plot format to render the results."
+            )
+            return
+        try:
+            if not 300 <= int(dpi.get()) <= 800:
+                raise ValueError
+        except ValueError:
+            messagebox.showerror("Value Error", "DPI value must be between 300 and 800.")
+            return
+        results_path = filedialog.askopenfilename(
+            title="Select SPM Results File",
+            multiple=False,
+            filetypes=(("SPM Results", "*.npz"),),
+            initialdir=output_box[0].get() if output_box[0].get() else ".",
+        )
+        if not results_path:
+            return
+        try:
+            var_titles = bf.load_spm_results(results_path)["var_titles"].tolist()
+        except ValueError as e:
+            messagebox.showerror("Value Error", str(e))
+            return
+        existing_plots = [
+            plot_path
+            for plot_path in bf.spm_plot_paths(
+                os.path.dirname(results_path), var_titles, plot_formats
+            )
+            if os.path.exists(plot_path)
+        ]
+        if existing_plots and not messagebox.askyesno(
+            "File Already Exists",
+            f"{len(existing_plots)} plot file(s) already exist, such as {os.path.basename(existing_plots[0])}. Do you want to overwrite them?",
+        ):
+            return
+        render_kwargs = dict(
+            dpi=int(dpi.get()),
+            group_colors=[color.get() for color in group_colors],
+            group_names=group_names.get(),
+            plot_x_label=plot_x_label.get(),
+            plot_y_labels=spm_y_box.get() if spm_y_box.get() else None,
+            plot_formats=plot_formats,
+            condition_names=condition_names.get(),
+        )
+
+        def run_render(job):
+            try:
+                return bf.spm_render(results_path, **render_kwargs, progress=job.progress)
+            except ValueError as e:
+                job.call_ui(messagebox.showerror, "Value Error", str(e))
+                return None
+
+        def render_done(output_dir):
+            if output_dir is not None:
+                messagebox.showinfo(
+                    "Save Complete", f"All plots have been saved here: {output_dir}"
+                )
+
+        job_scheduler.submit("SPM Render", run_render, on_done=render_done)
 
     spm_groups, group_dropdown = create_dropdown(
-        dropdown_frame, "Groups:", ["1", "2", "3"]
+        dropdown_frame, "Groups:", ["1", "2", "3", "4", "5", "6"]
     )
     group_dropdown.bind("<<ComboboxSelected>>", on_group_selected)
+    spm_conditions, condition_dropdown = create_dropdown(
+        dropdown_frame, "Conditions:", ["1", "2", "3", "4"]
+    )
+    condition_dropdown.bind("<<ComboboxSelected>>", on_group_selected)
     test_options, test_dropdown = create_dropdown(
         dropdown_frame, "Available Tests:", ["Select group(s) first!"]
     )
@@ -1639,6 +1881,7 @@ def save_eventpick():
         file.write(f"Output Directory: {event_data_out.get()}\n")
         file.write(f"Subject Number: {event_subject.get()}\n")
         file.write(f"Condition Number: {event_condition.get()}\n")
+        file.write(f"Events per Trial: {event_count.get()}\n")
         file.write(f"Selected Variables: {selected_var_names}\n")
     messagebox.showinfo("Save Successful", "EventPick tab parameters saved!")
 
@@ -1656,6 +1899,7 @@ def load_eventpick():
         "Output Directory": event_data_out,
         "Subject Number": event_subject,
         "Condition Number": event_condition,
+        "Events per Trial": event_count,
     }
 
     def event_listbox_gen(normalized_data, listbox):
@@ -2057,6 +2301,12 @@ def load_ensemble():
     messagebox.showinfo("Load Successful", "Ensemble parameters loaded!")
 
 
+def spm_batch_label(group_idx, condition_idx, condition_count):
+    if condition_count > 1:
+        return f"Group {group_idx + 1} Condition {condition_idx + 1} Data"
+    return f"Group {group_idx + 1} Data"
+
+
 def save_spm():
     global entry_boxes
     try:
@@ -2074,41 +2324,32 @@ def save_spm():
     )
     if not param_save:
         return
-    dropdowns = [g1_color, g2_color, g3_color]
-    print(f"Dropdowns: {dropdowns}")
+    condition_count = int(condition_dropdown.get())
     with open(param_save, "w") as file:
         file.write(f"SPM_Parameters\n")
         file.write(f"Groups: {group_dropdown.get()}\n")
+        file.write(f"Conditions: {condition_count}\n")
         file.write(f"Available Tests: {test_dropdown.get()}\n")
-        file.write(f"Group 1 Data: {entry_boxes[0].get()}\n")
-        (
-            file.write(f"Group 2 Data: {entry_boxes[1].get()}\n")
-            if len(entry_boxes) > 1
-            else None
-        )
-        (
-            file.write(f"Group 3 Data: {entry_boxes[2].get()}\n")
-            if len(entry_boxes) > 2
-            else None
-        )
+        for cell_idx, entry_box in enumerate(entry_boxes):
+            batch_label = spm_batch_label(*divmod(cell_idx, condition_count), condition_count)
+            file.write(f"{batch_label}: {entry_box.get()}\n")
         file.write(f"Output Directory: {output_box[0].get()}\n")
         file.write(f"Alpha: {alpha.get()}\n")
         file.write(f"Equal Var: {equal_var.get()}\n")
         file.write(f"Two Tail: {two_tail.get()}\n")
-        file.write(f"TIFF DPI: {spm_dpi.get()}\n")
-        file.write(f"Group 1 Color: {dropdowns[0][1].get()}\n")
-        (
-            file.write(f"Group 2 Color: {dropdowns[1][1].get()}\n")
-            if len(dropdowns) > 1
-            else None
-        )
-        (
-            file.write(f"Group 3 Color: {dropdowns[2][1].get()}\n")
-            if len(dropdowns) > 2
-            else None
-        )
+        file.write(f"DPI: {spm_dpi.get()}\n")
+        file.write(f"TIFF Plots: {spm_tiff.get()}\n")
+        file.write(f"PDF Plots: {spm_pdf.get()}\n")
+        file.write(f"PNG Plots: {spm_png.get()}\n")
+        file.write(f"Non-parametric: {spm_nonparam.get()}\n")
+        file.write(f"Permutations: {spm_iterations.get()}\n")
+        file.write(f"Random Seed: {spm_seed.get()}\n")
+        file.write(f"Vector Field: {spm_vector.get()}\n")
+        for group_num, group_color in enumerate(group_colors, start=1):
+            file.write(f"Group {group_num} Color: {group_color.get()}\n")
         file.write(f"Plot X Label: {spm_x_label.get()}\n")
         file.write(f"Group Names: {group_names.get()}\n")
+        file.write(f"Condition Names: {condition_names.get()}\n")
         file.write(f"Plot Y Labels: {spm_y_box.get()}")
     messagebox.showinfo("Save Successful", "SPM tab parameters saved!")
 
@@ -2131,22 +2372,22 @@ def load_spm():
     if not param_file:
         return
     entry_mapping = {
-        "Groups": group_dropdown,
         "Available Tests": test_dropdown,
-        "Group 1 Data": tk.StringVar(),
-        "Group 2 Data": tk.StringVar() if len(entry_boxes) > 1 else None,
-        "Group 3 Data": tk.StringVar() if len(entry_boxes) > 2 else None,
-        "Output Directory": tk.StringVar(),
         "Alpha": alpha,
         "Equal Var": equal_var,
         "Two Tail": two_tail,
-        "TIFF DPI": spm_dpi,
-        "Group 1 Color": tk.StringVar(),
-        "Group 2 Color": tk.StringVar() if len(entry_boxes) > 1 else None,
-        "Group 3 Color": tk.StringVar() if len(entry_boxes) > 2 else None,
+        "DPI": spm_dpi,
+        "TIFF DPI": spm_dpi,  # Name in files saved before PNG plots
+        "TIFF Plots": spm_tiff,
+        "PDF Plots": spm_pdf,
+        "PNG Plots": spm_png,
+        "Non-parametric": spm_nonparam,
+        "Permutations": spm_iterations,
+        "Random Seed": spm_seed,
+        "Vector Field": spm_vector,
         "Plot X Label": spm_x_label,
         "Group Names": group_names,
-        "Plot Y Labels": tk.StringVar(),
+        "Condition Names": condition_names,
     }
 
     with open(param_file, "r") as file:
@@ -2157,44 +2398,41 @@ def load_spm():
                 "First line does not match 'SPM_Parameters'. Make sure the correct type of parameter file was selected.",
             )
             return
+        params = {}
         for line in file:
-            line = line.strip()
-            params = line.split(": ")
-            param_name = params[0].strip()
-            param_value = params[1].strip()
+            param_name, _, param_value = line.rstrip("\n").partition(": ")
+            params[param_name.strip().rstrip(":")] = param_value.strip()
 
-            if param_name in entry_mapping:
-                index_str = re.search(r"\d+", param_name)
-                if index_str:
-                    index = int(index_str.group()) - 1
-
-                    if "Data" in param_name:
-                        try:
-                            entry_boxes[index].delete(0, tk.END)
-                            entry_boxes[index].insert(0, param_value)
-                        except IndexError:
-                            messagebox.showerror(
-                                "Error",
-                                "Group selected was fewer than specified in the parameters! Re-select group and try again.",
-                            )
-                            return
-                    elif "Color" in param_name:
-                        entry_boxes[index][1].delete(0, tk.END)
-                        entry_boxes[index][1].insert(0, param_value)
-                elif "Output" in param_name:
-                    output_box[0].delete(0, tk.END)
-                    output_box[0].insert(0, param_value)
-                elif "Y Labels" in param_name:
-                    spm_y_box.delete(0, tk.END)
-                    spm_y_box.insert(0, param_value)
-                else:
-                    entry_mapping[param_name].set(param_value)
-    if index_str != selected_group:
+    saved_groups = params.get("Groups", group_dropdown.get())
+    saved_conditions = params.get("Conditions", "1")  # Files from before conditions held one-way designs
+    if saved_groups != group_dropdown.get() or saved_conditions != condition_dropdown.get():
         messagebox.showerror(
             "Error",
-            "Group selected was larger than specified in the parameters! Re-select group and try again.",
+            f"The parameters are for {saved_groups} group(s) and {saved_conditions} condition(s)! Select those and try again.",
         )
         return
+    condition_count = int(saved_conditions)
+    batch_boxes = {
+        spm_batch_label(*divmod(cell_idx, condition_count), condition_count): entry_box
+        for cell_idx, entry_box in enumerate(entry_boxes)
+    }
+    for param_name, param_value in params.items():
+        color_match = re.fullmatch(r"Group (\d+) Color", param_name)
+        if param_name in batch_boxes:
+            batch_boxes[param_name].delete(0, tk.END)
+            batch_boxes[param_name].insert(0, param_value)
+        elif color_match:
+            group_idx = int(color_match.group(1)) - 1
+            if group_idx < len(group_colors):
+                group_colors[group_idx].set(param_value)
+        elif param_name == "Output Directory":
+            output_box[0].delete(0, tk.END)
+            output_box[0].insert(0, param_value)
+        elif param_name == "Plot Y Labels":
+            spm_y_box.delete(0, tk.END)
+            spm_y_box.insert(0, param_value)
+        elif param_name in entry_mapping:
+            entry_mapping[param_name].set(param_value)
     messagebox.showinfo("Load Successful", "SPM tab parameters loaded!")
 
 
@@ -2297,13 +2535,61 @@ def center_window(window, width, height):
 
 
 def main_close_confirm():
+    quit_message = "Are you sure you want to quit?"
+    if job_scheduler.active_jobs():
+        quit_message = "Background jobs are still running and will be stopped. Are you sure you want to quit?"
     if messagebox.askyesno(
         "Quit",
-        "Are you sure you want to quit?",
+        quit_message,
     ):
         root.destroy()
 
 
+##################### Background Jobs ######################
+def update_job_status(job):
+    if job.status == "Failed":
+        messagebox.showerror(f"{job.name} Failed", job.message)
+    running = job_scheduler.running_jobs()
+    queued = len(job_scheduler.active_jobs()) - len(running)
+    if not running:
+        job_status_label.config(
+            text=f"{queued} job(s) queued." if queued else "No jobs running."
+        )
+        job_progress.config(value=0)
+        return
+    current = running[0]
+    status_text = f"{current.name}: {current.message or 'Running'}"
+    if current.cancelled:
+        status_text = f"{current.name}: Cancelling..."
+    if queued:
+        status_text += f" ({queued} queued)"
+    job_status_label.config(text=status_text)
+    if current.total:
+        job_progress.config(value=100 * current.current / current.total)
+    else:
+        job_progress.config(value=0)
+
+
+def cancel_current_job():
+    running = job_scheduler.running_jobs()
+    if not running:
+        messagebox.showinfo("No Jobs Running", "No jobs are currently running.")
+        return
+    running[0].cancel()
+    update_job_status(running[0])
+
+
+def cancel_all_jobs():
+    if not job_scheduler.active_jobs():
+        messagebox.showinfo("No Jobs Running", "No jobs are currently running.")
+        return
+    result = messagebox.askyesno(
+        "Cancel Jobs", "Cancel all running and queued jobs?", icon="question"
+    )
+    if result:
+        job_scheduler.cancel_all()
+
+
 def open_github(event):
     webpage = "https://github.com/WaltMenke/BiomechanicsToolbox"
     answer = messagebox.askyesno(
@@ -2328,133 +2614,150 @@ def open_linkedin(event):
         return
 
 
-root = ttk.Window()
-root.title("Biomechanics Toolbox")
-root.pack_propagate(0)
-main_tab = ttk.Notebook(root)
-main_tab.pack(fill="both", expand=True)
-
-color_choices = [
-    "Black",
-    "Blue",
-    "Red",
-    "Green",
-    "Purple",
-    "Orange",
-    "Yellow",
-    "Cyan",
-    "Magenta",
-    "Grey",
-]
-
-center_window(root, 750, 800)
-root.iconbitmap("BT_Icon.ico")
-root.iconbitmap(default="BT_Icon.ico")
-
-file_menu_items = {
-    "Reset Tab Entries": lambda: reset_tab(main_tab.tab(main_tab.select(), "text")),
-    "Close Current Tab": lambda: close_current_tab(),
-    "Close All Tabs": lambda: return_to_main(main_tab),
-    "Restart": restart_program,
-    "Exit": exit_application,
-}
-
-parameter_menu_items = {
-    "Set Param Directory": lambda: set_param_dir(),
-    "Save Tab Params": lambda: handle_save_params(),
-    "Load Tab Params": lambda: handle_load_params(),
-}
-
-functions_menu_items = {
-    "Script Gen": open_scriptgen_tab,
-    "EMG": open_emg_tab,
-    "Batch": open_batch_tab,
-    "Normalize": open_normalize_tab,
-    "Quality Check": open_quality_check_tab,
-    "Event Pick": open_eventpick_tab,
-    "Event Compile": open_eventcompile_tab,
-    "Ensemble": open_ensemble_tab,
-    "SPM": open_spm_tab,
-}
-
-help_menu_items = {"Toolbox Documentation": open_program_docs}
-
-menubar = ttk.Menu(master=root)
-menus = {
-    "Options": file_menu_items,
-    "Parameters": parameter_menu_items,
-    "Functions": functions_menu_items,
-    "Help": help_menu_items,
-}
-
-for menu_label, menu_items in menus.items():
-    menu = ttk.Menu(menubar)
-    add_menu_items(menu, menu_items)
-    menubar.add_cascade(label=menu_label, menu=menu)
-root.config(menu=menubar)
-
-label_configurations = [
-    (
-        "Biomechanics Toolbox\n                v1.0.0",
-        ("Helvetica", 14, "bold"),
-        "#A52A2A",
-        35,
-    ),
-    (
-        "  This program was developed to facilitate a more efficient workflow for\n\tbiomechanics data processing and presentation.",
-        ("Helvetica", 10),
-        None,
-        5,
-    ),
-    (
-        "    1. Script and Model Generation\n    2. EMG Processing\n    3. Batch Processing\n    4. Normalization\n    5. Data Quality Checks\n    6. Event Picking\n    7. Event Compiling\n    8. Ensemble Curves\n    9. SPM Analysis",
-        ("Helvetica", 10),
-        None,
-        5,
-    ),
-    (
-        "\tThe full list of required packages and their versions can be found\n\tin the documentation or installed using the following command:\n\n\t\t   pip install -r ToolboxRequirements.txt\n\n  If you're lost- press the Help button in the ribbon to access the documentation!",
-        ("Helvetica", 10),
-        None,
-        5,
-    ),
-    (
-        "",
-        ("Helvetica", 10),
-        None,
-        5,
-    ),
-]
-
-for text, font, foreground, pady in label_configurations:
-    label = ttk.Label(main_tab, text=text, font=font, foreground=foreground)
-    label.pack(padx=5, pady=pady, anchor="n")
-
-linkedin_label = tk.Label(
-    main_tab,
-    text="Contact me on LinkedIn",
-    font=("Helvetica", 10, "underline"),
-    cursor="hand2",
-)
-linkedin_label.pack(side="bottom", pady=2)
-linkedin_label.bind("<Button-1>", open_linkedin)
-
-github_label = tk.Label(
-    main_tab,
-    text="Check out this project on GitHub",
-    font=("Helvetica", 10, "underline"),
-    cursor="hand2",
-)
-github_label.pack(side="bottom", pady=2)
-github_label.bind("<Button-1>", open_github)
-
-
-author_label = ttk.Label(
-    root,
-    text="\t          © Copyright 2023-2025, Walter Menke\nCreated in Python v3.12.2 on Windows 11 in Visual Studio Code v1.84.2.",
-    font=("Helvetica", 8),
-)
-author_label.pack(padx=5, pady=2, anchor="s")
-root.protocol("WM_DELETE_WINDOW", main_close_confirm)
-
-root.mainloop()
+if __name__ == "__main__":  # Worker processes import this module without opening the GUI
+    multiprocessing.freeze_support()
+    root = ttk.Window()
+    root.title("Biomechanics Toolbox")
+    root.pack_propagate(0)
+    main_tab = ttk.Notebook(root)
+    main_tab.pack(fill="both", expand=True)
+
+    color_choices = [
+        "Black",
+        "Blue",
+        "Red",
+        "Green",
+        "Purple",
+        "Orange",
+        "Yellow",
+        "Cyan",
+        "Magenta",
+        "Grey",
+    ]
+
+    center_window(root, 750, 800)
+    root.iconbitmap("BT_Icon.ico")
+    root.iconbitmap(default="BT_Icon.ico")
+
+    file_menu_items = {
+        "Reset Tab Entries": lambda: reset_tab(main_tab.tab(main_tab.select(), "text")),
+        "Close Current Tab": lambda: close_current_tab(),
+        "Close All Tabs": lambda: return_to_main(main_tab),
+        "Cancel All Jobs": lambda: cancel_all_jobs(),
+        "Restart": restart_program,
+        "Exit": exit_application,
+    }
+
+    parameter_menu_items = {
+        "Set Param Directory": lambda: set_param_dir(),
+        "Save Tab Params": lambda: handle_save_params(),
+        "Load Tab Params": lambda: handle_load_params(),
+    }
+
+    functions_menu_items = {
+        "Script Gen": open_scriptgen_tab,
+        "EMG": open_emg_tab,
+        "Batch": open_batch_tab,
+        "Normalize": open_normalize_tab,
+        "Quality Check": open_quality_check_tab,
+        "Event Pick": open_eventpick_tab,
+        "Event Compile": open_eventcompile_tab,
+        "Ensemble": open_ensemble_tab,
+        "SPM": open_spm_tab,
+    }
+
+    help_menu_items = {"Toolbox Documentation": open_program_docs}
+
+    menubar = ttk.Menu(master=root)
+    menus = {
+        "Options": file_menu_items,
+        "Parameters": parameter_menu_items,
+        "Functions": functions_menu_items,
+        "Help": help_menu_items,
+    }
+
+    for menu_label, menu_items in menus.items():
+        menu = ttk.Menu(menubar)
+        add_menu_items(menu, menu_items)
+        menubar.add_cascade(label=menu_label, menu=menu)
+    root.config(menu=menubar)
+
+    label_configurations = [
+        (
+            "Biomechanics Toolbox\n                v1.0.0",
+            ("Helvetica", 14, "bold"),
+            "#A52A2A",
+            35,
+        ),
+        (
+            "  This program was developed to facilitate a more efficient workflow for\n\tbiomechanics data processing and presentation.",
+            ("Helvetica", 10),
+            None,
+            5,
+        ),
+        (
+            "    1. Script and Model Generation\n    2. EMG Processing\n    3. Batch Processing\n    4. Normalization\n    5. Data Quality Checks\n    6. Event Picking\n    7. Event Compiling\n    8. Ensemble Curves\n    9. SPM Analysis",
+            ("Helvetica", 10),
+            None,
+            5,
+        ),
+        (
+            "\tThe full list of required packages and their versions can be found\n\tin the documentation or installed using the following command:\n\n\t\t   pip install -r ToolboxRequirements.txt\n\n  If you're lost- press the Help button in the ribbon to access the documentation!",
+            ("Helvetica", 10),
+            None,
+            5,
+        ),
+        (
+            "",
+            ("Helvetica", 10),
+            None,
+            5,
+        ),
+    ]
+
+    for text, font, foreground, pady in label_configurations:
+        label = ttk.Label(main_tab, text=text, font=font, foreground=foreground)
+        label.pack(padx=5, pady=pady, anchor="n")
+
+    linkedin_label = tk.Label(
+        main_tab,
+        text="Contact me on LinkedIn",
+        font=("Helvetica", 10, "underline"),
+        cursor="hand2",
+    )
+    linkedin_label.pack(side="bottom", pady=2)
+    linkedin_label.bind("<Button-1>", open_linkedin)
+
+    github_label = tk.Label(
+        main_tab,
+        text="Check out this project on GitHub",
+        font=("Helvetica", 10, "underline"),
+        cursor="hand2",
+    )
+    github_label.pack(side="bottom", pady=2)
+    github_label.bind("<Button-1>", open_github)
+
+
+    job_frame = ttk.Frame(root)
+    job_frame.pack(fill="x", padx=5, pady=2)
+    job_status_label = ttk.Label(job_frame, text="No jobs running.", font=("Helvetica", 8))
+    job_status_label.pack(side="left")
+    job_cancel_button = ttk.Button(
+        job_frame, text="Cancel", command=cancel_current_job, cursor="hand2"
+    )
+    job_cancel_button.pack(side="right")
+    job_progress = ttk.Progressbar(job_frame, mode="determinate", maximum=100, length=200)
+    job_progress.pack(side="right", padx=5)
+    # One worker runs jobs in submission order so their dialogs never interleave. Tkinter is not thread-safe, so
+    # dialogs raised inside a job go through job.call_ui (or ToolboxScheduler.call_ui) to the main thread.
+    job_scheduler = JobScheduler(root, workers=1, on_update=update_job_status)
+
+    author_label = ttk.Label(
+        root,
+        text="\t          © Copyright 2023-2025, Walter Menke\nCreated in Python v3.12.2 on Windows 11 in Visual Studio Code v1.84.2.",
+        font=("Helvetica", 8),
+    )
+    author_label.pack(padx=5, pady=2, anchor="s")
+    root.protocol("WM_DELETE_WINDOW", main_close_confirm)
+
+    root.mainloop()
@@ -5,15 +5,52 @@ import re
 import csv
 import ast
 import sys
+import hashlib
+import zipfile
 from openpyxl import Workbook, load_workbook
 from collections import OrderedDict
 import tkinter as tk
 from tkinter import ttk, filedialog, PhotoImage, messagebox, simpledialog
 import ttkbootstrap as ttk
 
-
-def list_csv_files(directory):
-    csv_files = [file for file in os.listdir(directory) if file.endswith(".csv")]
+import ToolboxFunctions as bf
+from EventPickWindow import event_block_rows, export_event_csv, load_event_file
+
+
+EVENT_FILE_PATTERN = r"^S\d{1,2}_C\d{1,2}_(Events\.npz|(Maxima|Minima)\.csv)$"  # Ensures naming structure is like 'S1_C1_Events.npz'
+EVENT_FILE_SUFFIXES = ("Maxima", "Minima")  # Order of EVENT_KINDS
+COMPILE_CACHE_NAME = "Events_Compile.cache"  # Kept next to the event files, not .npz/.csv so list_event_files skips it
+COMPILE_CACHE_FORMAT = "EVENTCOMPILE_CACHE"
+COMPILE_CACHE_VERSION = 1
+SPSS_TABLE_NAMES = ("Events_Long.csv", "Events_Wide.csv")  # Written by write_spss_tables, skipped by list_event_files
+SPSS_MISSING_VALUE = -999  # Written for missing events in the SPSS tables; declare it under MISSING VALUES in SPSS
+
+
+def list_event_files(directory):
+    """Event files of a directory in subject then condition order.
+
+    S{n}_C{m}_Events.npz files are the saved sessions. Maxima/Minima CSVs are read too, for folders saved before the
+    binary format, but are skipped for any session that also has an .npz since they are then just its export. The SPSS
+    tables a compile writes are skipped too, so the events folder can also be the output folder.
+    """
+    event_files = [
+        file
+        for file in os.listdir(directory)
+        if file.endswith((".npz", ".csv")) and file not in SPSS_TABLE_NAMES
+    ]
+    for file_name in event_files:
+        if not re.match(EVENT_FILE_PATTERN, file_name):
+            raise ValueError(
+                f"File {file_name} does not match the required naming structure."
+            )
+    saved_sessions = {
+        file_name[: -len("_Events.npz")] for file_name in event_files if file_name.endswith(".npz")
+    }
+    csv_files = [
+        file_name
+        for file_name in event_files
+        if file_name.endswith(".npz") or file_name.rsplit("_", 1)[0] not in saved_sessions
+    ]
     csv_files.sort(
         key=lambda x: [
             int(num) if num.isdigit() else num
@@ -31,378 +68,575 @@ def extract_condition_number(file_name):
     return file_name.split("_")[1][1:]  # Extracts the number after 'C'
 
 
-def replace_nan(value):
-    if np.isnan(value):
-        return "NaN"
-    else:
-        return value
-
-
-def generate_value_rows(variable_names):
-    value_rows = []
-    variable_count = len(variable_names)
-    for _ in range(3):
-        for variable in variable_names:
-            for event in events:
-                value_rows.append([variable, "Value", event])
-    return value_rows[: variable_count * 3]
-
-
-# Function to generate row names for Index
-def generate_index_rows(variable_names):
-    index_rows = []
-    variable_count = len(variable_names)
-    for _ in range(3):
-        for variable in variable_names:
-            for event in events:
-                index_rows.append([variable, "Index", event])
-    return index_rows[: variable_count * 3]
-
-
-def generate_per_loc_rows(variable_names):
-    per_loc_rows = []
-    variable_count = len(variable_names)
-    for _ in range(3):
-        for variable in variable_names:
-            for event in events:
-                per_loc_rows.append([variable, "Per_Loc", event])
-    return per_loc_rows[: variable_count * 3]
-
-
-# Subprocess inputs from main window
-root = ttk.Window()
-root.withdraw()
-root.iconbitmap("BT_Icon.ico")
-root.iconbitmap(default="BT_Icon.ico")
-
-try:
-    compile_in = sys.argv[1]
-except IndexError:
-    print(
-        "Error: This script isn't expected to run directly, please run BiomechanicsToolbox.py instead."
+def read_event_file(file_path):
+    """Reads an event CSV in one pass, header and every NEXT_MATRIX block.
+
+    Returns the plot variable titles and the numeric rows stacked as (value, index and percent blocks) x trials.
+    """
+    with open(file_path, "r", newline="") as csv_file:
+        lines = csv_file.read().splitlines()
+    variable_line = next(csv.reader(lines[2:3]))
+    var_titles = [
+        title for entry in variable_line if entry for title in ast.literal_eval(entry)
+    ]  # The titles line is the repr of a Python list
+    rows = [
+        line
+        for line in lines[4:]
+        if line.strip(", ") and line.split(",", 1)[0].strip() != "NEXT_MATRIX"
+    ]  # Skips the name, metadata label, variable titles and first NEXT_MATRIX lines. Excel saves the markers padded
+    # with commas, as in NEXT_MATRIX,,,,
+    return var_titles, np.loadtxt(rows, delimiter=",", ndmin=2)
+
+
+def summarize_event_files(file_paths):
+    """Runs in a worker process: one read per file gives its plot variable titles and the row statistics of each kind
+    of event it holds, as (var_titles, {"Maxima": stats, "Minima": stats}). A CSV holds only one of the two kinds."""
+    summaries = []
+    for file_path in file_paths:
+        if file_path.endswith(".npz"):
+            _, records, var_titles = load_event_file(file_path)
+            kind_stats = {
+                suffix: row_stats(event_block_rows(kind_records))
+                for suffix, kind_records in zip(EVENT_FILE_SUFFIXES, records)
+            }
+        else:
+            var_titles, event_rows = read_event_file(file_path)
+            suffix = "Maxima" if "Maxima" in os.path.basename(file_path) else "Minima"
+            kind_stats = {suffix: row_stats(event_rows)}
+        summaries.append((var_titles, kind_stats))
+    return summaries
+
+
+def row_stats(event_rows):
+    """Mean and population standard deviation of every row as rows x 2. Rows with any NaN give NaN for both."""
+    return np.column_stack((event_rows.mean(axis=1), event_rows.std(axis=1)))
+
+
+def individual_table(max_stats, min_stats, subjects, variable_names, num_events):
+    """Builds one condition's Events_Individual sheet as a DataFrame.
+
+    Stats arrive file by file, one block of Type x Variable x Event rows per subject. A single index permutation
+    reorders them so that each Type/Variable/Event row lists every subject in turn.
+    """
+    clean_vars = [
+        variable.replace("Right_", "").replace("Left_", "") for variable in variable_names
+    ]
+    types = np.repeat(["Value", "Index", "Per_Loc"], len(clean_vars) * num_events)
+    variables = np.tile(np.repeat(clean_vars, num_events), 3)
+    numbers = np.tile(
+        [f"Event {event_idx}" for event_idx in range(1, num_events + 1)],
+        3 * len(clean_vars),
     )
-    messagebox.showerror(
-        "Error",
-        "This script isn't expected to run directly, please run BiomechanicsToolbox.py instead.",
+    rows_per_sub = len(types)
+    block_rows = np.repeat(np.arange(rows_per_sub), len(subjects))
+    subject_idx = np.tile(np.arange(len(subjects)), rows_per_sub)
+    stats = np.full((len(subjects) * rows_per_sub, 4), np.nan)
+    stats[: len(max_stats), :2] = max_stats[: len(stats)]
+    stats[: len(min_stats), 2:] = min_stats[: len(stats)]
+    stats = stats[subject_idx * rows_per_sub + block_rows]
+    return pd.DataFrame(
+        {
+            "SUBJECT": np.asarray(subjects, dtype=object)[subject_idx],
+            "VARIABLE": variables[block_rows],
+            "TYPE": types[block_rows],
+            "NUMBER": numbers[block_rows],
+            "Maxima Avg": stats[:, 0],
+            "Maxima Stdev": stats[:, 1],
+            "Minima Avg": stats[:, 2],
+            "Minima Stdev": stats[:, 3],
+        }
     )
-    sys.exit()
-compile_out = sys.argv[2]
-
-result = messagebox.askyesno(
-    "Compile",
-    "Before compiling, are you sure the input directory only contains properly named CSV Event Output files?\n\nNaming schema should follow:\n'S1_C1_Maxima.csv', 'S1_C1_Minima.csv', etc.",
-    icon="question",
-)
-if not result:
-    messagebox.showinfo("Compile Canceled", "Compile operation canceled.")
-    sys.exit()
-
-num_entries = None
-
-maxima_stats_by_condition = {}
-minima_stats_by_condition = {}
-
-reorg_max = {}
-reorg_min = {}
-
-maxima_averages = {}
-maxima_std_devs = {}
-minima_averages = {}
-minima_std_devs = {}
-
-events = ["Event 1", "Event 2", "Event 3"]
-
-headers = [
-    "SUBJECT",
-    "VARIABLE",
-    "TYPE",
-    "NUMBER",
-    "Maxima Avg",
-    "Maxima Stdev",
-    "Minima Avg",
-    "Minima Stdev",
-]
-
-pattern = r"^S\d{1,2}_C\d{1,2}_(Maxima|Minima)\.csv$"  # Ensures naming structure is like 'S1_C1_Maxima.csv'
-relevant_files = list_csv_files(compile_in)
-for file_name in relevant_files:
-    if not re.match(pattern, file_name):
-        messagebox.showerror(
-            "Error",
-            f"File {file_name} does not match the required naming structure.",
+
+
+def synthesized_table(individual_df):
+    """Across-subject mean and sample standard deviation of the averages in every Variable/Type/Event row group.
+
+    Variables whose names coincide once Right_/Left_ is stripped stay separate groups, one per original variable.
+    Output is ordered by Type (Value, Index, Per_Loc), then Variable, then Event.
+    """
+    occurrence = individual_df.groupby(
+        ["VARIABLE", "TYPE", "NUMBER", "SUBJECT"], sort=False
+    ).cumcount()
+    synthesized = (
+        individual_df.assign(OCCURRENCE=occurrence)
+        .groupby(["VARIABLE", "TYPE", "NUMBER", "OCCURRENCE"])
+        .agg(
+            **{
+                "Maxima Avg": ("Maxima Avg", "mean"),
+                "Maxima Stdev": ("Maxima Avg", "std"),
+                "Minima Avg": ("Minima Avg", "mean"),
+                "Minima Stdev": ("Minima Avg", "std"),
+            }
         )
-        sys.exit()
-else:
-    pass
-
-ref_file = relevant_files[0]
-cond_ref = ref_file.split("_")[1][1:]
-
-present_conditions = [cond_ref]
-for file in relevant_files:
-    current_cond = file.split("_")[1][1:]
-    if cond_ref != current_cond and current_cond not in present_conditions:
-        present_conditions.append(current_cond)
-
-sub_count = []
-for file in relevant_files:
-    subject = extract_subject_number(file)
-    if subject not in sub_count:
-        sub_count.append(subject)
-files_by_condition = {cond: [] for cond in present_conditions}
-
-
-for file in relevant_files:  # Splits up files by Condition number
-    condition_number = extract_condition_number(file)
-    files_by_condition[condition_number].append(file)
-
-
-for condition, files in files_by_condition.items():
-    if num_entries is None:
-        num_entries = len(files)
-    else:
-        if len(files) != num_entries:
-            messagebox.showerror(
-                "Warning",
-                f"Number of entries in condition {condition} differs from others. Check the file inputs in {compile_in} and try again.",
+        .reset_index()
+    )
+    type_order = {"Value": 0, "Index": 1, "Per_Loc": 2}
+    synthesized["TYPE_ORDER"] = synthesized["TYPE"].map(type_order)
+    synthesized["EVENT_ORDER"] = (
+        synthesized["NUMBER"].str.slice(len("Event ")).astype(int)
+    )  # "Event 10" must follow "Event 9", not "Event 1"
+    synthesized = synthesized.sort_values(
+        by=["TYPE_ORDER", "VARIABLE", "EVENT_ORDER"], kind="stable"
+    )
+    return synthesized.drop(columns=["OCCURRENCE", "TYPE_ORDER", "EVENT_ORDER"])
+
+
+def long_event_table(individual_sheets):
+    """Stacks the Events_Individual tables of every condition into one tidy table for SPSS.
+
+    One row per Subject x Condition x Variable x Event x Type x Extremum (Maxima/Minima) holding the trial MEAN and
+    STDEV, ordered by subject then condition. Subjects, conditions and events are numeric. Variables whose names
+    coincide once Right_/Left_ is stripped get a _2, _3, ... suffix in file order so every row stays distinct.
+    """
+    condition_tables = []
+    for sheet_name, sheet_df in individual_sheets.items():
+        for extremum in ("Maxima", "Minima"):
+            condition_tables.append(
+                pd.DataFrame(
+                    {
+                        "SUBJECT": sheet_df["SUBJECT"].astype(int).to_numpy(),
+                        "CONDITION": int(sheet_name[1:]),
+                        "VARIABLE": sheet_df["VARIABLE"].to_numpy(),
+                        "EVENT": sheet_df["NUMBER"].str.slice(len("Event ")).astype(int).to_numpy(),
+                        "TYPE": sheet_df["TYPE"].to_numpy(),
+                        "EXTREMUM": extremum,
+                        "MEAN": sheet_df[f"{extremum} Avg"].to_numpy(),
+                        "STDEV": sheet_df[f"{extremum} Stdev"].to_numpy(),
+                    }
+                )
+            )
+    long_df = pd.concat(condition_tables, ignore_index=True)
+    occurrence = long_df.groupby(
+        ["SUBJECT", "CONDITION", "VARIABLE", "EVENT", "TYPE", "EXTREMUM"], sort=False
+    ).cumcount()
+    long_df["VARIABLE"] = long_df["VARIABLE"].where(
+        occurrence == 0, long_df["VARIABLE"] + "_" + (occurrence + 1).astype(str)
+    )
+    return long_df.sort_values(["SUBJECT", "CONDITION"], kind="stable", ignore_index=True)
+
+
+def wide_event_table(long_df):
+    """Pivots a long_event_table to one row per subject with one MEAN column per condition, variable, event, type and
+    extremum, named like C1_Knee_X_Max_Value_E1 so they are valid SPSS variable names.
+    """
+    columns = (
+        "C"
+        + long_df["CONDITION"].astype(str)
+        + "_"
+        + long_df["VARIABLE"].str.replace(r"\W", "_", regex=True)
+        + "_"
+        + long_df["EXTREMUM"].str.slice(0, 3)
+        + "_"
+        + long_df["TYPE"]
+        + "_E"
+        + long_df["EVENT"].astype(str)
+    )
+    wide_df = long_df.assign(COLUMN=columns).pivot(
+        index="SUBJECT", columns="COLUMN", values="MEAN"
+    )
+    return wide_df[pd.unique(columns)].reset_index().rename_axis(columns=None)
+
+
+def write_spss_tables(output_dir, individual_sheets, missing_value=SPSS_MISSING_VALUE):
+    """Writes Events_Long.csv and Events_Wide.csv (see long_event_table and wide_event_table) with missing events as
+    missing_value. Each table goes out in one bulk CSV write. Returns both paths."""
+    long_df = long_event_table(individual_sheets)
+    file_paths = []
+    for table, file_name in zip((long_df, wide_event_table(long_df)), SPSS_TABLE_NAMES):
+        file_path = os.path.join(output_dir, file_name)
+        table.to_csv(file_path, index=False, na_rep=str(missing_value))
+        file_paths.append(file_path)
+    return file_paths
+
+
+def write_streaming_workbook(savepath, sheets, nan_value=None):
+    """Writes DataFrames to an .xlsx in one write-only pass, one sheet per entry of sheets. NaN cells become nan_value."""
+    workbook = Workbook(write_only=True)
+    for sheet_name, sheet_df in sheets.items():
+        sheet = workbook.create_sheet(title=sheet_name)
+        sheet.append(list(sheet_df.columns))
+        for row in sheet_df.itertuples(index=False):
+            sheet.append(
+                [nan_value if isinstance(value, float) and np.isnan(value) else value for value in row]
             )
-            sys.exit()
-else:
-    pass
-
-for condition, files in files_by_condition.items():
-    maxima_count = sum(1 for file in files if "Maxima" in file)
-    minima_count = sum(1 for file in files if "Minima" in file)
-    if maxima_count != minima_count:
-        messagebox.showerror(
-            "Warning",
-            f"Number of 'Maxima' files does not match number of 'Minima' files in condition {condition}. Check the file inputs in {compile_in} and try again.",
+    workbook.save(savepath)
+    workbook.close()
+
+
+def group_event_files(compile_in):
+    """Lists the event files of a directory and checks that every condition has matching Maxima/Minima events.
+
+    Returns the files grouped by condition number and the subject numbers present, in subject order.
+    Raises ValueError describing the first problem found.
+    """
+    relevant_files = list_event_files(compile_in)
+    if not relevant_files:
+        raise ValueError(f"No event files were found in {compile_in}.")
+
+    files_by_condition = {}
+    sub_count = []
+    for file_name in relevant_files:  # Splits up files by Condition number
+        files_by_condition.setdefault(extract_condition_number(file_name), []).append(
+            file_name
         )
-        sys.exit()
-    else:
-        pass
-
-all_var_reference = []
-for condition, files in files_by_condition.items():
-    reference_third_line = None
-    for file_name in files:
-        file_path = os.path.join(compile_in, file_name)
-        prefix = file_name.split(".")[0]
-        with open(file_path, "r", newline="") as csv_file:
-            csv_reader = csv.reader(csv_file)
-            first_line_str = "".join(prefix)
-            prefix_without_extension = prefix.split(".")[0]
-            if not first_line_str == prefix_without_extension:
-                messagebox.showerror(
-                    "Warning",
-                    f"File {file_name} does not match expected naming structure. Check the file inputs in {compile_in} and try again.",
+        subject = extract_subject_number(file_name)
+        if subject not in sub_count:
+            sub_count.append(subject)
+
+    num_entries = None
+    for condition, files in files_by_condition.items():
+        session_count = sum(1 for file in files if file.endswith(".npz"))  # Each holds both kinds
+        entries = len(files) + session_count
+        if num_entries is None:
+            num_entries = entries
+        elif entries != num_entries:
+            raise ValueError(
+                f"Number of entries in condition {condition} differs from others. Check the file inputs in {compile_in} and try again."
+            )
+        maxima_count = session_count + sum(1 for file in files if "Maxima" in file)
+        minima_count = session_count + sum(1 for file in files if "Minima" in file)
+        if maxima_count != minima_count:
+            raise ValueError(
+                f"Number of 'Maxima' files does not match number of 'Minima' files in condition {condition}. Check the file inputs in {compile_in} and try again."
+            )
+    return files_by_condition, sub_count
+
+
+def file_digest(file_path):
+    digest = hashlib.sha1()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_compile_cache(cache_path):
+    """Returns the per-file summaries saved by the last compile of a directory, or {} if there are none usable.
+
+    The cache is an .npz archive read without pickle, so an unreadable, foreign or outdated file is just a cache miss.
+    """
+    try:
+        with np.load(cache_path, allow_pickle=False) as cache:
+            if str(cache["format"]) != COMPILE_CACHE_FORMAT or int(cache["version"]) != COMPILE_CACHE_VERSION:
+                return {}
+            title_offsets = cache["title_offsets"]
+            titles = cache["titles"].tolist()
+            kind_stats = [
+                (suffix, cache[f"has_{suffix}"], cache[f"{suffix}_offsets"], cache[f"{suffix}_stats"])
+                for suffix in EVENT_FILE_SUFFIXES
+            ]
+            return {
+                file_path: {
+                    "size": int(size),
+                    "mtime": int(mtime),
+                    "sha1": str(sha1),
+                    "summary": (
+                        titles[title_offsets[file_idx] : title_offsets[file_idx + 1]],
+                        {
+                            suffix: stats[offsets[file_idx] : offsets[file_idx + 1]]
+                            for suffix, has_kind, offsets, stats in kind_stats
+                            if has_kind[file_idx]
+                        },
+                    ),
+                }
+                for file_idx, (file_path, size, mtime, sha1) in enumerate(
+                    zip(cache["paths"].tolist(), cache["sizes"], cache["mtimes"], cache["sha1"])
                 )
-                sys.exit()
-            next(csv_reader)
-            next(csv_reader)
-            third_line = next(csv_reader)
-            ignore_mismatch = False
+            }
+    except (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile):
+        return {}
+
+
+def save_compile_cache(cache_path, entries):
+    """Writes the per-file summaries of a compile to an .npz archive: the fingerprint of every file, its titles packed
+    into "titles" split at "title_offsets" and its Maxima/Minima row statistics packed the same way."""
+    summaries = [entry["summary"] for entry in entries.values()]
+    kind_arrays = {}
+    for suffix in EVENT_FILE_SUFFIXES:
+        kind_stats = [kind_stats.get(suffix, np.empty((0, 2))) for _, kind_stats in summaries]
+        kind_arrays[f"has_{suffix}"] = np.array([suffix in kind_stats for _, kind_stats in summaries], dtype=bool)
+        kind_arrays[f"{suffix}_offsets"] = np.concatenate([[0], np.cumsum([len(stats) for stats in kind_stats], dtype=int)])
+        kind_arrays[f"{suffix}_stats"] = np.concatenate(kind_stats or [np.empty((0, 2))])
+    temp_path = cache_path + ".tmp"
+    try:
+        with open(temp_path, "wb") as f:  # np.savez would append .npz to a path it did not open itself
+            np.savez(
+                f,
+                format=COMPILE_CACHE_FORMAT,
+                version=COMPILE_CACHE_VERSION,
+                paths=np.asarray(list(entries), dtype=str),
+                sizes=np.array([entry["size"] for entry in entries.values()], dtype=np.int64),
+                mtimes=np.array([entry["mtime"] for entry in entries.values()], dtype=np.int64),
+                sha1=np.asarray([entry["sha1"] for entry in entries.values()], dtype=str),
+                titles=np.asarray([title for titles, _ in summaries for title in titles], dtype=str),
+                title_offsets=np.concatenate([[0], np.cumsum([len(titles) for titles, _ in summaries], dtype=int)]),
+                **kind_arrays,
+            )
+        os.replace(temp_path, cache_path)  # A compile interrupted mid-write leaves the old cache intact
+    except OSError:
+        pass  # Read-only event folders just compile without a cache
+
+
+def cached_summaries(compile_in, file_names, entries):
+    """Splits file_names into summaries still valid in the cache entries and files that need parsing.
+
+    Entries are keyed by absolute path and hold the file size, mtime and SHA-1 alongside its summary. A matching size
+    and mtime is trusted as is; otherwise the file is hashed, so a file that was only touched or copied is not re-parsed.
+    Returns (summaries by file name, stale file names, fingerprints by file name).
+    """
+    summaries = {}
+    stale = []
+    fingerprints = {}
+    for file_name in file_names:
+        file_path = os.path.abspath(os.path.join(compile_in, file_name))
+        stat = os.stat(file_path)
+        entry = entries.get(file_path)
+        fingerprint = {"size": stat.st_size, "mtime": stat.st_mtime_ns}
+        if entry is not None and entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime_ns:
+            fingerprint["sha1"] = entry["sha1"]
+            summaries[file_name] = entry["summary"]
+        else:
+            fingerprint["sha1"] = file_digest(file_path)
+            if entry is not None and entry["size"] == stat.st_size and entry["sha1"] == fingerprint["sha1"]:
+                summaries[file_name] = entry["summary"]
+            else:
+                stale.append(file_name)
+        fingerprints[file_name] = fingerprint
+    return summaries, stale, fingerprints
+
+
+def check_variable_names(compile_in, files_by_condition, variable_lines, on_mismatch=None):
+    """Checks the plot variable titles of every event file and returns the variable names, in file order.
+
+    variable_lines maps file name -> titles. When a file's titles differ from the first file of its condition,
+    on_mismatch(file_name, ref_file) decides whether to carry on (True) or stop (False). Without on_mismatch a
+    difference raises ValueError.
+    """
+    for condition, files in files_by_condition.items():
+        reference_third_line = None
+        for file_name in files:
+            third_line = variable_lines[file_name]
             if reference_third_line is None:
                 ref_file = file_name
                 reference_third_line = third_line
-                all_var_reference.append(reference_third_line)
-            else:
-                if third_line != reference_third_line and not ignore_mismatch:
-                    result = messagebox.askokcancel(
-                        "Warning!",
-                        f"Third line of data in file {file_name} is different relative to expected from {ref_file}. Check the file inputs in {compile_in}. It is possible the CSV files do not have identical variable counts.\n\nYou may select 'Ok' to ignore this warning or 'Cancel' to terminate the operation.",
-                    )
-                    if not result:
-                        sys.exit()
-                    else:
-                        ignore_mismatch = True
-
-
-lists = [ast.literal_eval(entry) for entry in reference_third_line if entry]
-flat_entries = [item for sublist in lists for item in sublist]
-variable_names = list(OrderedDict.fromkeys(flat_entries))
-
-for condition, files in files_by_condition.items():
-    maxima_stats = []
-    minima_stats = []
-
-    for file_name in files:
-        file_path = os.path.join(compile_in, file_name)
-        file_type = "Maxima" if "Maxima" in file_name else "Minima"
-
-        with open(file_path, "r", newline="") as csv_file:
-            csv_reader = csv.reader(csv_file)
-            next(csv_reader)
-
-            for row in csv_reader:
-                try:
-                    row = [float(value) if value != "nan" else np.nan for value in row]
-
-                    if not any(np.isnan(row)):
-                        row_avg = np.nanmean(row)
-                        row_std = np.nanstd(row)
-                    else:
-                        row_avg = np.nan
-                        row_std = np.nan
-
-                    if file_type == "Maxima":
-                        maxima_stats.append((row_avg, row_std))
-                    else:
-                        minima_stats.append((row_avg, row_std))
-                except ValueError:  # Catches non-numeric rows
-                    continue
-
-    maxima_stats_by_condition[condition] = maxima_stats
-    minima_stats_by_condition[condition] = minima_stats
-
-workbook = Workbook()
-num_events = 3
-rows_per_sub = 3 * 3 * len(variable_names)
-for condition, max_data in maxima_stats_by_condition.items():
-    sheet = workbook.create_sheet(title="C" + str(condition))
-    sheet.append(headers)
-    row_idx = 2
-
-    for data_label, data_matrix, start_col in [
-        ("maxima", max_data, 5),
-        ("minima", minima_stats_by_condition[condition], 7),
-    ]:
-        for i, row_data in enumerate(data_matrix, start=row_idx):
-            for j, value in enumerate(row_data, start=start_col):
-                sheet.cell(row=i, column=j).value = replace_nan(value)
-
-    all_subject_data = []
-    for subject in sub_count:
-        subject_data = []
-        for data_type in ["Value", "Index", "Per_Loc"]:
-            for variable in variable_names:
-                clean_var = variable.replace("Right_", "").replace("Left_", "")
-                for event_idx in range(1, num_events + 1):
-                    subject_data.append(
-                        [subject, clean_var, data_type, f"Event {event_idx}"]
+            elif third_line != reference_third_line:
+                if on_mismatch is None or not on_mismatch(file_name, ref_file):
+                    raise ValueError(
+                        f"Third line of data in file {file_name} is different relative to expected from {ref_file}. Check the file inputs in {compile_in}. It is possible the CSV files do not have identical variable counts."
                     )
-        all_subject_data.extend(subject_data)
 
-    rows_to_copy = []
-    for row in range(2, sheet.max_row + 1):
-        row_data = [
-            sheet.cell(row=row, column=col).value
-            for col in range(1, sheet.max_column + 1)
+    return list(OrderedDict.fromkeys(reference_third_line))
+
+
+def compile_event_tables(compile_in, on_mismatch=None, workers=None, progress=None, use_cache=True):
+    """Compiles a directory of S{n}_C{m}_Events.npz (or older Maxima/Minima CSV) event files into summary tables.
+
+    Returns two dicts of sheet name ("C1", "C2", ...) -> DataFrame: the Events_Individual tables with every
+    subject's average and standard deviation per event, and the Events_Synthesized tables averaged across
+    subjects. See check_variable_names for on_mismatch. Raises ValueError when the inputs are inconsistent.
+    Files are read once each, in chunks spread over worker processes (see ToolboxFunctions.parallel_map)
+    when there are enough of them to be worth it; workers=1 keeps everything in this process.
+    With use_cache, the summaries are saved to COMPILE_CACHE_NAME in compile_in and only files that changed since the
+    last compile are read again (see cached_summaries).
+    """
+    files_by_condition, sub_count = group_event_files(compile_in)
+    file_names = [file_name for files in files_by_condition.values() for file_name in files]
+    cache_path = os.path.join(compile_in, COMPILE_CACHE_NAME)
+    entries = load_compile_cache(cache_path) if use_cache else {}
+    summaries, stale, fingerprints = cached_summaries(compile_in, file_names, entries)
+
+    if stale:
+        if workers is None:
+            workers = min(os.cpu_count() or 1, len(stale) // 16)
+        workers = max(1, workers)
+        chunk_size = -(-len(stale) // workers)
+        chunks = [
+            [os.path.join(compile_in, file_name) for file_name in stale[start : start + chunk_size]]
+            for start in range(0, len(stale), chunk_size)
         ]
-        rows_to_copy.append(row_data)
-
-    for row in range(2, sheet.max_row + 1):
-        for col in range(1, sheet.max_column + 1):
-            sheet.cell(row=row, column=col).value = None
-
-    for i in range(rows_per_sub):
-        for subject_idx in range(len(sub_count)):
-            old_idx = subject_idx * rows_per_sub + i
-            new_row = (
-                i * len(sub_count) + subject_idx + 2
-            )  # +2 because row 1 is headers
-
-            if old_idx < len(all_subject_data):
-                for col_idx, value in enumerate(all_subject_data[old_idx], start=1):
-                    sheet.cell(row=new_row, column=col_idx).value = value
-
-            if old_idx < len(rows_to_copy):
-                row_data = rows_to_copy[old_idx]
-                for col_idx in range(
-                    5, len(row_data) + 1
-                ):  # Start from column 5 (data columns)
-                    sheet.cell(row=new_row, column=col_idx).value = row_data[
-                        col_idx - 1
-                    ]
-
-
-workbook.remove(workbook.active)
-savepath = filedialog.asksaveasfilename(
-    defaultextension=".xlsx",
-    filetypes=[("Excel files", "*.xlsx")],
-    initialfile="Events_Individual.xlsx",
-)
-if savepath:
-    workbook.save(filename=savepath)
-else:
-    messagebox.showinfo(
-        "Save Error", "Save operation canceled by user. Returning to main window."
+        chunk_summaries = bf.parallel_map(
+            summarize_event_files,
+            chunks,
+            workers=workers,
+            progress=progress,
+            message=f"Reading {len(stale)} of {len(file_names)} event files",
+        )
+        summaries.update(
+            zip(stale, (summary for chunk in chunk_summaries for summary in chunk))
+        )  # Keyed by file name, so the tables below keep list_event_files order however the chunks finished
+    if use_cache:
+        fresh_entries = {
+            os.path.abspath(os.path.join(compile_in, file_name)): dict(
+                fingerprints[file_name], summary=summaries[file_name]
+            )
+            for file_name in file_names
+        }  # Files no longer in the folder drop out of the cache
+        fingerprint_keys = ("size", "mtime", "sha1")
+        if fresh_entries.keys() != entries.keys() or any(
+            [entry[key] for key in fingerprint_keys] != [entries[path][key] for key in fingerprint_keys]
+            for path, entry in fresh_entries.items()
+        ):
+            save_compile_cache(cache_path, fresh_entries)
+    variable_names = check_variable_names(
+        compile_in,
+        files_by_condition,
+        {file_name: summary[0] for file_name, summary in summaries.items()},
+        on_mismatch,
     )
-    sys.exit()
-workbook.close()
-
-
-sheets = pd.read_excel(savepath, sheet_name=None)
-output_sheets = {}
-type_order = {"Value": 0, "Index": 1, "Per_Loc": 2}
-for sheet_name, df in sheets.items():
-    results = []
-    # Iterate over unique combinations of VARIABLE, TYPE, and NUMBER
-    for variable in sorted(df["VARIABLE"].unique()):  # Sort VARIABLE alphabetically
-        clean_var = variable.replace("Right_", "").replace("Left_", "")
-        for event in sorted(df["NUMBER"].unique()):  # Sort events numerically
-            for data_type in ["Value", "Index", "Per_Loc"]:
-                filtered = df[
-                    (df["VARIABLE"] == clean_var)
-                    & (df["TYPE"] == data_type)
-                    & (df["NUMBER"] == event)
-                ]
-                for i in range(0, len(filtered), len(sub_count)):
-                    chunk = filtered.iloc[i : i + len(sub_count)]
-                    maxima_avg = chunk["Maxima Avg"].mean(skipna=True)
-                    maxima_stdev = chunk["Maxima Avg"].std(skipna=True)
-                    minima_avg = chunk["Minima Avg"].mean(skipna=True)
-                    minima_stdev = chunk["Minima Avg"].std(skipna=True)
-
-                    # Replace empty or NaN values
-                    result_dict = {
-                        "VARIABLE": clean_var,
-                        "TYPE": data_type,
-                        "NUMBER": event,
-                        "Maxima Avg": np.nan if pd.isna(maxima_avg) else maxima_avg,
-                        "Maxima Stdev": (
-                            np.nan if pd.isna(maxima_stdev) else maxima_stdev
-                        ),
-                        "Minima Avg": np.nan if pd.isna(minima_avg) else minima_avg,
-                        "Minima Stdev": (
-                            np.nan if pd.isna(minima_stdev) else minima_stdev
-                        ),
-                    }
-                    results.append(result_dict)
 
-    processed_df = pd.DataFrame(results)
+    maxima_stats_by_condition = {}
+    minima_stats_by_condition = {}
+    num_events = None
+    for condition, files in files_by_condition.items():
+        maxima_stats = []
+        minima_stats = []
+
+        for file_name in files:
+            for suffix, file_stats in summaries[file_name][1].items():
+                if suffix == "Maxima":
+                    maxima_stats.append(file_stats)
+                else:
+                    minima_stats.append(file_stats)
+
+                # Each kind holds 3 matrices (value, index, percent) of one row per event per variable
+                file_rows = len(file_stats)
+                file_events, leftover = divmod(file_rows, 3 * len(variable_names))
+                if leftover or file_events == 0 or file_events != (num_events or file_events):
+                    raise ValueError(
+                        f"File {file_name} does not hold the same number of events per trial as the other files. Check the file inputs in {compile_in} and try again."
+                    )
+                num_events = file_events
+
+        maxima_stats_by_condition[condition] = np.concatenate(maxima_stats)
+        minima_stats_by_condition[condition] = np.concatenate(minima_stats)
+
+    individual_sheets = {
+        "C" + str(condition): individual_table(
+            max_data,
+            minima_stats_by_condition[condition],
+            sub_count,
+            variable_names,
+            num_events,
+        )
+        for condition, max_data in maxima_stats_by_condition.items()
+    }
+    synthesized_sheets = {
+        sheet_name: synthesized_table(sheet_df)  # From the same in-memory tables, no re-read of the workbook
+        for sheet_name, sheet_df in individual_sheets.items()
+    }
+    return individual_sheets, synthesized_sheets
+
+
+def compile_events(compile_in, compile_out=None, on_mismatch=None, workers=None, use_cache=True):
+    """Compiles an events directory and, when compile_out is given, writes Events_Individual.xlsx,
+    Events_Synthesized.xlsx and the SPSS tables there. Returns the same tables as compile_event_tables."""
+    individual_sheets, synthesized_sheets = compile_event_tables(
+        compile_in, on_mismatch, workers, use_cache=use_cache
+    )
+    if compile_out is not None:
+        write_streaming_workbook(
+            os.path.join(compile_out, "Events_Individual.xlsx"),
+            individual_sheets,
+            nan_value="NaN",
+        )
+        write_streaming_workbook(
+            os.path.join(compile_out, "Events_Synthesized.xlsx"), synthesized_sheets
+        )
+        write_spss_tables(compile_out, individual_sheets)
+    return individual_sheets, synthesized_sheets
+
 
-    # Fill any remaining NaN values
-    processed_df = processed_df.fillna(value=np.nan)
+def export_event_csvs(events_dir, output_dir=None):
+    """Exports every S{n}_C{m}_Events.npz file of events_dir as its Maxima/Minima CSV pair. Returns the CSV paths."""
+    file_paths = []
+    for file_name in list_event_files(events_dir):
+        if file_name.endswith(".npz"):
+            file_paths.extend(
+                export_event_csv(os.path.join(events_dir, file_name), output_dir)
+            )
+    return file_paths
 
-    # Sort by TYPE (custom order), then by VARIABLE (alphabetically), and finally by NUMBER
-    processed_df["TYPE"] = processed_df["TYPE"].map(type_order)
-    processed_df = processed_df.sort_values(by=["TYPE", "VARIABLE", "NUMBER"])
 
-    # Convert back the TYPE from numerical values to the original categorical order
-    processed_df["TYPE"] = processed_df["TYPE"].map(
-        {v: k for k, v in type_order.items()}
+def confirm_compile(parent=None):
+    result = messagebox.askyesno(
+        "Compile",
+        "Before compiling, are you sure the input directory only contains properly named Event Output files?\n\nNaming schema should follow:\n'S1_C1_Events.npz', 'S2_C1_Events.npz', etc.\n(or 'S1_C1_Maxima.csv', 'S1_C1_Minima.csv' from older versions)",
+        icon="question",
+        parent=parent,
     )
+    if not result:
+        messagebox.showinfo("Compile Canceled", "Compile operation canceled.", parent=parent)
+    return result
+
 
-    output_sheets[sheet_name] = processed_df
+def ask_ignore_mismatch(file_name, ref_file, compile_in, parent=None):
+    return messagebox.askokcancel(
+        "Warning!",
+        f"Third line of data in file {file_name} is different relative to expected from {ref_file}. Check the file inputs in {compile_in}. It is possible the CSV files do not have identical variable counts.\n\nYou may select 'Ok' to ignore this warning or 'Cancel' to terminate the operation.",
+        parent=parent,
+    )
 
-# Save the file
-savepath = filedialog.asksaveasfilename(
-    defaultextension=".xlsx",
-    filetypes=[("Excel files", "*.xlsx")],
-    initialfile="Events_Synthesized.xlsx",
-)
 
-if savepath:
-    with pd.ExcelWriter(savepath) as writer:
-        for sheet_name, sheet_df in output_sheets.items():
-            sheet_df.to_excel(writer, sheet_name=sheet_name, index=False)
+def save_compiled_events(individual_sheets, synthesized_sheets, initialdir=None, parent=None):
+    """Asks where to save both workbooks and writes them, with the SPSS tables next to Events_Individual.xlsx.
+    Returns False if the user cancels."""
+    for sheets, initialfile, nan_value in (
+        (individual_sheets, "Events_Individual.xlsx", "NaN"),
+        (synthesized_sheets, "Events_Synthesized.xlsx", None),
+    ):
+        savepath = filedialog.asksaveasfilename(
+            defaultextension=".xlsx",
+            filetypes=[("Excel files", "*.xlsx")],
+            initialfile=initialfile,
+            initialdir=initialdir,
+            parent=parent,
+        )
+        if not savepath:
+            messagebox.showinfo(
+                "Save Error",
+                "Save operation canceled by user. Returning to main window.",
+                parent=parent,
+            )
+            return False
+        write_streaming_workbook(savepath, sheets, nan_value=nan_value)
+        if sheets is individual_sheets:
+            spss_dir = os.path.dirname(savepath)
+            write_spss_tables(spss_dir, individual_sheets)
     messagebox.showinfo(
         "Save Successful",
-        f"Events successfully compiled!",
+        f"Events successfully compiled!\n\nSPSS tables (Events_Long.csv, Events_Wide.csv, missing events = {SPSS_MISSING_VALUE}) were saved to:\n\t{spss_dir}",
+        parent=parent,
     )
-else:
-    messagebox.showinfo(
-        "Save Error", "Save operation canceled by user. Returning to main window."
+    return True
+
+
+def compile_events_gui(compile_in, compile_out=None, parent=None):
+    """Dialog-driven compile: confirms the inputs, compiles, reports problems and asks where to save."""
+    if not confirm_compile(parent):
+        return False
+    try:
+        individual_sheets, synthesized_sheets = compile_event_tables(
+            compile_in,
+            on_mismatch=lambda file_name, ref_file: ask_ignore_mismatch(
+                file_name, ref_file, compile_in, parent
+            ),
+        )
+    except ValueError as e:
+        messagebox.showerror("Error", str(e), parent=parent)
+        return False
+    return save_compiled_events(
+        individual_sheets, synthesized_sheets, initialdir=compile_out, parent=parent
     )
-    sys.exit()
+
+
+if __name__ == "__main__":  # Kept for compiling from the command line
+    try:
+        compile_in = sys.argv[1]
+    except IndexError:
+        print("Usage: python EventCompile.py <events directory> [output directory]")
+        sys.exit()
+    root = ttk.Window()
+    root.withdraw()
+    root.iconbitmap(default="BT_Icon.ico")
+    compile_events_gui(compile_in, sys.argv[2] if len(sys.argv) > 2 else None)
+    root.destroy()
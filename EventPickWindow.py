@@ -1,5 +1,6 @@
 import os
 import sys
+import warnings
 
 import tkinter as tk
 from tkinter import ttk, filedialog, PhotoImage, messagebox, simpledialog
@@ -7,15 +8,13 @@ import ttkbootstrap as ttk
 import numpy as np
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.figure import Figure
-from scipy.signal import find_peaks
+from scipy.signal import find_peaks, peak_prominences
 
-from ToolboxFunctions import batch_reshape
 from itertools import cycle, islice
 import csv
 from matplotlib.backend_bases import MouseButton
 
-from functools import partial
-import openpyxl
+import ToolboxFunctions as bf
 
 
 def center_window(window, width, height):
@@ -58,156 +57,6 @@ def create_button(
     return button
 
 
-def create_manipulate_button(
-    parent, label, update_func, idx, row, column, sticky, style=None, bgcolor=None
-):
-    button = create_button(
-        parent,
-        label,
-        lambda: update_func(idx, max_idx, min_idx, ax, tree_max, tree_min),
-        row=row,
-        column=column,
-        sticky=sticky,
-        style=style,
-        bgcolor=bgcolor,
-    )
-    return button
-
-
-def place_manipulate_buttons(
-    btn_specs,
-    parent,
-):
-    for idx in range(0, 3):  # Placing Max and Min buttons
-        for label, update_func, sticky, style in btn_specs:
-            create_manipulate_button(
-                parent,
-                f"{label} {idx+1}",
-                update_func,
-                idx,
-                row=idx + 1,
-                column=1 if label == "Max" else 2,
-                sticky=sticky,
-                style=style,
-            )
-
-
-def set_button_frame(parent, row, column, rowspan, label_text, btn_specs):
-    frame = ttk.Frame(parent)
-    frame.grid(row=row, column=column, rowspan=rowspan, padx=10, pady=10, sticky="n")
-
-    separator = ttk.Separator(frame, orient=tk.HORIZONTAL)
-    separator.grid(row=0, column=1, columnspan=2, sticky="ew")
-
-    label = ttk.Label(frame, text=label_text, font=("Helvetica", 10))
-    label.grid(row=0, column=1, padx=15, columnspan=2)
-
-    place_manipulate_buttons(btn_specs, frame)
-
-
-def create_figure():
-    fig = Figure(figsize=(5, 4), dpi=100)
-    ax = fig.add_subplot(111)
-    canvas = FigureCanvasTkAgg(fig, master=root)
-    canvas.get_tk_widget().grid(row=0, column=0, columnspan=1, rowspan=20, sticky="w")
-    return fig, ax, canvas
-
-
-def create_treeview(parent, row, column, rowspan, heading_text, columns, column_widths):
-    if column == 1:
-        max_label = ttk.Label(root, text="Maxima", font=("Helvetica", 10))
-        max_label.grid(row=10, column=1, columnspan=1)
-    else:
-        min_label = ttk.Label(root, text="Minima", font=("Helvetica", 10))
-        min_label.grid(row=10, column=2, columnspan=1)
-
-    tree = ttk.Treeview(parent)
-    tree.grid(row=row, column=column, rowspan=rowspan, padx=10, sticky="n")
-    tree["columns"] = columns
-
-    tree.heading("#0", text=heading_text, anchor="w")
-
-    for col, width in zip(columns, column_widths):
-        tree.heading(col, text=col)
-        tree.column(col, width=width, minwidth=width, anchor="center")
-    tree.column("#0", width=column_widths[0])
-    tree["height"] = 4
-    return tree
-
-
-def treeview_contents(tree, time_series):
-    tree.delete(*tree.get_children())
-    max_idx_sorted, min_idx_sorted, _, _ = find_prominent(time_series)
-    max_entries = min(3, len(max_idx_sorted))
-    min_entries = min(3, len(min_idx_sorted))
-
-    for i, idx in (
-        enumerate(max_idx_sorted[:max_entries])
-        if tree == tree_max
-        else enumerate(min_idx_sorted[:min_entries])
-    ):
-        tree.insert(
-            "",
-            "end",
-            text=f"{i + 1}",
-            values=(idx, np.round(time_series[idx], 3)),
-        )
-    if tree == tree_max:
-        remaining = 3 - max_entries
-    else:
-        remaining = 3 - min_entries
-    for j in range(remaining):
-        tree.insert(
-            "",
-            "end",
-            text=f"{remaining + j}" if remaining != 1 else "3",
-            values=(np.nan, 0),
-        )
-
-
-def update_tree(tree, idx_list, time_series):
-    tree.delete(*tree.get_children())
-    try:
-        for i, idx in enumerate(idx_list):
-            if np.isnan(idx) or idx < 0 or idx >= len(time_series):
-                value = 0
-            else:
-                value = time_series[int(idx)]
-
-            tree.insert(
-                "",
-                "end",
-                text=f"{i + 1}",
-                values=(idx, np.round(value, 3)),
-            )
-        remaining = 3 - min(3, len(idx_list))
-        if remaining >= 3:
-            remaining = 3
-            for j in range(remaining):
-                tree.insert(
-                    "",
-                    "end",
-                    text=f"{j+1}" if remaining != 1 else "3",
-                    values=(np.nan, 0),
-                )
-        else:
-            for j in range(remaining):
-                tree.insert(
-                    "",
-                    "end",
-                    text=f"{remaining + j}" if remaining != 1 else "3",
-                    values=(np.nan, 0),
-                )
-    except UnboundLocalError:  # means there are no events by default
-        for _ in range(3):
-            tree.insert(
-                "",
-                "end",
-                text="---",
-                values=(np.nan, 0),
-            )
-
-
 def create_button_style(style_name, foreground, background):
     style = ttk.Style()
     style.configure(
@@ -241,19 +90,15 @@ def place_general_buttons(parent, button_specs, buttons):
         buttons.append(button)
 
 
-def find_prominent(data, prominence=0.5, distance=12):
-    maxes = []
-    max_idx, _ = find_peaks(data, prominence=prominence, distance=distance)
-    max_idx_sorted = sorted(max_idx[:3])
-    maxes = data[max_idx_sorted]
-
-    mins = []
-    inverted_data = [-x for x in data]
-    min_idx, _ = find_peaks(inverted_data, prominence=prominence, distance=distance)
-    min_idx_sorted = sorted(min_idx[:3])
-    mins = data[min_idx_sorted]
-
-    return max_idx_sorted, min_idx_sorted, maxes, mins
+def find_column_peaks(data, prominence=0.5, distance=12):
+    """Prominent peak frames of one column, ignoring the NaN padding of non-normalized batches."""
+    finite_frames = np.flatnonzero(np.isfinite(data))
+    if len(finite_frames) == 0:
+        return np.empty(0, dtype=int)
+    peaks, _ = find_peaks(
+        data[: finite_frames[-1] + 1], prominence=prominence, distance=distance
+    )
+    return peaks
 
 
 def scale_plot(ax):
@@ -272,82 +117,6 @@ def scale_plot(ax):
     )
 
 
-def plot_time_series(ax, data, var_titles, plot_subtitles):
-    global plot_idx
-    var_titles_clean = [
-        title.replace("Right_", "").replace("Left_", "") for title in var_titles
-    ]
-    ax.plot(data, color="black", linewidth=1, zorder=1)
-    ax.set_title(f"{var_titles_clean[plot_idx]}\n{plot_subtitles[plot_idx]}")
-    ax.set_xlabel("Frame")
-    ax.set_ylabel("Value")
-    ax.spines["right"].set_visible(False)
-    ax.spines["top"].set_visible(False)
-    scale_plot(ax)
-
-
-def plot_events(max_idx, min_idx, time_series):
-    y_range = ax.get_ylim()[1] - ax.get_ylim()[0]
-    offset_percentage = 0.025
-    offset = offset_percentage * y_range
-
-    counter = 0
-    if len(max_idx) > 0:
-        for idx in max_idx:
-            if not np.isnan(idx):
-                idx = int(idx)
-                if 0 <= idx < len(time_series):
-                    counter += 1
-                    ax.scatter(
-                        idx,
-                        time_series[idx] + offset,
-                        color="dodgerblue",
-                        marker="v",
-                        s=70,
-                        zorder=2,
-                    )
-                    ax.text(
-                        idx,
-                        time_series[idx] + (offset * 2),
-                        f"{counter}",
-                        ha="center",
-                        va="bottom",
-                        fontdict={"size": 12, "color": "dodgerblue"},
-                    )
-    counter = 0
-    if len(min_idx) > 0:
-        for idx in min_idx:
-            if not np.isnan(idx):
-                idx = int(idx)
-                if 0 <= idx < len(time_series):
-                    counter += 1
-                    ax.scatter(
-                        idx,
-                        time_series[idx] - offset,
-                        color="firebrick",
-                        marker="^",
-                        s=70,
-                        zorder=2,
-                    )
-                    ax.text(
-                        idx,
-                        time_series[idx] - (offset * 2.2),
-                        f"{counter}",
-                        ha="center",
-                        va="top",
-                        fontdict={"size": 12, "color": "firebrick"},
-                    )
-
-
-def set_plot(ax, time_series):
-    global plot_idx
-    max_idx, min_idx, _, _ = find_prominent(time_series)
-    plot_time_series(ax, time_series, var_titles, plot_subtitles)
-    plot_events(max_idx, min_idx, time_series)
-
-    return max_idx, min_idx
-
-
 def nan_sort(elem):
     if np.isnan(elem):
         return float(
@@ -356,609 +125,1258 @@ def nan_sort(elem):
     return elem
 
 
-def update_max(button_idx, max_idx, min_idx, ax, tree_max, _):
-    global plot_idx, plots_file, max_cid
-    try:  # Passes error where max_cid doesn't exist on first code run
-        fig.canvas.mpl_disconnect(max_cid)
-    except NameError:
-        pass
-    clear_max(button_idx, max_idx, min_idx, ax, tree_max, _)
+def save_to_csv(file_path, matrices, var_titles, subject, condition):
+    with open(file_path, "w", newline="") as csvfile:
+        matrix_delim = ["NEXT_MATRIX"]
+        writer = csv.writer(csvfile)
+        writer.writerow([f"S{subject}_C{condition}"])
+        writer.writerow(
+            ["Variable Metadata (Each repeat of variable indicates trial amount):"]
+        )
+        writer.writerow([var_titles])
+        writer.writerow(["NEXT_MATRIX"])
+
+        delim_check = False
+        for matrix in matrices:
+            if delim_check:
+                writer.writerow(matrix_delim)
+            else:
+                delim_check = True
 
-    def update_max_value(new_max):
-        time_series = np.ravel(plots_file[:, plot_idx])
-        max_idx, min_idx = get_current_idxs(plot_idx)
+            writer.writerows(
+                matrix.transpose(2, 0, 1).reshape(-1, matrix.shape[1])
+            )  # One block of event rows per variable
+
+
+EVENT_KINDS = ("max", "min")
+SNAP_WINDOW = 0.05  # Share of a trial's finite length searched on either side of a click for the extremum to snap to
+EVENT_DTYPE = np.dtype(
+    [
+        ("subject", "i4"),
+        ("condition", "U16"),
+        ("variable", "U64"),
+        ("trial", "i4"),
+        ("event", "i4"),
+        ("kind", "U3"),
+        ("frame", "f8"),
+        ("value", "f8"),
+        ("percent", "f8"),
+    ]
+)
 
-        max_idx[button_idx] = new_max
-        new_max_idx = sorted(max_idx, key=nan_sort)
-        ax.clear()
 
-        plot_time_series(ax, time_series, var_titles, plot_subtitles)
+def new_event_records(subject, condition, var_titles, trials, n_events=3):
+    """Empty event storage for one subject and condition as a single structured record array.
 
-        plot_events(new_max_idx, min_idx, time_series)
-        update_tree(tree_max, new_max_idx, time_series)
-        max_idx = new_max_idx
-        update_max_matrices(
-            max_idx,
-            time_series,
-            plot_idx,
-            all_maxidx_matrix,
-            all_maxval_matrix,
-            all_maxper_matrix,
-            trials,
+    The array is shaped Kind x Event x Trial x Var (kind 0 holds maxima, kind 1 minima), so a field such as
+    records["frame"][0] is the Event x Trial x Var matrix of maxima frames. Trials and events are numbered from 1;
+    frame, value and percent start as NaN.
+    """
+    variables = list(var_titles)[::trials]
+    records = np.zeros(
+        (len(EVENT_KINDS), n_events, trials, len(variables)), dtype=EVENT_DTYPE
+    )
+    records["subject"] = int(subject)
+    records["condition"] = str(condition)
+    records["variable"] = variables
+    records["trial"] = np.arange(1, trials + 1)[:, None]
+    records["event"] = np.arange(1, n_events + 1)[:, None, None]
+    records["kind"] = np.array(EVENT_KINDS)[:, None, None, None]
+    for field in ("frame", "value", "percent"):
+        records[field] = np.nan
+    return records
+
+
+def event_position(plot_idx, trials):
+    """Trial and variable of a plot, where plots are ordered with all trials of a variable next to each other."""
+    var_idx, trial_idx = divmod(plot_idx, trials)
+    return trial_idx, var_idx
+
+
+def store_events(records, kind_idx, event_frames, time_series, trial_idx, var_idx):
+    """Writes one trial's event frames (NaN where empty) into the record array along with their values and percents."""
+    frames = np.asarray(event_frames, dtype=float)
+    picked = ~np.isnan(frames)
+    values = np.full(len(frames), np.nan)
+    values[picked] = time_series[frames[picked].astype(int)]
+    trial_records = records[kind_idx, : len(frames), trial_idx, var_idx]
+    trial_records["frame"] = frames
+    trial_records["value"] = values
+    trial_records["percent"] = frames / len(time_series) * 100
+
+
+def save_event_records(output_path, records, var_titles, subject, condition):
+    """Writes a record array to S{n}_C{m}_Maxima.csv and _Minima.csv (values, frames, percents). Returns both paths."""
+    file_prefix = f"S{subject}_C{condition}"
+    file_paths = []
+    for kind_records, suffix in zip(records, ("Maxima", "Minima")):
+        file_path = os.path.join(output_path, f"{file_prefix}_{suffix}.csv")
+        save_to_csv(
+            file_path,
+            [
+                kind_records["value"],
+                np.round(kind_records["frame"]),
+                kind_records["percent"],
+            ],
+            var_titles,
+            subject,
+            condition,
         )
-        canvas.draw_idle()
-
-    def set_max_event(event):
-        if event.inaxes and event.button == MouseButton.LEFT:
-            time_series = np.ravel(plots_file[:, plot_idx])
-            new_event = round(event.xdata)
-            possible_indices = np.arange(
-                new_event - find_tolerance, new_event + find_tolerance
-            )
-            possible_indices = possible_indices[
-                (possible_indices >= 0) & (possible_indices < len(time_series))
-            ]
-            try:
-                desired_index_within_range = np.argmin(time_series[possible_indices])
-            except ValueError:
-                messagebox.showwarning(
-                    "Warning", "You clicked out of the graph bounds. Please try again."
-                )
-                return
-            desired_index_within_range = np.argmax(time_series[possible_indices])
-            desired_index = possible_indices[desired_index_within_range]
-            update_max_value(desired_index)
-            fig.canvas.mpl_disconnect(max_cid)
+        file_paths.append(file_path)
+    return file_paths
 
-    max_cid = fig.canvas.mpl_connect("button_press_event", set_max_event)
 
+EVENT_FILE_FORMAT = "EVENTPICK_EVENTS"
+EVENT_FILE_VERSION = 1
 
-def update_min(button_idx, max_idx, min_idx, ax, _, tree_min):
-    global plot_idx, plots_file, min_cid
-    try:  # Passes error where min_cid doesn't exist on first code run
-        fig.canvas.mpl_disconnect(min_cid)
-    except NameError:
-        pass
-    clear_min(button_idx, max_idx, min_idx, ax, _, tree_min)
 
-    def update_min_value(new_min):
-        time_series = np.ravel(plots_file[:, plot_idx])
-        max_idx, min_idx = get_current_idxs(plot_idx)
+def event_file_path(output_path, subject, condition):
+    return os.path.join(output_path, f"S{subject}_C{condition}_Events.npz")
 
-        min_idx[button_idx] = new_min
-        new_min_idx = sorted(min_idx, key=nan_sort)
-        ax.clear()
 
-        plot_time_series(ax, time_series, var_titles, plot_subtitles)
+def save_event_file(output_path, records, var_titles, subject, condition):
+    """Writes a record array to S{n}_C{m}_Events.npz, the saved form of an Event Pick session. Returns its path.
 
-        plot_events(max_idx, new_min_idx, time_series)
-        update_tree(tree_min, new_min_idx, time_series)
-        min_idx = new_min_idx
-        update_min_matrices(
-            min_idx,
-            time_series,
-            plot_idx,
-            all_minidx_matrix,
-            all_minval_matrix,
-            all_minper_matrix,
-            trials,
+    The file holds the typed record array (see new_event_records) under "records" and a small header: format,
+    version, subject, condition, trials, events and the plot variable titles. It loads without pickle.
+    """
+    file_path = event_file_path(output_path, subject, condition)
+    with open(file_path, "wb") as event_file:  # np.savez would append .npz to a path it did not open itself
+        np.savez(
+            event_file,
+            format=EVENT_FILE_FORMAT,
+            version=EVENT_FILE_VERSION,
+            subject=int(subject),
+            condition=str(condition),
+            trials=records.shape[2],
+            events=records.shape[1],
+            var_titles=np.asarray(var_titles, dtype=str),
+            records=records,
         )
-        canvas.draw_idle()
-
-    def set_min_event(event):
-        if event.inaxes and event.button == MouseButton.LEFT:
-            time_series = np.ravel(plots_file[:, plot_idx])
-            new_event = round(event.xdata)
-            possible_indices = np.arange(
-                new_event - find_tolerance, new_event + find_tolerance
+    return file_path
+
+
+def load_event_file(file_path):
+    """Reads an S{n}_C{m}_Events.npz file in one call. Returns (header dict, record array, var_titles list)."""
+    with np.load(file_path, allow_pickle=False) as event_file:
+        if str(event_file["format"]) != EVENT_FILE_FORMAT:
+            raise ValueError(f"{file_path} is not an Event Pick events file.")
+        if int(event_file["version"]) > EVENT_FILE_VERSION:
+            raise ValueError(
+                f"{file_path} was written by a newer version of the toolbox (file version {int(event_file['version'])})."
             )
-            possible_indices = possible_indices[
-                (possible_indices >= 0) & (possible_indices < len(time_series))
-            ]
-            try:
-                desired_index_within_range = np.argmin(time_series[possible_indices])
-            except ValueError:
-                messagebox.showwarning(
-                    "Warning", "You clicked out of the graph bounds. Please try again."
-                )
-                return
-            desired_index = possible_indices[desired_index_within_range]
-            update_min_value(desired_index)
-            fig.canvas.mpl_disconnect(min_cid)
-
-    min_cid = fig.canvas.mpl_connect("button_press_event", set_min_event)
-
-
-def clear_max(button_idx, max_idx, min_idx, ax, tree_max, _):
-    global plot_idx, plots_file
-
-    time_series = np.ravel(plots_file[:, plot_idx])
-    max_idx, min_idx = get_current_idxs(plot_idx)
-    max_idx[button_idx] = np.nan
-    new_max_idx = sorted(max_idx, key=nan_sort)
-    ax.clear()
-
-    plot_time_series(ax, time_series, var_titles, plot_subtitles)
-
-    plot_events(new_max_idx, min_idx, time_series)
-    update_tree(tree_max, new_max_idx, time_series)
-    max_idx = new_max_idx
-    update_max_matrices(
-        max_idx,
-        time_series,
-        plot_idx,
-        all_maxidx_matrix,
-        all_maxval_matrix,
-        all_maxper_matrix,
-        trials,
-    )
-    canvas.draw_idle()
-
-
-def clear_min(button_idx, max_idx, min_idx, ax, _, tree_min):
-    global plot_idx, plots_file
-
-    time_series = np.ravel(plots_file[:, plot_idx])
-    max_idx, min_idx = get_current_idxs(plot_idx)
-    min_idx[button_idx] = np.nan
-    new_min_idx = sorted(min_idx, key=nan_sort)
-    ax.clear()
-
-    plot_time_series(ax, time_series, var_titles, plot_subtitles)
-
-    plot_events(max_idx, new_min_idx, time_series)
-    update_tree(tree_min, new_min_idx, time_series)
-    min_idx = new_min_idx
-    update_min_matrices(
-        min_idx,
-        time_series,
-        plot_idx,
-        all_minidx_matrix,
-        all_minval_matrix,
-        all_minper_matrix,
-        trials,
+        header = {
+            field: event_file[field].item()
+            for field in ("version", "subject", "condition", "trials", "events")
+        }
+        return header, event_file["records"], event_file["var_titles"].tolist()
+
+
+def event_block_rows(kind_records):
+    """Value, frame and percent rows of one kind of records, in the layout of the event CSV blocks.
+
+    Each matrix becomes one row per variable and event with one column per trial; frames are rounded as in the CSVs.
+    """
+    return np.concatenate(
+        [
+            matrix.transpose(2, 0, 1).reshape(-1, matrix.shape[1])
+            for matrix in (
+                kind_records["value"],
+                np.round(kind_records["frame"]),
+                kind_records["percent"],
+            )
+        ]
     )
-    canvas.draw_idle()
-
-
-def reset_current(plots_file, ax, plot_idx_history):
-    messagebox.showinfo("Info", "This isn't working right now. Try again later!")
-    pass
-    # result = messagebox.askyesno(
-    #     "Reset Plot", "Are you sure you want to reset the current plot?"
-    # )
-    # if result:
-    #     plot_idx_history.remove(plot_idx)
-    #     iterate_plot(plots_file, ax, plot_idx_history)
-    # pass
-
-
-def iterate_plot(plots_file, ax, plot_idx_history):
-    global plot_idx, trial_counter, all_maxidx_matrix, all_minidx_matrix, all_maxval_matrix, all_minval_matrix, all_maxper_matrix, all_minper_matrix
-    time_series = np.ravel(plots_file[:, plot_idx])
-
-    if plot_idx not in plot_idx_history:  # Plot has not happened before
-        max_idx, min_idx, _, _ = find_prominent(time_series)
-        ax.clear()
-        update_tree(tree_max, max_idx, time_series)
-        update_tree(tree_min, min_idx, time_series)
-        set_plot(ax, time_series)
-        ax.relim()
-        ax.autoscale_view()
-        canvas.draw()
-        update_max_matrices(
-            max_idx,
-            time_series,
-            plot_idx,
-            all_maxidx_matrix,
-            all_maxval_matrix,
-            all_maxper_matrix,
-            trials,
-        )
-        update_min_matrices(
-            min_idx,
-            time_series,
-            plot_idx,
-            all_minidx_matrix,
-            all_minval_matrix,
-            all_minper_matrix,
-            trials,
-        )
-        plot_idx_history.add(plot_idx)
-    else:  # Plot has happened before
-        # Then we need to plot based on existing idx array
-        slice_idx = plot_idx // trials
-        max_idx = all_maxidx_matrix[:, trial_counter, slice_idx]
-        min_idx = all_minidx_matrix[:, trial_counter, slice_idx]
-        ax.clear()
-        update_tree(tree_max, max_idx, time_series)
-        update_tree(tree_min, min_idx, time_series)
-        plot_time_series(ax, time_series, var_titles, plot_subtitles)
-        plot_events(max_idx, min_idx, time_series)
-        ax.relim()
-        ax.autoscale_view()
-        fig.tight_layout()
-        canvas.draw()
 
 
-def next_plot(plots_file, ax):
-    global plot_idx, trial_counter
-    plot_idx += 1
-    if (
-        plot_idx > plots_file.shape[1] - 1
-    ):  # Catches when we go forward from the last plot
-        plot_idx = 0
-        messagebox.showinfo(
-            "Event Picking",
-            f"You've reached the last plot! Starting from the first plot. Consider saving events now.",
-        )
-    trial_counter += (
-        1  # Counter to identify which column to pick when selecting previous plots
+def export_event_csv(file_path, output_path=None):
+    """Exports an S{n}_C{m}_Events.npz file as the S{n}_C{m}_Maxima.csv/_Minima.csv pair. Returns the CSV paths.
+
+    Files go next to the event file unless output_path is given.
+    """
+    header, records, var_titles = load_event_file(file_path)
+    if output_path is None:
+        output_path = os.path.dirname(file_path)
+    return save_event_records(
+        output_path, records, var_titles, header["subject"], header["condition"]
     )
-    if trial_counter > trials - 1:
-        trial_counter = 0
-    iterate_plot(plots_file, ax, plot_idx_history)
 
 
-def previous_plot(plots_file, ax):
-    global plot_idx, trial_counter
-    plot_idx -= 1
-    if plot_idx < 0:  # Catches when we go backwards from the first plot
-        plot_idx = plots_file.shape[1] - 1
-    trial_counter -= 1
-    if trial_counter < 0:
-        trial_counter = trials - 1
-    iterate_plot(plots_file, ax, plot_idx_history)
+def journal_path(output_path, subject, condition):
+    return os.path.join(output_path, f"S{subject}_C{condition}_Events.journal")
 
 
-def save_to_csv(file_path, matrices, var_titles, subject):
-    with open(file_path, "w", newline="") as csvfile:
-        matrix_delim = ["NEXT_MATRIX"]
-        writer = csv.writer(csvfile)
-        writer.writerow([f"S{subject}_C{condition_in}"])
-        writer.writerow(
-            ["Variable Metadata (Each repeat of variable indicates trial amount):"]
-        )
-        writer.writerow([var_titles])
-        writer.writerow(["NEXT_MATRIX"])
+class EventJournal:
+    """Append-only, tab separated record of every event edit made in an Event Pick session.
 
-        delim_check = False
-        for matrix in matrices:
-            if delim_check:
-                writer.writerow(matrix_delim)
+    Each edit line holds the full event column stored in the matrices (frame, value and percent per event), so
+    replaying the lines in order rebuilds the session. Lines are synced to disk as soon as they are written and
+    end with a marker, so a line cut short by a crash is skipped on replay.
+    """
+
+    def __init__(self, path, subject, condition, trials, var_titles, n_events=3, resume=False):
+        self.path = path
+        self._file = open(path, "a" if resume else "w", newline="")
+        self._writer = csv.writer(self._file, delimiter="\t")
+        if resume:
+            with open(path, "rb") as journal_file:
+                journal_file.seek(-1, os.SEEK_END)
+                if journal_file.read(1) != b"\n":  # Starts a fresh line after a crash mid-write
+                    self._file.write("\r\n")
+        else:
+            self._writer.writerows(
+                [
+                    ["EVENTPICK_JOURNAL", 1],
+                    ["subject", subject],
+                    ["condition", condition],
+                    ["trials", trials],
+                    ["events", n_events],
+                    ["variables", *var_titles],
+                ]
+            )
+            self._sync()
+
+    def record(self, kind, plot_idx, trial_idx, var_idx, frames, values, percents):
+        row = [kind, plot_idx, trial_idx, var_idx]
+        for event in zip(frames, values, percents):
+            row.extend(repr(float(field)) for field in event)
+        row.append("end")
+        self._writer.writerow(row)
+        self._sync()
+
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+
+def read_journal(path):
+    """Returns the journal header as a dict and its complete edit lines as
+    (kind, plot_idx, trial_idx, var_idx, frames, values, percents) in the order they were made."""
+    header = {}
+    records = []
+    with open(path, newline="") as journal_file:
+        for row in csv.reader(journal_file, delimiter="\t"):
+            if not row:
+                continue
+            if row[0] in EVENT_KINDS:
+                if row[-1] != "end":  # Cut short by a crash
+                    continue
+                try:
+                    plot_idx, trial_idx, var_idx = (int(field) for field in row[1:4])
+                    fields = np.array(row[4:-1], dtype=float).reshape(-1, 3)
+                except ValueError:
+                    continue
+                if len(fields) != int(header["events"]):
+                    continue
+                records.append(
+                    (row[0], plot_idx, trial_idx, var_idx, *fields.T)
+                )
+            elif row[0] == "variables":
+                header["variables"] = row[1:]
             else:
-                delim_check = True
+                header[row[0]] = row[1] if len(row) > 1 else ""
+    return header, records
+
 
-            for slice_idx in range(matrix.shape[2]):
-                for row in matrix[:, :, slice_idx]:
-                    writer.writerow(row)
+def journal_records(header, records):
+    """Replays journal lines into a record array (see new_event_records).
+
+    Also returns the set of plot indices that were visited in the session.
+    """
+    trials = int(header["trials"])
+    event_records = new_event_records(
+        header["subject"],
+        header["condition"],
+        header["variables"],
+        trials,
+        int(header["events"]),
+    )
+    visited = set()
+    for kind, plot_idx, trial_idx, var_idx, frames, values, percents in records:
+        trial_records = event_records[EVENT_KINDS.index(kind), :, trial_idx, var_idx]
+        trial_records["frame"] = frames
+        trial_records["value"] = values
+        trial_records["percent"] = percents
+        visited.add(plot_idx)
+    return event_records, visited
+
+
+def write_events_from_journal(path, output_path=None):
+    """Writes the S{n}_C{m}_Events.npz file of a session straight from its journal, without the UI.
+
+    The file goes next to the journal unless output_path is given. Returns the path written.
+    """
+    header, records = read_journal(path)
+    event_records, _ = journal_records(header, records)
+    if output_path is None:
+        output_path = os.path.dirname(path)
+    return save_event_file(
+        output_path,
+        event_records,
+        header["variables"],
+        header["subject"],
+        header["condition"],
+    )
 
 
-def save_all_events(
-    all_maxval_matrix,
-    all_maxidx_matrix,
-    all_minval_matrix,
-    all_minidx_matrix,
-    all_maxper_matrix,
-    all_minper_matrix,
-    subject,
+def event_session_cube(data_cube, var_bool_array):
+    """Rearranges a batch cube (DATA x (Trial x Var) x Subject) into one contiguous Subject x DATA x (Var x Trial) block.
+
+    Only the selected variables are kept, with all trials of a variable side by side. This is the one copy made for
+    an Event Pick session: indexing a subject afterwards returns a zero-copy, contiguous view.
+    """
+    var_mask = np.asarray(var_bool_array).astype(bool)
+    frames, columns, subjects = data_cube.shape
+    trials = columns // len(var_mask)
+    selected = data_cube.reshape(frames, trials, len(var_mask), subjects)[:, :, var_mask, :]
+    return np.ascontiguousarray(selected.transpose(3, 0, 2, 1), dtype=float).reshape(
+        subjects, frames, -1
+    )  # Batch columns are ordered trial first, then variable
+
+
+class EventCandidates:
+    """Peak and trough candidates for every column of a DATA x (Var x Trial) matrix, detected once up front.
+
+    Candidate frames are stored back to back in one int array per kind, with offsets marking where each column
+    starts (column c owns max_frames[max_offsets[c]:max_offsets[c + 1]]). default_max/default_min hold the first
+    n_events candidates of every column as n_events x columns, NaN where a column has fewer. Every local
+    extremum, prominent or not, is kept the same way in sorted order with its prominence for snapping clicks onto
+    the data.
+    """
+
+    def __init__(self, plots_file, n_events=3, prominence=0.5, distance=12):
+        plots_file = np.asarray(plots_file, dtype=float)
+        inverted = -plots_file  # One negation for every column instead of one per plot
+        self.n_events = n_events
+        self.frame_count = plots_file.shape[0]
+        finite = np.isfinite(plots_file)
+        self.finite_lengths = np.where(
+            finite.any(axis=0), self.frame_count - np.argmax(finite[::-1], axis=0), 0
+        )  # Frames up to the last finite one, the NaN padding of non-normalized batches excluded
+        self.max_frames, self.max_offsets = self._pack(
+            [
+                find_column_peaks(plots_file[:, col], prominence, distance)
+                for col in range(plots_file.shape[1])
+            ]
+        )
+        self.min_frames, self.min_offsets = self._pack(
+            [
+                find_column_peaks(inverted[:, col], prominence, distance)
+                for col in range(plots_file.shape[1])
+            ]
+        )
+        self.default_max = self._first_events(self.max_frames, self.max_offsets)
+        self.default_min = self._first_events(self.min_frames, self.min_offsets)
+        self.local_extrema_index = [
+            self._local_extrema(plots_file),
+            self._local_extrema(inverted),
+        ]
+        self.local_prominences = [
+            self._prominences(data, *index)
+            for data, index in zip((plots_file, inverted), self.local_extrema_index)
+        ]
+
+    @staticmethod
+    def _pack(column_peaks):
+        offsets = np.zeros(len(column_peaks) + 1, dtype=np.int64)
+        np.cumsum([len(peaks) for peaks in column_peaks], out=offsets[1:])
+        frames = (
+            np.concatenate(column_peaks).astype(np.int32)
+            if len(column_peaks)
+            else np.empty(0, dtype=np.int32)
+        )
+        return frames, offsets
+
+    @staticmethod
+    def _local_extrema(data):
+        # A frame is a local maximum when the data rises into it and does not rise out of it (NaN never qualifies)
+        steps = np.diff(data, axis=0)
+        is_peak = (steps[:-1] > 0) & (steps[1:] <= 0)
+        columns, frames = np.nonzero(is_peak.T)  # Column by column, frames ascending
+        offsets = np.zeros(data.shape[1] + 1, dtype=np.int64)
+        np.cumsum(np.bincount(columns, minlength=data.shape[1]), out=offsets[1:])
+        return (frames + 1).astype(np.int32), offsets
+
+    def _prominences(self, data, frames, offsets):
+        prominences = np.empty(len(frames))
+        with warnings.catch_warnings():  # The first frame of a plateau has no prominence, which is fine here
+            warnings.simplefilter("ignore")
+            for col in np.flatnonzero(np.diff(offsets)):
+                prominences[offsets[col] : offsets[col + 1]] = peak_prominences(
+                    data[: self.finite_lengths[col], col], frames[offsets[col] : offsets[col + 1]]
+                )[0]
+        return prominences
+
+    def _first_events(self, frames, offsets):
+        counts = np.diff(offsets)
+        columns = np.repeat(np.arange(len(counts)), counts)
+        ranks = np.arange(len(frames)) - np.repeat(offsets[:-1], counts)
+        keep = ranks < self.n_events
+        events = np.full((self.n_events, len(counts)), np.nan)
+        events[ranks[keep], columns[keep]] = frames[keep]
+        return events
+
+    def maxima(self, col):
+        return self.max_frames[self.max_offsets[col] : self.max_offsets[col + 1]]
+
+    def minima(self, col):
+        return self.min_frames[self.min_offsets[col] : self.min_offsets[col + 1]]
+
+    def local_extrema(self, kind_idx, col):
+        """Sorted frames of every local maximum (kind 0) or minimum (kind 1) of one column."""
+        frames, offsets = self.local_extrema_index[kind_idx]
+        return frames[offsets[col] : offsets[col + 1]]
+
+    def snap(self, kind_idx, col, x):
+        """Frame of the local extremum a click at x snaps to, found by bisecting the column's sorted extrema.
+
+        Of the extrema within SNAP_WINDOW of the trial's finite length on either side of x, the most prominent wins,
+        so noise wiggles beside the click lose to the dominant peak or trough whatever the sampling rate. Without one
+        in that window, the nearest extremum is used.
+        """
+        extrema = self.local_extrema(kind_idx, col)
+        if len(extrema) == 0:
+            return int(np.clip(round(x), 0, self.frame_count - 1))
+        half_window = max(1, round(SNAP_WINDOW * self.finite_lengths[col]))
+        start = np.searchsorted(extrema, x - half_window, side="left")
+        stop = np.searchsorted(extrema, x + half_window, side="right")
+        if start < stop:
+            offsets = self.local_extrema_index[kind_idx][1]
+            prominences = self.local_prominences[kind_idx][offsets[col] + start : offsets[col] + stop]
+            return int(extrema[start + np.argmax(prominences)])
+        position = np.searchsorted(extrema, x)
+        neighbours = extrema[max(position - 1, 0) : position + 1]
+        return int(neighbours[np.argmin(np.abs(neighbours - x))])
+
+    def step(self, kind_idx, col, frame, steps):
+        """Frame of the local extremum a number of steps before (negative) or after a frame, or None past the ends."""
+        extrema = self.local_extrema(kind_idx, col)
+        position = np.searchsorted(extrema, frame)
+        if position < len(extrema) and extrema[position] == frame:
+            target = position + steps
+        else:  # frame is not an extremum itself, so the first step lands on a neighbour
+            target = position + steps - (1 if steps > 0 else 0)
+        if 0 <= target < len(extrema):
+            return int(extrema[target])
+        return None
+
+    def counts(self):
+        """Number of prominent peaks and troughs found in each column, as 2 x columns."""
+        return np.vstack((np.diff(self.max_offsets), np.diff(self.min_offsets)))
+
+    def default_events(self, col):
+        """Copies of the default maxima and minima frames for one column (NaN where missing)."""
+        return self.default_max[:, col].copy(), self.default_min[:, col].copy()
+
+
+def _auto_pick_subject(job_args):
+    # Runs in a worker process: detects every trial of one subject and returns its event record array
+    subject_data, subject, condition, var_titles, trials, n_events, prominence, distance = job_args
+    var_count = subject_data.shape[1] // trials
+    candidates = EventCandidates(subject_data, n_events, prominence, distance)
+
+    def to_event_matrix(columns_matrix):  # n_events x (Var x Trial) -> n_events x Trial x Var
+        return columns_matrix.reshape(n_events, var_count, trials).transpose(0, 2, 1)
+
+    records = new_event_records(subject, condition, var_titles, trials, n_events)
+    for kind_records, frames in zip(
+        records, (candidates.default_max, candidates.default_min)
+    ):
+        picked = ~np.isnan(frames)
+        values = np.full(frames.shape, np.nan)
+        values[picked] = subject_data[
+            frames[picked].astype(int), np.nonzero(picked)[1]
+        ]
+        kind_records["frame"] = to_event_matrix(frames)
+        kind_records["value"] = to_event_matrix(values)
+        kind_records["percent"] = to_event_matrix(frames / subject_data.shape[0] * 100)
+    found = candidates.counts().reshape(2, var_count, trials).transpose(0, 2, 1)
+    return records, found
+
+
+def auto_pick_events(
+    data_cube,
+    var_bool_array,
+    var_titles,
     condition,
     output_path,
-    var_titles,
+    subjects=None,
+    n_events=3,
+    prominence=0.5,
+    distance=12,
+    workers=None,
+    progress=None,
 ):
-    try:
-        file_prefix = f"S{subject}_C{condition}"
-        sub_check = messagebox.askyesno(
-            "Subject Confirmation",
-            f"Is the subject number {subject} correct? Selecting No will allow a number input.",
+    """Headless event picking for every subject, trial and selected variable of a batch cube.
+
+    Writes the same S{n}_C{m}_Events.npz files as the Event Pick window, plus C{m}_Auto_Review.txt
+    listing trials where the number of prominent peaks or troughs was not exactly n_events. Peak detection
+    runs in parallel across subjects. Returns the review rows as (subject, variable, trial, maxima, minima).
+    """
+    if subjects is None:
+        subjects = range(1, data_cube.shape[2] + 1)
+    subjects = list(subjects)
+    trials = data_cube.shape[1] // len(var_bool_array)
+    session_cube = event_session_cube(data_cube, var_bool_array)
+    subject_jobs = [
+        (
+            session_cube[subject - 1],
+            subject,
+            condition,
+            var_titles,
+            trials,
+            n_events,
+            prominence,
+            distance,
         )
-        if not sub_check:
-            new_subject = simpledialog.askinteger(
-                "Subject Number Correction",
-                "Please enter the Subject Number you would like to save:",
-                minvalue=1,
-            )
-            if new_subject is not None:
-                subject = new_subject
-            else:
-                messagebox.showwarning(
-                    "Warning",
-                    "Invalid or no subject number provided. Using original value...",
+        for subject in subjects
+    ]
+    results = bf.parallel_map(
+        _auto_pick_subject,
+        subject_jobs,
+        workers=workers,
+        progress=progress,
+        message=f"Detecting events for {len(subjects)} subjects",
+    )
+
+    review_rows = []
+    for subject, (records, found) in zip(subjects, results):
+        save_event_file(output_path, records, var_titles, subject, condition)
+        for trial_idx, var_idx in zip(
+            *np.nonzero(np.any(found != n_events, axis=0))
+        ):
+            review_rows.append(
+                (
+                    subject,
+                    var_titles[var_idx * trials],
+                    int(trial_idx) + 1,
+                    int(found[0, trial_idx, var_idx]),
+                    int(found[1, trial_idx, var_idx]),
                 )
-        file_prefix = f"S{subject}_C{condition}"
+            )
+
+    review_rows.sort(key=lambda row: (row[0], row[1], row[2]))
+    with open(
+        os.path.join(output_path, f"C{condition}_Auto_Review.txt"), "w", newline=""
+    ) as review_file:
+        writer = csv.writer(review_file, delimiter="\t")
+        writer.writerow(
+            ["Subject", "Variable", "Trial", "Maxima Found", "Minima Found"]
+        )
+        writer.writerows(review_rows)
+    return review_rows
+
+
+class EventPickWindow(ttk.Toplevel):
+    """Event picking window hosted inside the running Biomechanics Toolbox.
 
-        max_file_path = os.path.join(output_path, f"{file_prefix}_Maxima.csv")
-        min_file_path = os.path.join(output_path, f"{file_prefix}_Minima.csv")
+    session_cube arrives in memory as Subject x DATA x (Var x Trial) (see event_session_cube), ordered with all
+    trials of a variable next to each other. A single subject's DATA x (Var x Trial) matrix is also accepted.
+    The cube is loaded once; moving to another subject takes a zero-copy view of it, and events are saved per
+    subject. Every window keeps its own event matrices, so several sessions can be open at once.
+    """
+
+    def __init__(
+        self,
+        master,
+        session_cube,
+        subject,
+        condition,
+        trials,
+        var_titles,
+        events_out,
+        on_close=None,
+        n_events=3,
+    ):
+        super().__init__(master=master)
+        self.bell = lambda: None
+        center_window(self, 1050, 525)
+
+        session_cube = np.asarray(session_cube, dtype=float)
+        if session_cube.ndim == 2:  # One subject only
+            self.session_cube = session_cube[None]
+            self.subject_numbers = [int(subject)]
+        else:
+            self.session_cube = session_cube
+            self.subject_numbers = list(range(1, session_cube.shape[0] + 1))
+        self.trials = int(trials)
+        self.var_titles = list(var_titles)
+        self.events_out = events_out
+        self.on_close = on_close
+        self.n_events = int(n_events)
+
+        self.pick_cid = None
+        self.active_event = None  # (kind, frame) moved by the , and . shortcuts
+        self.background = None
+        self.journal = None
+        self.subject_candidates = {}  # Peak candidates per subject, detected the first time it is shown
+        self.visited_sessions = set()
+
+        create_button_style("max.TButton", "white", "dodgerblue")
+        create_button_style("min.TButton", "white", "firebrick")
+        create_button_style("navigate.TButton", "white", "slategray")
+        create_button_style("save.TButton", "white", "#FF8200")
+
+        replace_btn_specs = [
+            ("Max", self.update_max, "e", "max.TButton"),
+            ("Min", self.update_min, "w", "min.TButton"),
+        ]
+        clear_btn_specs = [
+            ("Max", self.clear_max, "e", "max.TButton"),
+            ("Min", self.clear_min, "w", "min.TButton"),
+        ]
+        general_btn_specs = [
+            ("Reset Plot", self.reset_current, 17, 1, "navigate.TButton"),
+            ("Next Plot", self.next_plot, 1, 2, "navigate.TButton"),
+            ("Previous Plot", self.previous_plot, 1, 1, "navigate.TButton"),
+            ("Save All Events", self.save_all_events, 17, 2, "save.TButton"),
+        ]
+
+        self.fig, self.ax, self.canvas = self.create_figure()
+        self.general_buttons = []
+        place_general_buttons(self, general_btn_specs, self.general_buttons)
+        self.set_session_frame()
+        self.set_button_frame(
+            row=2, column=1, rowspan=25, label_text="Replace", btn_specs=replace_btn_specs
+        )
+        self.set_button_frame(
+            row=2, column=2, rowspan=25, label_text="Clear", btn_specs=clear_btn_specs
+        )
+        self.tree_max = self.create_treeview(11, 1, 6, "Event", ("Frame", "Value"), (55, 70))
+        self.tree_min = self.create_treeview(11, 2, 6, "Event", ("Frame", "Value"), (55, 70))
+        self.tree_max.bind(
+            "<<TreeviewSelect>>", lambda event: self.select_tree_event(0, self.tree_max)
+        )
+        self.tree_min.bind(
+            "<<TreeviewSelect>>", lambda event: self.select_tree_event(1, self.tree_min)
+        )
 
-        result = messagebox.askyesno(
-            "Save All Events",
-            f"Are you sure you want to save all events?\nThis will save events to:\n\t{output_path}\n\nWith filenames:\n\t{file_prefix}_Maxima.csv\n\t{file_prefix}_Minima.csv\nSelecting 'Yes' will return you to the main window upon saving.",
+        self.load_session(int(subject), condition)
+        self.fig.tight_layout()  # Titles are always two lines, so the layout is only fitted once
+        self.canvas.draw()
+
+        self.iconbitmap("BT_Icon.ico")
+
+        self.columnconfigure(0, weight=2)
+        self.columnconfigure(1, weight=1)
+        self.columnconfigure(2, weight=1)
+        self.columnconfigure(3, weight=0)
+        self.protocol("WM_DELETE_WINDOW", self.close_confirm)
+        self.bind("<Left>", lambda event: self.navigate_key(event, self.previous_plot))
+        self.bind("<Right>", lambda event: self.navigate_key(event, self.next_plot))
+        self.bind("<comma>", lambda event: self.navigate_key(event, lambda: self.cycle_event(-1)))
+        self.bind("<period>", lambda event: self.navigate_key(event, lambda: self.cycle_event(1)))
+        self.focus_set()
+
+    def load_session(self, subject, condition):
+        """Shows the first plot of a subject and condition, resuming its journal if there is one."""
+        if self.journal is not None:
+            self.journal.close()
+        self.subject = subject
+        self.condition = condition
+        self.plots_file = self.session_cube[
+            self.subject_numbers.index(subject)
+        ]  # View into the session cube, no copy
+        if subject not in self.subject_candidates:
+            self.subject_candidates[subject] = EventCandidates(
+                self.plots_file, self.n_events
+            )
+        self.candidates = self.subject_candidates[subject]
+
+        self.plot_idx = 0
+        self.plot_idx_history = set()
+        self.events = new_event_records(
+            subject, condition, self.var_titles, self.trials, self.n_events
+        )  # Holds max and min frames, values and percent of trial length for every trial
+
+        raw_plot_subtitles = []
+        for plot in range(1, self.plots_file.shape[1] + 1):
+            trial_index = (plot - 1) % self.trials
+            trial_title = f"S{subject} C{condition} T{trial_index + 1}"
+            plot_info = f" --> (Plot {plot}/{self.plots_file.shape[1]})"
+            raw_plot_subtitles.append(trial_title + plot_info)
+        self.plot_subtitles = list(
+            islice(cycle(raw_plot_subtitles), self.plots_file.shape[1])
         )
 
-        if result:
-            if os.path.isfile(max_file_path) or os.path.isfile(min_file_path):
-                overwrite = messagebox.askyesno(
-                    "File Exists",
-                    "One or more files already exist at this location. Do you want to overwrite them?",
+        self.journal = self.open_journal(
+            ask=(subject, condition) not in self.visited_sessions
+        )
+        self.visited_sessions.add((subject, condition))
+        self.session_subject.set(subject)
+        self.session_condition.set(condition)
+        self.title(f"Biomechanics Toolbox - Event Picking (S{subject} C{condition})")
+        self.show_current_plot()
+
+    def set_session_frame(self):
+        frame = ttk.Frame(self)
+        frame.grid(row=0, column=1, columnspan=2, padx=10, pady=(10, 0), sticky="n")
+        self.session_subject = tk.StringVar()
+        self.session_condition = tk.StringVar()
+
+        ttk.Label(frame, text="Subject", font=("Helvetica", 10)).grid(row=0, column=0, padx=5)
+        subject_box = ttk.Combobox(
+            frame,
+            textvariable=self.session_subject,
+            values=self.subject_numbers,
+            width=5,
+            state="readonly",
+        )
+        subject_box.grid(row=0, column=1, padx=5)
+        subject_box.bind("<<ComboboxSelected>>", lambda event: self.switch_session())
+        ttk.Label(frame, text="Condition", font=("Helvetica", 10)).grid(row=0, column=2, padx=5)
+        ttk.Entry(  # A batch file holds one condition, so it is shown but cannot be switched here
+            frame, textvariable=self.session_condition, width=5, state="readonly"
+        ).grid(row=0, column=3, padx=5)
+
+    def switch_session(self):
+        subject = int(self.session_subject.get())
+        if subject == self.subject:
+            return
+        if self.journal is None and not messagebox.askyesno(
+            "Switch Subject",
+            f"Picks for S{self.subject} C{self.condition} have not been saved and cannot be resumed. Switch anyway?",
+            parent=self,
+        ):
+            self.session_subject.set(self.subject)
+            return
+        self.load_session(subject, self.condition)
+        self.canvas.draw()
+        self.focus_set()
+
+    def navigate_key(self, event, navigate):
+        if event.widget.winfo_class() in ("TEntry", "TCombobox"):  # Arrow keys are editing text
+            return
+        navigate()
+
+    def show_current_plot(self):
+        self.active_event = None
+        time_series = self.current_series()
+        if self.plot_idx in self.plot_idx_history:  # Plot has happened before
+            max_idx, min_idx = self.get_current_idxs()
+            self.plot_time_series(time_series)
+            self.plot_events(max_idx, min_idx, time_series)
+        else:
+            max_idx, min_idx = self.set_plot(time_series)
+        self.update_tree(self.tree_max, max_idx, time_series)
+        self.update_tree(self.tree_min, min_idx, time_series)
+        if self.plot_idx not in self.plot_idx_history:
+            self.store_max(max_idx, time_series)
+            self.store_min(min_idx, time_series)
+            self.plot_idx_history.add(self.plot_idx)
+
+    def open_journal(self, ask=True):
+        path = journal_path(self.events_out, self.subject, self.condition)
+        resume = False
+        if os.path.isfile(path):
+            try:
+                header, records = read_journal(path)
+            except (OSError, KeyError, ValueError):
+                header, records = {}, []
+            compatible = (
+                header.get("trials") == str(self.trials)
+                and header.get("events") == str(self.n_events)
+                and header.get("variables") == self.var_titles
+            )
+            if records and compatible and not ask:  # Coming back to a session already opened in this window
+                resume = True
+            elif records and compatible:
+                resume = messagebox.askyesno(
+                    "Resume Session",
+                    f"An event picking session for S{self.subject} C{self.condition} was found with {len(records)} recorded edits.\nDo you want to resume it? Selecting No will start over and discard it.",
+                    parent=self,
                 )
-                if not overwrite:
-                    messagebox.showinfo("Save Canceled", "Save operation canceled.")
-                    return
-        if result:
-            all_maxidx_matrix = np.round(all_maxidx_matrix)
-            all_minidx_matrix = np.round(all_minidx_matrix)
-            save_to_csv(
-                max_file_path,
-                [all_maxval_matrix, all_maxidx_matrix, all_maxper_matrix],
-                var_titles,
-                subject,
+            if resume:
+                self.events, visited = journal_records(header, records)
+                self.plot_idx_history.update(visited)
+        try:
+            return EventJournal(
+                path,
+                self.subject,
+                self.condition,
+                self.trials,
+                self.var_titles,
+                self.n_events,
+                resume=resume,
             )
-            save_to_csv(
-                min_file_path,
-                [all_minval_matrix, all_minidx_matrix, all_minper_matrix],
-                var_titles,
-                subject,
+        except OSError:
+            messagebox.showwarning(
+                "Warning",
+                f"Could not write the session journal to:\n\t{path}\n\nEvents will only be kept once saved.",
+                parent=self,
             )
-            return_to_toolbox()
-        else:
-            messagebox.showinfo("Save Canceled", "Save operation canceled.")
-    except PermissionError:
-        messagebox.showerror(
-            "Save Failed",
-            "You do not have permission to save files here. Perhaps the CSV is open?",
+            return None
+
+    def journal_event(self, kind_idx):
+        if self.journal is None:
+            return
+        trial_idx, var_idx = event_position(self.plot_idx, self.trials)
+        trial_records = self.events[kind_idx, :, trial_idx, var_idx]
+        self.journal.record(
+            EVENT_KINDS[kind_idx],
+            self.plot_idx,
+            trial_idx,
+            var_idx,
+            trial_records["frame"],
+            trial_records["value"],
+            trial_records["percent"],
         )
-        return
 
+    def current_series(self):
+        return np.ravel(self.plots_file[:, self.plot_idx])
 
-def event_index(plot_idx):
-    slice_idx = plot_idx // trials
-    remainder = plot_idx % (trials * 3)
-    col = remainder % 5
-    row = 0
+    def create_manipulate_button(
+        self, parent, label, update_func, idx, row, column, sticky, style=None
+    ):
+        button = create_button(
+            parent,
+            label,
+            lambda: update_func(idx),
+            row=row,
+            column=column,
+            sticky=sticky,
+            style=style,
+        )
+        return button
+
+    def place_manipulate_buttons(self, btn_specs, parent):
+        for idx in range(self.n_events):  # Placing Max and Min buttons
+            for label, update_func, sticky, style in btn_specs:
+                self.create_manipulate_button(
+                    parent,
+                    f"{label} {idx+1}",
+                    update_func,
+                    idx,
+                    row=idx + 1,
+                    column=1 if label == "Max" else 2,
+                    sticky=sticky,
+                    style=style,
+                )
 
-    return (row, col, slice_idx)
+    def set_button_frame(self, row, column, rowspan, label_text, btn_specs):
+        frame = ttk.Frame(self)
+        frame.grid(row=row, column=column, rowspan=rowspan, padx=10, pady=10, sticky="n")
 
+        separator = ttk.Separator(frame, orient=tk.HORIZONTAL)
+        separator.grid(row=0, column=1, columnspan=2, sticky="ew")
 
-def update_max_matrices(
-    max_idx,
-    time_series,
-    plot_idx,
-    all_maxidx_matrix,
-    all_maxval_matrix,
-    all_maxper_matrix,
-    trials,
-):
-    def event_index(plot_idx):
-        slice_idx = plot_idx // trials
-        remainder = plot_idx % (trials * 3)
-        col = remainder % 5
-        row = 0
-
-        return (row, col, slice_idx)
-
-    for i, max_index in enumerate(max_idx):
-        idx = event_index(plot_idx)
-        idx_row = idx[0] + i
-        idx = (idx_row, idx[1], idx[2])
-        if np.isnan(max_index):
-            all_maxidx_matrix[idx] = np.nan
-            all_maxval_matrix[idx] = np.nan
-            all_maxper_matrix[idx] = np.nan
-        else:
-            if isinstance(max_index, float):
-                max_index = int(max_index)
-            all_maxidx_matrix[idx] = max_idx[i].astype(int)
-            all_maxval_matrix[idx] = time_series[max_index]
-            all_maxper_matrix[idx] = max_idx[i] / len(time_series) * 100
-
-
-def update_min_matrices(
-    min_idx,
-    time_series,
-    plot_idx,
-    all_minidx_matrix,
-    all_minval_matrix,
-    all_minper_matrix,
-    trials,
-):
-    def event_index(plot_idx):
-        slice_idx = plot_idx // trials
-        remainder = plot_idx % (trials * 3)
-        col = remainder % 5
-        row = 0
-
-        return (row, col, slice_idx)
-
-    for i, min_index in enumerate(min_idx):
-        idx = event_index(plot_idx)
-        idx_row = idx[0] + i
-        idx = (idx_row, idx[1], idx[2])
-        if np.isnan(min_index):
-            all_minidx_matrix[idx] = np.nan
-            all_minval_matrix[idx] = np.nan
-            all_minper_matrix[idx] = np.nan
-        else:
-            if isinstance(min_index, float):
-                min_index = int(min_index)
-            all_minidx_matrix[idx] = min_idx[i].astype(int)
-            all_minval_matrix[idx] = time_series[min_index]
-            all_minper_matrix[idx] = min_idx[i] / len(time_series) * 100
+        label = ttk.Label(frame, text=label_text, font=("Helvetica", 10))
+        label.grid(row=0, column=1, padx=15, columnspan=2)
 
+        self.place_manipulate_buttons(btn_specs, frame)
 
-def get_current_idxs(plot_idx):
-    grab_idx = event_index(plot_idx)
-    max_idx = all_maxidx_matrix[:, grab_idx[1], grab_idx[2]]
-    min_idx = all_minidx_matrix[:, grab_idx[1], grab_idx[2]]
-    return max_idx, min_idx
+    def create_figure(self):
+        fig = Figure(figsize=(5, 4), dpi=100)
+        ax = fig.add_subplot(111)
+        canvas = FigureCanvasTkAgg(fig, master=self)
+        canvas.get_tk_widget().grid(
+            row=0, column=0, columnspan=1, rowspan=20, sticky="w"
+        )
+        ax.set_xlabel("Frame")
+        ax.set_ylabel("Value")
+        ax.spines["right"].set_visible(False)
+        ax.spines["top"].set_visible(False)
+
+        # Persistent artists: navigation swaps their data and event edits are blitted over a cached background
+        (self.series_line,) = ax.plot([], [], color="black", linewidth=1, zorder=1)
+        self.max_markers = ax.scatter(
+            [], [], color="dodgerblue", marker="v", s=70, zorder=2, animated=True
+        )
+        self.min_markers = ax.scatter(
+            [], [], color="firebrick", marker="^", s=70, zorder=2, animated=True
+        )
+        self.max_labels, self.min_labels = [
+            [
+                ax.text(
+                    0,
+                    0,
+                    "",
+                    ha="center",
+                    va=va,
+                    fontdict={"size": 12, "color": color},
+                    animated=True,
+                    visible=False,
+                )
+                for _ in range(self.n_events)
+            ]
+            for va, color in (("bottom", "dodgerblue"), ("top", "firebrick"))
+        ]
+        canvas.mpl_connect("draw_event", self.cache_background)
+        return fig, ax, canvas
+
+    def create_treeview(self, row, column, rowspan, heading_text, columns, column_widths):
+        if column == 1:
+            max_label = ttk.Label(self, text="Maxima", font=("Helvetica", 10))
+            max_label.grid(row=10, column=1, columnspan=1)
+        else:
+            min_label = ttk.Label(self, text="Minima", font=("Helvetica", 10))
+            min_label.grid(row=10, column=2, columnspan=1)
 
+        tree = ttk.Treeview(self)
+        tree.grid(row=row, column=column, rowspan=rowspan, padx=10, sticky="n")
+        tree["columns"] = columns
 
-root = ttk.Window()
-root.bell = lambda: None
-center_window(root, 1050, 525)
+        tree.heading("#0", text=heading_text, anchor="w")
 
-try:
-    subject_in = sys.argv[1]  # Takes subject from main script
-except IndexError:
-    print(
-        "Error: This script isn't expected to run directly, please run BiomechanicsToolbox.py instead."
-    )
-    messagebox.showerror(
-        "Error",
-        "This script isn't expected to run directly, please run BiomechanicsToolbox.py instead.",
-    )
-    sys.exit()
-condition_in = sys.argv[2]  # Takes condition from main script
-plots_file_str = np.load(sys.argv[3])  # Takes data to plot from main script
-plots_file = plots_file_str.astype(float)  # Arrives as DATA x Trial+Var x Subject
-trials = int(sys.argv[4])  # Takes number of trials from main script
-var_titles = sys.argv[5].split()  # Takes variable title from main script
-events_out = sys.argv[6]  # Takes output file from main script
-
-plot_idx = 0
-trial_counter = 0
-plot_idx_history = set()
-find_tolerance = 5
-
-time_series = np.ravel(plots_file[:, plot_idx])
-raw_plot_subtitles = []
-for plot in range(1, plots_file.shape[1] + 1):
-    trial_index = (plot - 1) % trials
-    trial_title = f"S{subject_in} C{condition_in} T{trial_index + 1}"
-    plot_info = f" --> (Plot {plot}/{plots_file.shape[1]})"
-    raw_plot_subtitles.append(trial_title + plot_info)
-plot_subtitles = list(islice(cycle(raw_plot_subtitles), plots_file.shape[1]))
-
-max_btn_style = create_button_style("max.TButton", "white", "dodgerblue")
-min_btn_style = create_button_style("min.TButton", "white", "firebrick")
-navigate_btn_style = create_button_style("navigate.TButton", "white", "slategray")
-save_btn_style = create_button_style("save.TButton", "white", "#FF8200")
-
-replace_btn_specs = [
-    ("Max", update_max, "e", "max.TButton"),
-    ("Min", update_min, "w", "min.TButton"),
-]
-clear_btn_specs = [
-    ("Max", clear_max, "e", "max.TButton"),
-    ("Min", clear_min, "w", "min.TButton"),
-]
-general_btn_specs = [
-    (
-        "Reset Plot",
-        lambda: reset_current(plots_file, ax, plot_idx_history),
-        17,
-        1,
-        "navigate.TButton",
-    ),
-    (
-        "Next Plot",
-        lambda: next_plot(plots_file, ax),
-        1,
-        2,
-        "navigate.TButton",
-    ),
-    (
-        "Previous Plot",
-        lambda: previous_plot(plots_file, ax),
-        1,
-        1,
-        "navigate.TButton",
-    ),
-    (
-        "Save All Events",
-        lambda: save_all_events(
-            all_maxval_matrix,
-            all_maxidx_matrix,
-            all_minval_matrix,
-            all_minidx_matrix,
-            all_maxper_matrix,
-            all_minper_matrix,
-            subject_in,
-            condition_in,
-            events_out,
-            var_titles,
-        ),
-        17,
-        2,
-        "save.TButton",
-    ),
-]
-
-(
-    all_maxval_matrix,
-    all_maxidx_matrix,
-    all_minval_matrix,
-    all_minidx_matrix,
-    all_maxper_matrix,
-    all_minper_matrix,
-) = [
-    np.full((3, trials, int(len(var_titles) / trials)), np.nan) for _ in range(6)
-]  # Creates empty matrices for holding max and min values,indices, percent of trial length (6 total matrices)
-fig, ax, canvas = create_figure()
-max_idx, min_idx = set_plot(ax, time_series)
-general_buttons = []
-place_general_buttons(root, general_btn_specs, general_buttons)
-set_button_frame(
-    root, row=2, column=1, rowspan=25, label_text="Replace", btn_specs=replace_btn_specs
-)
-set_button_frame(
-    root, row=2, column=2, rowspan=25, label_text="Clear", btn_specs=clear_btn_specs
-)
-tree_max = create_treeview(root, 11, 1, 6, "Event", ("Frame", "Value"), (55, 70))
-treeview_contents(tree_max, time_series)
-tree_min = create_treeview(root, 11, 2, 6, "Event", ("Frame", "Value"), (55, 70))
-treeview_contents(tree_min, time_series)
-
-update_max_matrices(
-    max_idx,
-    time_series,
-    plot_idx,
-    all_maxidx_matrix,
-    all_maxval_matrix,
-    all_maxper_matrix,
-    trials,
-)
-update_min_matrices(
-    min_idx,
-    time_series,
-    plot_idx,
-    all_minidx_matrix,
-    all_minval_matrix,
-    all_minper_matrix,
-    trials,
-)
-plot_idx_history.add(plot_idx)
+        for col, width in zip(columns, column_widths):
+            tree.heading(col, text=col)
+            tree.column(col, width=width, minwidth=width, anchor="center")
+        tree.column("#0", width=column_widths[0])
+        tree["height"] = self.n_events + 1
+        return tree
 
+    def update_tree(self, tree, idx_list, time_series):
+        tree.delete(*tree.get_children())
+        for i, idx in enumerate(idx_list):
+            if np.isnan(idx) or idx < 0 or idx >= len(time_series):
+                value = 0
+            else:
+                idx = int(idx)
+                value = time_series[idx]
 
-def return_to_toolbox():
-    messagebox.showinfo(
-        "Save Successful",
-        "Events saved! Returning you to the Biomechanics Toolbox...",
-    )
-    os.remove("reordered_data.npy")  # Deletes the reordered data file upon window close
-    root.destroy()
+            tree.insert(
+                "",
+                "end",
+                text=f"{i + 1}",
+                values=(idx, np.round(value, 3)),
+            )
+        for j in range(len(idx_list), self.n_events):  # Pads the tree to one row per event
+            tree.insert(
+                "",
+                "end",
+                text=f"{j + 1}",
+                values=(np.nan, 0),
+            )
 
+    def plot_time_series(self, data):
+        ax = self.ax
+        var_titles_clean = [
+            title.replace("Right_", "").replace("Left_", "")
+            for title in self.var_titles
+        ]
+        self.series_line.set_data(np.arange(len(data)), data)
+        ax.set_title(
+            f"{var_titles_clean[self.plot_idx]}\n{self.plot_subtitles[self.plot_idx]}"
+        )
+        # scale_plot fixed the previous trial's limits, which turns autoscaling off, and relim would also count the
+        # previous trial's event markers, so fit the limits to the new series alone
+        ax.set_autoscale_on(True)
+        ax.ignore_existing_data_limits = True
+        ax.update_datalim(self.series_line.get_xydata())
+        ax.autoscale_view()
+        scale_plot(ax)
+
+    def place_event_markers(self, markers, labels, idx_list, time_series, offset, label_scale):
+        frames = np.asarray(idx_list, dtype=float)
+        frames = frames[~np.isnan(frames)].astype(int)
+        frames = frames[(frames >= 0) & (frames < len(time_series))]
+        values = time_series[frames]
+        markers.set_offsets(np.column_stack((frames, values + offset)))
+        for counter, label in enumerate(labels):
+            if counter < len(frames):
+                label.set_position((frames[counter], values[counter] + offset * label_scale))
+                label.set_text(f"{counter + 1}")
+                label.set_visible(True)
+            else:
+                label.set_visible(False)
+
+    def plot_events(self, max_idx, min_idx, time_series):
+        y_range = self.ax.get_ylim()[1] - self.ax.get_ylim()[0]
+        offset_percentage = 0.025
+        offset = offset_percentage * y_range
+        self.place_event_markers(
+            self.max_markers, self.max_labels, max_idx, time_series, offset, 2
+        )
+        self.place_event_markers(
+            self.min_markers, self.min_labels, min_idx, time_series, -offset, 2.2
+        )
 
-def close_confirm():
-    if messagebox.askyesno(
-        "Quit",
-        "Are you sure you want to quit? Make sure you have saved your events before proceeding!",
-    ):
-        os.remove(
-            "reordered_data.npy"
-        )  # Deletes the reordered data file upon window close
-        root.destroy()
+    def draw_event_artists(self):
+        for artist in (self.max_markers, self.min_markers, *self.max_labels, *self.min_labels):
+            self.ax.draw_artist(artist)
+
+    def cache_background(self, event):
+        # Every full draw (navigation, resize) leaves a clean plot without markers to blit over
+        self.background = self.canvas.copy_from_bbox(self.fig.bbox)
+        self.draw_event_artists()
+
+    def blit_events(self):
+        if self.background is None:
+            self.canvas.draw()
+            return
+        self.canvas.restore_region(self.background)
+        self.draw_event_artists()
+        self.canvas.blit(self.fig.bbox)
+
+    def set_plot(self, time_series):
+        max_idx, min_idx = self.candidates.default_events(self.plot_idx)
+        self.plot_time_series(time_series)
+        self.plot_events(max_idx, min_idx, time_series)
+
+        return max_idx, min_idx
+
+    def store_max(self, max_idx, time_series):
+        store_events(
+            self.events,
+            0,
+            max_idx,
+            time_series,
+            *event_position(self.plot_idx, self.trials),
+        )
+        self.journal_event(0)
 
+    def store_min(self, min_idx, time_series):
+        store_events(
+            self.events,
+            1,
+            min_idx,
+            time_series,
+            *event_position(self.plot_idx, self.trials),
+        )
+        self.journal_event(1)
+
+    def set_events(self, kind_idx, event_frames):
+        """Sorts one kind of event for the current plot, then stores, lists and redraws it."""
+        time_series = self.current_series()
+        new_idx = sorted(event_frames, key=nan_sort)
+        max_idx, min_idx = self.get_current_idxs()
+        if kind_idx == 0:
+            self.plot_events(new_idx, min_idx, time_series)
+            self.update_tree(self.tree_max, new_idx, time_series)
+            self.store_max(new_idx, time_series)
+        else:
+            self.plot_events(max_idx, new_idx, time_series)
+            self.update_tree(self.tree_min, new_idx, time_series)
+            self.store_min(new_idx, time_series)
+        self.blit_events()
+
+    def pick_event(self, kind_idx, button_idx):
+        if self.pick_cid is not None:
+            self.canvas.mpl_disconnect(self.pick_cid)
+        self.clear_event(kind_idx, button_idx)
+
+        def set_picked_event(event):
+            if event.inaxes and event.button == MouseButton.LEFT:
+                new_frame = self.candidates.snap(kind_idx, self.plot_idx, event.xdata)
+                event_frames = self.get_current_idxs()[kind_idx].copy()
+                event_frames[np.flatnonzero(np.isnan(event_frames))[0]] = new_frame
+                self.set_events(kind_idx, event_frames)
+                self.active_event = (kind_idx, new_frame)
+                self.canvas.mpl_disconnect(self.pick_cid)
+                self.pick_cid = None
+
+        self.pick_cid = self.canvas.mpl_connect("button_press_event", set_picked_event)
+
+    def clear_event(self, kind_idx, button_idx):
+        event_frames = self.get_current_idxs()[kind_idx].copy()
+        event_frames[button_idx] = np.nan
+        self.set_events(kind_idx, event_frames)
+
+    def cycle_event(self, steps):
+        """Moves the last placed or selected event to a neighbouring local extremum of the same kind."""
+        if self.active_event is None:
+            return
+        kind_idx, frame = self.active_event
+        new_frame = self.candidates.step(kind_idx, self.plot_idx, frame, steps)
+        event_frames = self.get_current_idxs()[kind_idx].copy()
+        matches = np.flatnonzero(event_frames == frame)
+        if new_frame is None or len(matches) == 0:
+            return
+        event_frames[matches[0]] = new_frame
+        self.set_events(kind_idx, event_frames)
+        self.active_event = (kind_idx, new_frame)
+
+    def select_tree_event(self, kind_idx, tree):
+        selection = tree.selection()
+        if not selection:
+            return
+        frame = tree.item(selection[0], "values")[0]
+        if frame.isdigit():
+            self.active_event = (kind_idx, int(frame))
+        self.focus_set()  # Lets the cycle shortcuts reach the window
+
+    def update_max(self, button_idx):
+        self.pick_event(0, button_idx)
+
+    def update_min(self, button_idx):
+        self.pick_event(1, button_idx)
+
+    def clear_max(self, button_idx):
+        self.clear_event(0, button_idx)
+
+    def clear_min(self, button_idx):
+        self.clear_event(1, button_idx)
+
+    def reset_current(self):
+        messagebox.showinfo(
+            "Info", "This isn't working right now. Try again later!", parent=self
+        )
 
-root.iconbitmap("BT_Icon.ico")
-root.iconbitmap(default="BT_Icon.ico")
-root.title("Biomechanics Toolbox - Event Picking")
+    def iterate_plot(self):
+        self.show_current_plot()
+        self.canvas.draw()
+
+    def next_plot(self):
+        self.plot_idx += 1
+        if (
+            self.plot_idx > self.plots_file.shape[1] - 1
+        ):  # Catches when we go forward from the last plot
+            self.plot_idx = 0
+            messagebox.showinfo(
+                "Event Picking",
+                "You've reached the last plot! Starting from the first plot. Consider saving events now.",
+                parent=self,
+            )
+        self.iterate_plot()
+
+    def previous_plot(self):
+        self.plot_idx -= 1
+        if self.plot_idx < 0:  # Catches when we go backwards from the first plot
+            self.plot_idx = self.plots_file.shape[1] - 1
+        self.iterate_plot()
+
+    def get_current_idxs(self):
+        trial_idx, var_idx = event_position(self.plot_idx, self.trials)
+        max_idx = self.events["frame"][0, :, trial_idx, var_idx]
+        min_idx = self.events["frame"][1, :, trial_idx, var_idx]
+        return max_idx, min_idx
+
+    def save_all_events(self):
+        subject = self.subject
+        condition = self.condition
+        output_path = self.events_out
+        try:
+            sub_check = messagebox.askyesno(
+                "Subject Confirmation",
+                f"Is the subject number {subject} correct? Selecting No will allow a number input.",
+                parent=self,
+            )
+            if not sub_check:
+                new_subject = simpledialog.askinteger(
+                    "Subject Number Correction",
+                    "Please enter the Subject Number you would like to save:",
+                    minvalue=1,
+                    parent=self,
+                )
+                if new_subject is not None:
+                    subject = new_subject
+                else:
+                    messagebox.showwarning(
+                        "Warning",
+                        "Invalid or no subject number provided. Using original value...",
+                        parent=self,
+                    )
+            event_path = event_file_path(output_path, subject, condition)
 
-root.columnconfigure(0, weight=2)
-root.columnconfigure(1, weight=1)
-root.columnconfigure(2, weight=1)
-root.columnconfigure(3, weight=0)
-root.protocol("WM_DELETE_WINDOW", close_confirm)
-root.bind("<Left>", lambda event: previous_plot(plots_file, ax))
-root.bind("<Right>", lambda event: next_plot(plots_file, ax))
+            result = messagebox.askyesno(
+                "Save All Events",
+                f"Are you sure you want to save all events?\nThis will save events to:\n\t{output_path}\n\nWith filename:\n\t{os.path.basename(event_path)}\n{'Selecting Yes will then offer the next subject.' if self.next_subject() is not None else 'Selecting Yes will return you to the main window upon saving.'}",
+                parent=self,
+            )
 
-root.mainloop()
+            if result:
+                if os.path.isfile(event_path):
+                    overwrite = messagebox.askyesno(
+                        "File Exists",
+                        "This events file already exists at this location. Do you want to overwrite it?",
+                        parent=self,
+                    )
+                    if not overwrite:
+                        messagebox.showinfo(
+                            "Save Canceled", "Save operation canceled.", parent=self
+                        )
+                        return
+            if result:
+                save_event_file(
+                    output_path, self.events, self.var_titles, subject, condition
+                )
+                self.continue_or_return()
+            else:
+                messagebox.showinfo(
+                    "Save Canceled", "Save operation canceled.", parent=self
+                )
+        except PermissionError:
+            messagebox.showerror(
+                "Save Failed",
+                "You do not have permission to save files here. Perhaps the events file is open?",
+                parent=self,
+            )
+            return
+
+    def next_subject(self):
+        position = self.subject_numbers.index(self.subject) + 1
+        if position < len(self.subject_numbers):
+            return self.subject_numbers[position]
+        return None
+
+    def continue_or_return(self):
+        next_subject = self.next_subject()
+        if next_subject is not None and messagebox.askyesno(
+            "Save Successful",
+            f"Events saved! Continue with Subject {next_subject}?\nSelecting No will return you to the Biomechanics Toolbox.",
+            parent=self,
+        ):
+            self.load_session(next_subject, self.condition)
+            self.canvas.draw()
+            return
+        self.return_to_toolbox()
+
+    def return_to_toolbox(self):
+        messagebox.showinfo(
+            "Save Successful",
+            "Events saved! Returning you to the Biomechanics Toolbox...",
+            parent=self,
+        )
+        self.close_window()
+
+    def close_confirm(self):
+        if messagebox.askyesno(
+            "Quit",
+            "Are you sure you want to quit? Unsaved picks are kept in the session journal and can be resumed next time.",
+            parent=self,
+        ):
+            self.close_window()
+
+    def close_window(self):
+        if self.journal is not None:
+            self.journal.close()
+        self.destroy()
+        if self.on_close is not None:
+            self.on_close()
+
+
+if __name__ == "__main__":  # Kept for launching a session from the command line
+    if len(sys.argv) > 2 and sys.argv[1] == "--export-journal":
+        # python EventPickWindow.py --export-journal <journal file> [output directory]
+        print(f"Saved {write_events_from_journal(*sys.argv[2:4])}")
+        sys.exit()
+    if len(sys.argv) > 2 and sys.argv[1] == "--export-csv":
+        # python EventPickWindow.py --export-csv <events .npz file> [output directory]
+        for file_path in export_event_csv(*sys.argv[2:4]):
+            print(f"Saved {file_path}")
+        sys.exit()
+    try:
+        subject_in = sys.argv[1]  # Takes subject from main script
+    except IndexError:
+        print(
+            "Error: This script isn't expected to run directly, please run BiomechanicsToolbox.py instead."
+        )
+        sys.exit()
+    root = ttk.Window()
+    root.withdraw()
+    root.iconbitmap(default="BT_Icon.ico")
+    EventPickWindow(
+        root,
+        np.load(sys.argv[3]).astype(float),  # Arrives as DATA x Trial+Var
+        subject_in,
+        sys.argv[2],  # Condition
+        int(sys.argv[4]),  # Trials
+        sys.argv[5].split(),  # Variable titles
+        sys.argv[6],  # Output directory
+        on_close=root.destroy,
+    )
+    root.mainloop()
@@ -0,0 +1,148 @@
+"""Checks the vectorized SPM engine (ToolboxFunctions.spm_field_tests) against spm1d's own tests.
+
+The engine fits every variable at once on top of spm1d internals (see SPM_FIELD_ENGINE), which a new spm1d release
+may change without notice. This script runs every design on the ExampleFiles/SPM batches through both the engine
+and the public spm1d.stats tests (spm_variable_test) and compares the statistic curves, degrees of freedom,
+smoothness, critical thresholds and clusters. Run it after upgrading spm1d:
+
+    python SPMEngineCheck.py [variables]
+
+It prints the largest relative difference of each design and exits with status 1 if any exceeds the tolerance.
+"""
+
+import os
+import sys
+import warnings
+
+import numpy as np
+
+import ToolboxFunctions as bf
+
+
+TOLERANCE = 1e-8  # Relative; the engine matches spm1d to rounding error
+SUMMARY_FIELDS = ("z", "df", "zstar", "fwhm", "resels", "p_set")
+CLUSTER_FIELDS = ("start", "end", "extent", "p")
+EXAMPLE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ExampleFiles", "SPM")
+
+
+def stacked_design(batches, condition_count=1):
+    """Stacks Subject x Variable x 101 batches, group by group, with their labels as in load_spm_design."""
+    cells = [divmod(cell_idx, condition_count) for cell_idx in range(len(batches))]
+    counts = [len(batch) for batch in batches]
+    labels = (
+        np.repeat([group for group, _ in cells], counts),
+        np.repeat([condition for _, condition in cells], counts),
+        np.concatenate([np.arange(count) for count in counts]),
+    )
+    return np.concatenate(batches), labels
+
+
+def example_designs(variables=None):
+    """Every design of SPM_TESTS built from the two example groups plus noisy copies for the extra batches."""
+    norm_cubes, var_titles, _ = bf.load_spm_groups(
+        [os.path.join(EXAMPLE_DIR, "Group1.txt"), os.path.join(EXAMPLE_DIR, "Group2.txt")]
+    )
+    variables = len(var_titles) if variables is None else variables
+    group_a, group_b = [cube[:, :variables].transpose(2, 1, 0) for cube in norm_cubes]
+    paired = min(len(group_a), len(group_b))
+    rng = np.random.default_rng(0)
+
+    def noisy(batch):
+        return batch + rng.normal(0, 0.5, batch.shape).cumsum(axis=2)
+
+    return {
+        "One-sample t test": stacked_design([group_a]),
+        "Paired t test": stacked_design([group_a[:paired], group_b[:paired]]),
+        "Two-sample t test": stacked_design([group_a, group_b]),
+        "One-way ANOVA": stacked_design([group_a, group_b, noisy(group_a)]),
+        "One-way Rep. Meas.": stacked_design(
+            [group_a[:paired], group_b[:paired], noisy(group_a[:paired])]
+        ),
+        "Two-way ANOVA": stacked_design(
+            [group_a, noisy(group_a), group_b, noisy(group_b)], 2
+        ),
+        "Two-way Mixed": stacked_design(
+            [group_a, noisy(group_a), group_b, noisy(group_b)], 2
+        ),
+        "Two-way Rep. Meas.": stacked_design(
+            [group_a[:paired], noisy(group_a[:paired]), group_b[:paired], noisy(group_b[:paired])],
+            2,
+        ),
+    }
+
+
+def relative_difference(reference, value):
+    reference = np.asarray(reference, dtype=float)
+    value = np.asarray(value, dtype=float)
+    if reference.shape != value.shape or not np.array_equal(np.isnan(reference), np.isnan(value)):
+        return np.inf
+    finite = ~np.isnan(reference)
+    if not finite.any():
+        return 0.0
+    return float(
+        np.max(np.abs(reference[finite] - value[finite]) / np.maximum(np.abs(reference[finite]), 1e-12))
+    )
+
+
+def compare_summaries(reference, engine):
+    """Largest relative difference between two lists of per-variable spm_inference_summary lists."""
+    if len(reference) != len(engine):
+        return np.inf
+    difference = 0.0
+    for reference_effects, engine_effects in zip(reference, engine):
+        if len(reference_effects) != len(engine_effects):
+            return np.inf
+        for reference_summary, engine_summary in zip(reference_effects, engine_effects):
+            if reference_summary["stat"] != engine_summary["stat"] or len(
+                reference_summary["clusters"]
+            ) != len(engine_summary["clusters"]):
+                return np.inf
+            for field in SUMMARY_FIELDS:
+                difference = max(
+                    difference,
+                    relative_difference(reference_summary[field], engine_summary[field]),
+                )
+            for reference_cluster, engine_cluster in zip(
+                reference_summary["clusters"], engine_summary["clusters"]
+            ):
+                for field in CLUSTER_FIELDS:
+                    difference = max(
+                        difference,
+                        relative_difference(reference_cluster[field], engine_cluster[field]),
+                    )
+    return difference
+
+
+def check_engine(variables=None, alpha=0.05, two_tail=True):
+    """Compares the engine with spm1d for every design and variance setting. Returns True if all agree."""
+    if not bf.SPM_FIELD_ENGINE:
+        print(
+            f"spm1d {bf.spm1d.__version__} lacks the internals the vectorized engine needs; every test runs per variable."
+        )
+        return True
+    all_match = True
+    for select_a_test, (y, labels) in example_designs(variables).items():
+        for equal_var in (True, False):
+            job_args = [
+                (select_a_test, y[:, var_idx], labels, alpha, equal_var, two_tail, None)
+                for var_idx in range(y.shape[1])
+            ]
+            if not all(bf.spm_field_supported(args) for args in job_args):
+                continue  # spm1d has no unequal variance version of this test
+            reference = [bf.spm_variable_test(args) for args in job_args]
+            engine = bf.spm_field_tests(
+                select_a_test, y, labels, alpha, equal_var, two_tail, workers=1
+            )
+            difference = compare_summaries(reference, engine)
+            matches = difference <= TOLERANCE
+            all_match &= matches
+            print(
+                f"{'OK  ' if matches else 'FAIL'} {select_a_test:<20} equal_var={equal_var!s:<5} max relative difference {difference:.2e}"
+            )
+    return all_match
+
+
+if __name__ == "__main__":
+    warnings.simplefilter("ignore")  # spm1d warns about its own deprecations
+    print(f"spm1d {bf.spm1d.__version__}, numpy {np.__version__}")
+    sys.exit(0 if check_engine(int(sys.argv[1]) if len(sys.argv) > 1 else None) else 1)
@@ -5,11 +5,18 @@ from tkinter import ttk, filedialog, PhotoImage, messagebox, simpledialog
 import ttkbootstrap as ttk
 import numpy as np
 import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 from matplotlib.backends.backend_pdf import PdfPages
 import pandas as pd
 import re
+import contextlib
+import hashlib
+import zipfile
 import numpy.typing as npt
 import spm1d
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from ToolboxScheduler import call_ui
 
 try:
     import scienceplots
@@ -22,6 +29,56 @@ except Exception as e:
     pass
 
 
+def parallel_map(
+    func, items: list, workers: int = None, progress=None, message: str = ""
+) -> list:
+    """This function applies a function to every item across a pool of worker processes and returns the results in input order.
+
+    INPUTS:
+        func: Module-level function taking one item (must be picklable for the worker processes)
+        items: List of inputs, one per call
+        workers (optional): Number of worker processes, defaults to the CPU count. 1 runs serially in this process
+        progress (optional): Callback as in progress(current, total, message), called as each item finishes
+        message (optional): Message passed to progress
+
+    OUTPUTS:
+        List of results in the same order as items
+
+    DEPENDENCIES:
+        concurrent.futures, OS
+
+    SEE ALSO:
+        None
+
+    Created by Walt Menke (2023) - wmenke597@gmail.com
+    """
+    items = list(items)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(int(workers), len(items)))
+    if workers == 1:
+        results = []
+        for item_idx, item in enumerate(items):
+            if progress is not None:
+                progress(item_idx, len(items), message)
+            results.append(func(item))
+        return results
+
+    results = [None] * len(items)
+    executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        futures = {executor.submit(func, item): idx for idx, item in enumerate(items)}
+        for done_count, future in enumerate(as_completed(futures)):
+            if progress is not None:
+                progress(done_count, len(items), message)
+            results[futures[future]] = future.result()
+    except BaseException:  # Drops queued work when cancelled or on error
+        executor.shutdown(wait=False, cancel_futures=True)
+        raise
+    executor.shutdown()
+    return results
+
+
 def get_vars(
     filename: str,
     unique: int = 0,
@@ -111,7 +168,8 @@ def trim_header(filename: str) -> npt.NDArray:
     try:
         file = file[:, 1:]
     except IndexError:
-        messagebox.showerror(
+        call_ui(
+            messagebox.showerror,
             "Error",
             "The file does not appear to be a valid V3D output file.\nPlease check the file inputs and/or search string and try again.\nTry removing any unnecessary files from the input directory.",
         )
@@ -263,6 +321,7 @@ def batch(
     Y: bool = 1,
     Z: bool = 1,
     normalized: bool = 0,
+    progress=None,
 ) -> None:
     """This function imports user-specified V3D output files from a directory and returns a flattened numpy array containing all rows, columns, and subjects.
 
@@ -276,6 +335,7 @@ def batch(
         Y (optional): Indicates if the Y component was exported for all variables (default is 1)
         Z (optional): Indicates if the Z component was exported for all variables (default is 1)
         normalized: Indicates if the data inputs are normalized (default is 0)
+        progress (optional): Callback as in progress(current, total, message), called once per file read
 
     OUTPUTS:
         numpy array: Returns a flattened array with shape metadata to return the original shape
@@ -363,7 +423,11 @@ def batch(
             Z=Z,
         )
         if normalized == 1:  # Normalized is true
-            for file in file_list:  # Goes through each file one at a time
+            for file_idx, file in enumerate(
+                file_list
+            ):  # Goes through each file one at a time
+                if progress is not None:
+                    progress(file_idx, len(file_list), f"Reading {file}")
                 file_path = os.path.join(
                     input_directory, file
                 )  # Creates path to each file
@@ -399,12 +463,14 @@ def batch(
             output_flat = output.reshape(-1, output.shape[-1])
             save_path = os.path.join(output_directory, file_savename)
             if os.path.isfile(save_path):
-                response = tk.messagebox.askokcancel(
+                response = call_ui(
+                    messagebox.askokcancel,
                     "File Exists",
                     f"The file '{file_savename}' already exists. Do you want to overwrite it?",
                 )
                 if not response:
-                    tk.messagebox.showinfo(
+                    call_ui(
+                        messagebox.showinfo,
                         "Save Canceled",
                         f"File save of '{file_savename}' canceled.",
                     )
@@ -421,7 +487,11 @@ def batch(
             common_cols = None
             cols = 0
 
-            for filename in file_list:  # Goes through each file one at a time
+            for file_idx, filename in enumerate(
+                file_list
+            ):  # Goes through each file one at a time
+                if progress is not None:
+                    progress(file_idx, 2 * len(file_list), f"Sizing {filename}")
                 file_path = os.path.join(
                     input_directory, filename
                 )  # Creates path to each file
@@ -444,7 +514,13 @@ def batch(
             output = np.full(
                 (largest_rows, cols, len(file_list)), np.nan
             )  # Initializes output based on the file with largest row count
-            for file in file_list:
+            for file_idx, file in enumerate(file_list):
+                if progress is not None:
+                    progress(
+                        len(file_list) + file_idx,
+                        2 * len(file_list),
+                        f"Reading {file}",
+                    )
                 file_path = os.path.join(input_directory, file)
                 with open(file_path, "r") as f:
                     contents = trim_header(file_path)
@@ -461,12 +537,14 @@ def batch(
             output_flat = output.reshape(-1, output.shape[-1])
             save_path = os.path.join(output_directory, file_savename)
             if os.path.isfile(save_path):
-                response = tk.messagebox.askokcancel(
+                response = call_ui(
+                    messagebox.askokcancel,
                     "File Exists",
                     f"The file '{file_savename}' already exists. Do you want to overwrite it?",
                 )
                 if not response:
-                    tk.messagebox.showinfo(
+                    call_ui(
+                        messagebox.showinfo,
                         "Save Canceled",
                         f"File save of '{file_savename}' canceled.",
                     )
@@ -478,7 +556,7 @@ def batch(
                 np.savetxt(file, output_flat, fmt="%.8f")
             return
     except (FileNotFoundError, ValueError, TypeError, NotADirectoryError) as e:
-        tk.messagebox.showerror("Error", str(e))
+        call_ui(messagebox.showerror, "Error", str(e))
         return True  # Returns true to the main script to halt execution
 
 
@@ -542,7 +620,8 @@ def quality_check(batch_input: str, subject_idx: int) -> tuple[plt.Figure, plt.A
         ]  # Append Trial to each label
 
         for j in range(num_3x3_plots):  # Iterate through the number of 3x3 subplots
-            fig, axes = plt.subplots(3, 3, figsize=(10, 8))  # Create subplots
+            fig = Figure(figsize=(10, 8))  # Not managed by pyplot, safe off the UI thread
+            axes = fig.subplots(3, 3)  # Create subplots
             # fig.tight_layout()
             fig.suptitle(
                 f"File Number {subject_idx+1} from '{true_file}' - Page {j+1}"
@@ -563,15 +642,15 @@ def quality_check(batch_input: str, subject_idx: int) -> tuple[plt.Figure, plt.A
                 except IndexError:
                     ax.plot([], [])  # set empty plot when end of list is reached
                     break
-                plt.subplots_adjust(wspace=0.4, hspace=0.4, top=0.9)  # Adjust spacing
+                fig.subplots_adjust(wspace=0.4, hspace=0.4, top=0.9)  # Adjust spacing
 
             start_col += 9  # Update the starting column for the next set of subplots
             plot_list.append(fig)  # Append the figure to the plot list
-            plt.figlegend(legend_labels, loc="lower center", ncol=5)  # Add the legend
+            fig.legend(legend_labels, loc="lower center", ncol=5)  # Add the legend
 
         return plot_list
     except (FileNotFoundError, ValueError, TypeError, NotADirectoryError) as e:
-        tk.messagebox.showerror("Error", str(e))
+        call_ui(messagebox.showerror, "Error", str(e))
         return
 
 
@@ -620,7 +699,7 @@ def batch_reshape(batch_input: str) -> tuple[npt.NDArray, list, list, list]:
             )
             return qual_check_in, var_list, comp_split, comp_list
     except ValueError as e:
-        tk.messagebox.showerror("Value Error", str(e))
+        call_ui(messagebox.showerror, "Value Error", str(e))
         return
 
 
@@ -660,15 +739,18 @@ def qual_metadata(batch_input: str) -> int:
                 )
             return plot_per_sub, sub_count
     except ValueError as e:
-        tk.messagebox.showerror("Value Error", str(e))
+        call_ui(messagebox.showerror, "Value Error", str(e))
         return
 
 
-def normalize(batched_file_location: str, output_file_location: str) -> None:
+def normalize(
+    batched_file_location: str, output_file_location: str, progress=None
+) -> None:
     """This function imports a batched output from batch() and normalizes the data to 101 data points, saving with "_Normalized" appended.
 
     INPUTS:
         batched_file_location: Output from batch()
+        progress (optional): Callback as in progress(current, total, message), called once per subject
 
     OUTPUTS:
         norm_cube: Normalized data
@@ -685,7 +767,8 @@ def normalize(batched_file_location: str, output_file_location: str) -> None:
         batched_file_location
     )
     if data_cube.shape[0] == 101:
-        result = messagebox.askyesno(
+        result = call_ui(
+            messagebox.askyesno,
             "Warning",
             "This data appears to have already been normalized to 101 data points. Continue?",
         )
@@ -710,6 +793,12 @@ def normalize(batched_file_location: str, output_file_location: str) -> None:
     norm_cube = np.full((101, data_cube.shape[1], data_cube.shape[2]), np.nan)
 
     for sub_index in range(norm_cube.shape[2]):
+        if progress is not None:
+            progress(
+                sub_index,
+                norm_cube.shape[2],
+                f"Normalizing subject {sub_index + 1}",
+            )
         for col_index in range(norm_cube.shape[1]):
             column = data_cube[:, col_index, sub_index]
             float_values = column[np.isfinite(column) & (column.dtype == float)]
@@ -725,8 +814,10 @@ def normalize(batched_file_location: str, output_file_location: str) -> None:
     output_path = output_path.replace(os.path.sep, "/")
 
     if os.path.isfile(output_path):
-        result = messagebox.askyesno(
-            "File Exists", "The file already exists. Do you want to overwrite it?"
+        result = call_ui(
+            messagebox.askyesno,
+            "File Exists",
+            "The file already exists. Do you want to overwrite it?",
         )
         if not result:
             return
@@ -738,8 +829,10 @@ def normalize(batched_file_location: str, output_file_location: str) -> None:
             file.write(f"{var_list}\n")
             file.write(f"({comp_split[0]},{comp_split[1]},{comp_split[2]})\n")
             np.savetxt(file, norm_flat, fmt="%.8f")
-            messagebox.showinfo(
-                "Normalization Complete", f"File saved to: {output_path}"
+            call_ui(
+                messagebox.showinfo,
+                "Normalization Complete",
+                f"File saved to: {output_path}",
             )
 
 
@@ -835,10 +928,12 @@ def ensemble_plot(
     """
     try:
         with plt.style.context("science"):
-            fig, ax = plt.subplots(figsize=(5, 5))
+            fig = Figure(figsize=(5, 5))
+            ax = fig.add_subplot()
     except Exception as e:
         print(f"Caught an exception: {e}")
-        fig, ax = plt.subplots(figsize=(5, 5))
+        fig = Figure(figsize=(5, 5))
+        ax = fig.add_subplot()
         params = {
             "font.family": "helvetica",
             "font.size": 10.0,
@@ -886,7 +981,7 @@ def ensemble_plot(
 
     legend = ax.legend(loc="best")
 
-    plt.subplots_adjust(
+    fig.subplots_adjust(
         top=0.85, bottom=0.15, left=0.15, right=0.9, hspace=0.5, wspace=0.5
     )
     legend.get_frame().set_linewidth(0)
@@ -894,64 +989,1391 @@ def ensemble_plot(
     return fig, ax
 
 
+try:  # spm1d internals the vectorized engine fits with. Should a release move them, every test runs per variable
+    from spm1d.stats._reml import estimate_df_T, estimate_df_anova1
+    from spm1d.stats._spm import SPM_F, SPM_T
+    from spm1d.stats.anova import designs as spm_designs
+    from spm1d.stats.anova.models import LinearModel
+    from spm1d.stats.anova.ui import aov
+
+    SPM_FIELD_ENGINE = True
+except ImportError:
+    SPM_FIELD_ENGINE = False
+
+SPM_TESTS = {
+    "One-sample t test": spm1d.stats.ttest,
+    "Paired t test": spm1d.stats.ttest_paired,
+    "Two-sample t test": spm1d.stats.ttest2,
+    "One-way ANOVA": spm1d.stats.anova1,
+    "One-way Rep. Meas.": spm1d.stats.anova1rm,
+    "Two-way ANOVA": spm1d.stats.anova2,
+    "Two-way Mixed": spm1d.stats.anova2onerm,
+    "Two-way Rep. Meas.": spm1d.stats.anova2rm,
+}
+SPM_NONPARAM_TESTS = {
+    "One-sample t test": spm1d.stats.nonparam.ttest,
+    "Paired t test": spm1d.stats.nonparam.ttest_paired,
+    "Two-sample t test": spm1d.stats.nonparam.ttest2,
+    "One-way ANOVA": spm1d.stats.nonparam.anova1,
+    "One-way Rep. Meas.": spm1d.stats.nonparam.anova1rm,
+    "Two-way ANOVA": spm1d.stats.nonparam.anova2,
+    "Two-way Mixed": spm1d.stats.nonparam.anova2onerm,
+    "Two-way Rep. Meas.": spm1d.stats.nonparam.anova2rm,
+}
+SPM_VECTOR_TESTS = {  # Hotelling's T² / MANOVA versions, testing a variable's X/Y/Z components jointly
+    "One-sample t test": spm1d.stats.hotellings,
+    "Paired t test": spm1d.stats.hotellings_paired,
+    "Two-sample t test": spm1d.stats.hotellings2,
+    "One-way ANOVA": spm1d.stats.manova1,
+}
+SPM_NONPARAM_VECTOR_TESTS = {
+    "One-sample t test": spm1d.stats.nonparam.hotellings,
+    "Paired t test": spm1d.stats.nonparam.hotellings_paired,
+    "Two-sample t test": spm1d.stats.nonparam.hotellings2,
+    "One-way ANOVA": spm1d.stats.nonparam.manova1,
+}
+SPM_VECTOR_EQUAL_VAR_TESTS = ("Two-sample t test", "One-way ANOVA")  # spm1d only pools the covariance
+SPM_TWO_WAY_TESTS = ("Two-way ANOVA", "Two-way Mixed", "Two-way Rep. Meas.")
+SPM_EFFECTS = ("Group", "Condition", "Group x Condition")
+SPM_EQUAL_VAR_TESTS = ("One-way Rep. Meas.",) + SPM_TWO_WAY_TESTS  # spm1d has no unequal variance version
+SPM_REPEATED_TESTS = {  # Tests comparing the same subjects across batches, and which batches share them
+    "Paired t test": "all",
+    "One-way Rep. Meas.": "all",
+    "Two-way Rep. Meas.": "all",
+    "Two-way Mixed": "group",
+}
+
+
+def spm_test_options(
+    group_count: int, condition_count: int = 1, vector_field: bool = False
+) -> list:
+    """This function lists the SPM tests available for a number of groups and conditions.
+
+    INPUTS:
+        group_count: Number of groups
+        condition_count (optional): Number of conditions per group
+        vector_field (optional): Whether the components of each variable are tested jointly, which only the tests in
+            SPM_VECTOR_TESTS can do
+
+    OUTPUTS:
+        Names of the available tests, as in SPM_TESTS. Two-way designs need at least two groups and two conditions
+
+    DEPENDENCIES:
+        None
+
+    SEE ALSO:
+        load_spm_design, spm_analysis
+
+    Created by Walt Menke (2023) - wmenke597@gmail.com
+    """
+    if condition_count > 1:
+        test_options = list(SPM_TWO_WAY_TESTS) if group_count > 1 else []
+    elif group_count == 1:
+        test_options = ["One-sample t test"]
+    elif group_count == 2:
+        test_options = ["Paired t test", "Two-sample t test"]
+    else:
+        test_options = ["One-way ANOVA", "One-way Rep. Meas."]
+    if vector_field:
+        return [test for test in test_options if test in SPM_VECTOR_TESTS]
+    return test_options
+
+
+def spm_factor_labels(select_a_test: str, labels: tuple) -> tuple:
+    """This function turns the row labels of a loaded SPM design into the factor labels spm1d's tests take.
+
+    INPUTS:
+        select_a_test: Name of the test, as in SPM_TESTS
+        labels: Tuple of the group, condition and subject row (within its batch) of every stacked row
+
+    OUTPUTS:
+        Group (factor A), condition (factor B) and subject labels. Subjects are matched by their row in each batch,
+        except in the mixed design where every group has its own subjects
+
+    DEPENDENCIES:
+        Numpy
+
+    SEE ALSO:
+        load_spm_design, spm_variable_test
+
+    Created by Walt Menke (2023) - wmenke597@gmail.com
+    """
+    group, condition, row = labels
+    if select_a_test == "Two-way Mixed":
+        return group, condition, group * (row.max() + 1) + row
+    return group, condition, row
+
+
+def spm_variable_test(job_args: tuple) -> list:
+    """This function runs the selected spm1d test and its inference for a single variable.
+
+    INPUTS:
+        job_args: Tuple of (select_a_test, y, labels, alpha, equal_var, two_tail, permutation), where y is the
+            variable's Subject x 101 slice of the stacked design, labels its (group, condition, row) labels as in
+            load_spm_design and permutation is None for the parametric test or (iterations, seed) for its
+            non-parametric (permutation) equivalent. iterations beyond the number of unique permutations runs them all.
+            A Subject x 101 x Component y runs the test's Hotelling's T² / MANOVA version from SPM_VECTOR_TESTS
+
+    OUTPUTS:
+        One spm_inference_summary per effect: one for t tests and one-way designs, three (SPM_EFFECTS) for two-way
+        designs
+
+    DEPENDENCIES:
+        Numpy, spm1d
+
+    SEE ALSO:
+        spm_compute, parallel_map, spm_field_tests
+
+    Created by Walt Menke (2023) - wmenke597@gmail.com
+    """
+    select_a_test, y, labels, alpha, equal_var, two_tail, permutation = job_args
+    group, condition, subjects = spm_factor_labels(select_a_test, labels)
+    if select_a_test == "One-sample t test":
+        test_args = (y,)
+    elif select_a_test in ("Paired t test", "Two-sample t test"):
+        test_args = (y[group == 0], y[group == 1])
+    elif select_a_test == "One-way ANOVA":
+        test_args = (y, group)
+    elif select_a_test == "One-way Rep. Meas.":
+        test_args = (y, group, subjects)
+    elif select_a_test == "Two-way ANOVA":
+        test_args = (y, group, condition)
+    else:
+        test_args = (y, group, condition, subjects)
+
+    vector_field = y.ndim == 3
+    if permutation is not None:
+        iterations, seed = permutation
+        nonparam_tests = SPM_NONPARAM_VECTOR_TESTS if vector_field else SPM_NONPARAM_TESTS
+        snpm = nonparam_tests[select_a_test](*test_args)  # no equal variance for permutation tests
+        iterations = int(iterations) if int(iterations) < snpm.nPermUnique else -1
+        np.random.seed(int(seed))  # spm1d draws permutations from NumPy's global generator
+        if snpm.STAT != "T":
+            ti = snpm.inference(alpha=float(alpha), iterations=iterations)
+        else:
+            ti = snpm.inference(
+                alpha=float(alpha), two_tailed=two_tail, iterations=iterations
+            )
+    else:
+        tests = SPM_VECTOR_TESTS if vector_field else SPM_TESTS
+        if select_a_test in ("One-sample t test", "Paired t test"):
+            t = tests[select_a_test](*test_args)  # no equal variance for these tests
+        else:
+            t = tests[select_a_test](*test_args, equal_var=equal_var)
+        if t.STAT != "T":
+            ti = t.inference(alpha=float(alpha))  # no two_tailed for ANOVAs, T² or X² statistics
+        else:
+            ti = t.inference(alpha=float(alpha), two_tailed=two_tail)
+    return [
+        spm_inference_summary(effect)
+        for effect in (ti if isinstance(ti, list) else [ti])  # two-way designs give one inference per effect
+    ]
+
+
+def spm_inference_summary(ti) -> dict:
+    """This function reduces an spm1d inference object to the plain arrays kept in an SPM results file.
+
+    INPUTS:
+        ti: spm1d inference object (SPMi)
+
+    OUTPUTS:
+        Dictionary of the statistic (stat, parametric, z, zstar, df, fwhm, resels, p_set, two_tailed) and a list of
+        clusters, each with its endpoints, extent, p-value, centroid and the patch outline spm1d shades. Non-parametric
+        inference has no df, fwhm, resels or p_set, which are left NaN
+
+    DEPENDENCIES:
+        Numpy, spm1d
+
+    SEE ALSO:
+        spm_variable_test, save_spm_results
+
+    Created by Walt Menke (2023) - wmenke597@gmail.com
+    """
+    clusters = []
+    for cluster in ti.clusters:
+        patch_x, patch_z = cluster.get_patch_vertices()
+        endpoints = cluster.endpoints[0] if cluster.iswrapped else cluster.endpoints
+        centroid = cluster.xy[0] if cluster.iswrapped else cluster.xy
+        clusters.append(
+            {
+                "start": float(endpoints[0]),
+                "end": float(endpoints[1]),
+                "extent": float(cluster.extent),
+                "p": float(cluster.P),
+                "x": float(centroid[0]),
+                "y": float(centroid[1]),
+                "patch_x": np.asarray(patch_x, dtype=float),
+                "patch_z": np.asarray(patch_z, dtype=float),
+            }
+        )
+    return {
+        "stat": ti.STAT,
+        "parametric": bool(ti.isparametric),
+        "z": np.asarray(ti.z, dtype=float),
+        "zstar": float(ti.zstar),
+        "df": np.asarray(getattr(ti, "df", (np.nan, np.nan)), dtype=float),
+        "fwhm": float(getattr(ti, "fwhm", np.nan)),
+        "resels": np.asarray(getattr(ti, "resels", (np.nan, np.nan)), dtype=float),
+        "p_set": float(getattr(ti, "p_set", np.nan)),
+        "two_tailed": bool(ti.two_tailed),
+        "clusters": clusters,
+    }
+
+
+def spm_field_supported(job_args: tuple) -> bool:
+    """This function checks whether a variable's test can be run by the vectorized engine in spm_field_statistics.
+
+    INPUTS:
+        job_args: Tuple of (select_a_test, y, labels, alpha, equal_var, two_tail, permutation), as in
+            spm_variable_test
+
+    OUTPUTS:
+        True for parametric tests on finite scalar data, except the unequal variance versions of SPM_EQUAL_VAR_TESTS
+        which spm1d does not implement. Anything else, including vector fields, is left to spm_variable_test, as is
+        every test when the spm1d internals the engine needs are missing (SPM_FIELD_ENGINE)
+
+    DEPENDENCIES:
+        Numpy
+
+    SEE ALSO:
+        spm_field_statistics, spm_compute
+
+    Created by Walt Menke (2023) - wmenke597@gmail.com
+    """
+    select_a_test, y, labels, alpha, equal_var, two_tail, permutation = job_args
+    if (
+        not SPM_FIELD_ENGINE
+        or permutation is not None
+        or select_a_test not in SPM_TESTS
+        or y.ndim != 2
+    ):
+        return False
+    if select_a_test in SPM_EQUAL_VAR_TESTS and not equal_var:
+        return False
+    return bool(np.all(np.isfinite(y)))
+
+
+def spm_field_smoothness(residuals: npt.NDArray) -> tuple[npt.NDArray, npt.NDArray]:
+    """This function estimates the residual smoothness and resel counts of every variable at once, as rft1d does for one.
+
+    INPUTS:
+        residuals: Subject x Variable x Node array of model residuals
+
+    OUTPUTS:
+        FWHM of each variable and its (0D, 1D) resel counts as a Variable x 2 array, assuming unbroken fields
+
+    DEPENDENCIES:
+        Numpy
+
+    SEE ALSO:
+        spm_field_statistics
+
+    Created by Walt Menke (2023) - wmenke597@gmail.com
+    """
+    eps = np.finfo(float).eps
+    ssq = (residuals**2).sum(axis=0)
+    dx = np.gradient(residuals, axis=2)
+    resels_per_node = np.sqrt((dx**2).sum(axis=0) / (ssq + eps) / (4 * np.log(2)))
+    fwhm = 1 / np.nanmean(resels_per_node, axis=1)  # Zero variance nodes are ignored
+    resels = np.column_stack((np.ones_like(fwhm), (residuals.shape[2] - 1) / fwhm))
+    return fwhm, resels
+
+
+def spm_field_statistics(
+    select_a_test: str, y: npt.NDArray, labels: tuple, equal_var: bool = False
+) -> list:
+    """This function computes the test statistic curves of every variable in one set of array operations.
+
+    INPUTS:
+        select_a_test: Name of the test, as in SPM_TESTS
+        y: Subject x Variable x 101 stacked design, with finite values only, as in load_spm_design
+        labels: Tuple of the group, condition and subject row of every stacked row, as in load_spm_design
+        equal_var (optional): Whether to assume equal variances. Otherwise the degrees of freedom of the two-sample
+            t test and one-way ANOVA are corrected per variable with spm1d's REML estimates, as spm1d itself does
+
+    OUTPUTS:
+        Per variable, a list of one spm1d SPM_T or SPM_F object per effect, ready for inference. The model is fit
+        once for all variables by treating their nodes as one long field, then split back into variables for the
+        smoothness estimates
+
+    DEPENDENCIES:
+        Numpy, spm1d
+
+    SEE ALSO:
+        spm_field_supported, spm_field_tests, spm_variable_test
+
+    Created by Walt Menke (2023) - wmenke597@gmail.com
+    """
+    group, condition, subjects = spm_factor_labels(select_a_test, labels)
+    design = None
+    if select_a_test == "One-way ANOVA":
+        design = spm_designs.ANOVA1(group)
+    elif select_a_test == "One-way Rep. Meas.":
+        design = spm_designs.ANOVA1rm(group, subjects)
+    elif select_a_test == "Two-way ANOVA":
+        design = spm_designs.ANOVA2(group, condition)
+    elif select_a_test == "Two-way Mixed":
+        design = spm_designs.ANOVA2onerm(group, condition, subjects)
+    elif select_a_test == "Two-way Rep. Meas.":
+        design = spm_designs.ANOVA2rm(group, condition, subjects)
+    elif select_a_test == "Two-sample t test":
+        y = np.concatenate((y[group == 0], y[group == 1]))
+        x = np.zeros((len(y), 2))
+        x[: np.count_nonzero(group == 0), 0] = 1
+        x[np.count_nonzero(group == 0) :, 1] = 1
+    elif select_a_test == "Paired t test":
+        y = y[group == 0] - y[group == 1]
+        x = np.ones((len(y), 1))
+    else:
+        x = np.ones((len(y), 1))
+    subject_count, var_count, node_count = y.shape
+    flat_y = y.reshape(subject_count, var_count * node_count)
+
+    if design is not None:
+        x = design.X
+        two_way = select_a_test in SPM_TWO_WAY_TESTS
+        model = LinearModel(flat_y, x)
+        single_responses = select_a_test in SPM_REPEATED_TESTS and (
+            design.check_for_single_responses(dim=0)
+        )
+        if single_responses:  # spm1d approximates the residuals in this case
+            model.fit(approx_residuals=design.contrasts.C[: 5 if two_way else 3])
+        else:
+            model.fit()
+        effects = aov(
+            model, design.contrasts, design.f_terms, nFactors=2 if two_way else 1
+        )
+        sigma2 = None
+    else:
+        effects = [spm1d.stats.glm(flat_y, x, (1, -1) if x.shape[1] == 2 else (1,))]
+        sigma2 = effects[0].sigma2.reshape(var_count, node_count)
+    z = [effect.z.reshape(var_count, node_count) for effect in effects]
+    beta = effects[0].beta.reshape(-1, var_count, node_count)
+    residuals = effects[0].residuals.reshape(subject_count, var_count, node_count)
+    fwhm, resels = spm_field_smoothness(residuals)
+
+    if not equal_var and select_a_test == "Two-sample t test":
+        group_size = np.count_nonzero(group == 0)
+        q_a, q_b = np.zeros((2, subject_count, subject_count))
+        q_a[:group_size, :group_size] = np.eye(group_size)
+        q_b[group_size:, group_size:] = np.eye(subject_count - group_size)
+
+    fields = []
+    for i in range(var_count):
+        df = None  # Each effect's own degrees of freedom unless corrected below
+        if not equal_var and select_a_test == "Two-sample t test":
+            df = (
+                1,
+                estimate_df_T(
+                    y[:, i], x, residuals[:, i], [q_a, q_b]
+                ),
+            )
+        elif not equal_var and select_a_test == "One-way ANOVA":
+            df = estimate_df_anova1(
+                y[:, i], x, residuals[:, i], design.A.get_Q(), design.contrasts.C.T
+            )
+        if design is not None:
+            fields.append(
+                [
+                    SPM_F(
+                        effect_z[i],
+                        effect.df if df is None else df,
+                        fwhm[i],
+                        resels[i],
+                        x,
+                        beta[:, i],
+                        residuals[:, i],
+                        X0=effect.X0,
+                    )
+                    for effect, effect_z in zip(effects, z)
+                ]
+            )
+        else:
+            fields.append(
+                [
+                    SPM_T(
+                        z[0][i],
+                        effects[0].df if df is None else df,
+                        fwhm[i],
+                        resels[i],
+                        x,
+                        beta[:, i],
+                        residuals[:, i],
+                        sigma2=sigma2[i],
+                    )
+                ]
+            )
+    return fields
+
+
+def spm_field_inference(job_args: tuple) -> dict:
+    """This function runs the inference of one variable's statistic curve from spm_field_statistics.
+
+    INPUTS:
+        job_args: Tuple of (field, alpha, two_tail), where field is an spm1d SPM_T or SPM_F object
+
+    OUTPUTS:
+        Summary of the spm1d inference as returned by spm_inference_summary
+
+    DEPENDENCIES:
+        spm1d
+
+    SEE ALSO:
+        spm_field_tests, parallel_map
+
+    Created by Walt Menke (2023) - wmenke597@gmail.com
+    """
+    field, alpha, two_tail = job_args
+    if field.STAT == "F":
+        ti = field.inference(alpha=float(alpha))  # no two_tailed for F statistics
+    else:
+        ti = field.inference(alpha=float(alpha), two_tailed=two_tail)
+    return spm_inference_summary(ti)
+
+
+def spm_field_tests(
+    select_a_test: str,
+    y: npt.NDArray,
+    labels: tuple,
+    alpha: float = 0.05,
+    equal_var: bool = False,
+    two_tail: bool = True,
+    workers: int = None,
+    progress=None,
+) -> list:
+    """This function runs the parametric test of every variable through the vectorized engine.
+
+    INPUTS:
+        select_a_test: Name of the test, as in SPM_TESTS
+        y: Subject x Variable x 101 stacked design, as in load_spm_design
+        labels: Tuple of the group, condition and subject row of every stacked row, as in load_spm_design
+        alpha (optional): Significance level
+        equal_var (optional): Whether to assume equal variances
+        two_tail (optional): Whether to use the two-tailed or one-tailed test
+        workers (optional): Number of worker processes the per-variable inference is spread over, defaults to the CPU
+            count. The statistic curves themselves are computed once in this process
+        progress (optional): Callback as in progress(current, total, message), called once per effect inference
+
+    OUTPUTS:
+        Per variable, one summary per effect as returned by spm_variable_test
+
+    DEPENDENCIES:
+        Numpy, spm1d
+
+    SEE ALSO:
+        spm_field_statistics, spm_variable_test, spm_compute
+
+    Created by Walt Menke (2023) - wmenke597@gmail.com
+    """
+    fields = spm_field_statistics(select_a_test, y, labels, equal_var)
+    effect_summaries = iter(
+        parallel_map(
+            spm_field_inference,
+            [(field, alpha, two_tail) for var_fields in fields for field in var_fields],
+            workers=workers,
+            progress=progress,
+            message=f"Testing {len(fields)} variables",
+        )
+    )
+    return [[next(effect_summaries) for _ in var_fields] for var_fields in fields]
+
+
+SPM_RESULTS_FORMAT = "BIOMECHANICS_TOOLBOX_SPM"
+SPM_RESULTS_VERSION = 1
+SPM_RESULTS_NAME = "SPM_Results.npz"
+SPM_CACHE_NAME = "SPM_Results.cache"
+SPM_CACHE_FORMAT = "BIOMECHANICS_TOOLBOX_SPM_CACHE"
+SPM_CACHE_VERSION = 1
+SPM_CLUSTER_FIELDS = ("start", "end", "extent", "p", "x", "y")
+SPM_PLOT_FORMATS = ("TIFF", "PDF", "PNG")
+SPM_PDF_NAME = "All_SPM_Plots.pdf"
+
+
+def load_spm_groups(group_inputs: list) -> tuple[list, list, list]:
+    """This function loads the batch of every SPM group and checks that they can be compared.
+
+    INPUTS:
+        group_inputs: Paths to the batch files of each group
+
+    OUTPUTS:
+        List of the groups' 101 x Var x Subject cubes, the plot title of every variable, as in "Ankle Angle X", and the
+        components each variable was batched with, as in ["X", "Y", "Z"]
+
+    DEPENDENCIES:
+        Numpy
+
+    SEE ALSO:
+        batch_reshape, spm_compute
+
+    Created by Walt Menke (2023) - wmenke597@gmail.com
+    """
+    norm_cubes = []
+    var_list = []
+    comp_list = []
+    for group_input in group_inputs:
+        group_norm_cube, group_var_list, _, group_comp_list = batch_reshape(group_input)
+        stripped_lists = [
+            (var.replace("Right", "").replace("Left", "")) for var in group_var_list
+        ]
+        if len(group_var_list) % len(group_comp_list) != 0:
+            raise ValueError(
+                "Number of variables not divisible by the number of components."
+            )
+        norm_cubes.append(group_norm_cube)
+        var_list = stripped_lists
+        comp_list = group_comp_list
+
+    cube_shape_check = norm_cubes[0].shape[:2]
+    if any(cube.shape[:2] != cube_shape_check for cube in norm_cubes):
+        raise ValueError(
+            "Inconsistent norm_cubes shapes across iterations. Check all group(s) input data shape at the top of the Batch."
+        )  # Subject counts may differ, load_spm_design checks them for repeated measures
+    if any(cube.shape[0] != 101 for cube in norm_cubes):
+        raise ValueError(
+            "Data for the SPM functions must be normalized to 101 points. Check all group(s) input data shape."
+        )
+
+    raw_var_list = [
+        f"{original} {xyz}"
+        for original, xyz in zip(
+            var_list, comp_list * (len(var_list) // len(comp_list) + 1)
+        )
+    ]
+    true_var_list = [
+        "".join(
+            [
+                (
+                    " " + char
+                    if char.isupper() and i > 0 and raw_var_list[idx][i - 1].islower()
+                    else char
+                )
+                for i, char in enumerate(word)
+            ]
+        )
+        for idx, word in enumerate(raw_var_list)
+    ]
+    return norm_cubes, true_var_list, comp_list
+
+
+def load_spm_design(
+    select_a_test: str,
+    group_inputs: list,
+    condition_count: int = 1,
+    vector_field: bool = False,
+) -> dict:
+    """This function loads every batch of an SPM design once and stacks them for the per-variable tests.
+
+    INPUTS:
+        select_a_test: Name of the test, as in SPM_TESTS
+        group_inputs: Paths to the batch file of every group and condition, group by group, as in
+            [G1 C1, G1 C2, G2 C1, G2 C2]
+        condition_count (optional): Number of conditions per group
+        vector_field (optional): Whether to stack the components of each variable together for a vector-field test
+
+    OUTPUTS:
+        Dictionary of the Subject x Variable x 101 stacked data "y", the "group", "condition" and "row" (subject
+        within its batch) label of every stacked row, the (group, condition) of every batch as "cells", the plot
+        title of every variable as "var_titles" and its "components". Tests slice y per variable instead of
+        re-reading the batches. For vector fields y is Subject x Variable x 101 x Component, with one variable (and
+        title, as in "Ankle Angle") per group of component columns
+
+    DEPENDENCIES:
+        Numpy
+
+    SEE ALSO:
+        load_spm_groups, spm_factor_labels, spm_compute
+
+    Created by Walt Menke (2023) - wmenke597@gmail.com
+    """
+    if condition_count < 1 or len(group_inputs) % condition_count != 0:
+        raise ValueError("Every group needs one batch file per condition.")
+    norm_cubes, true_var_list, comp_list = load_spm_groups(group_inputs)
+    cells = [divmod(cell_idx, condition_count) for cell_idx in range(len(norm_cubes))]
+    subject_counts = [cube.shape[2] for cube in norm_cubes]
+    repeated = SPM_REPEATED_TESTS.get(select_a_test)
+    if repeated == "all" and len(set(subject_counts)) > 1:
+        raise ValueError(
+            f"The {select_a_test} compares the same subjects in every batch, so each batch needs the same number of subjects."
+        )
+    if repeated == "group" and any(
+        len({count for (group, _), count in zip(cells, subject_counts) if group == group_idx}) > 1
+        for group_idx in range(len(norm_cubes) // condition_count)
+    ):
+        raise ValueError(
+            f"The {select_a_test} compares the same subjects across conditions, so each group needs the same number of subjects in every condition."
+        )
+    y = np.concatenate(
+        [cube[:, : len(true_var_list)].transpose(2, 1, 0) for cube in norm_cubes]
+    )
+    components = [""]
+    if vector_field:
+        if len(comp_list) < 2:
+            raise ValueError(
+                "Vector-field SPM needs batches with at least two components (X, Y, Z) per variable."
+            )
+        y = y.reshape(y.shape[0], -1, len(comp_list), y.shape[2])  # Component columns are consecutive
+        y = y.transpose(0, 1, 3, 2)
+        true_var_list = [
+            var_title.rsplit(" ", 1)[0]
+            for var_title in true_var_list[:: len(comp_list)]
+        ]
+        components = comp_list
+    return {
+        "y": y,
+        "group": np.repeat([group for group, _ in cells], subject_counts),
+        "condition": np.repeat([condition for _, condition in cells], subject_counts),
+        "row": np.concatenate([np.arange(count) for count in subject_counts]),
+        "cells": cells,
+        "var_titles": true_var_list,
+        "components": components,
+    }
+
+
+def spm_summary_arrays(summaries: list) -> dict:
+    """This function packs a list of spm_inference_summary dictionaries into the flat arrays of an SPM results file.
+
+    INPUTS:
+        summaries: spm_inference_summary of every row, each with a statistic curve of the same length
+
+    OUTPUTS:
+        Dictionary of one entry per row in "stat", "parametric", "two_tailed", "z", "zstar", "df", "fwhm", "resels"
+        and "p_set", and of one entry per cluster in "cluster_var" (its row) and "cluster_*" (start, end, extent, p and
+        centroid x/y), with the patch outlines packed in "patch_x"/"patch_z" split at "patch_offsets"
+
+    DEPENDENCIES:
+        Numpy
+
+    SEE ALSO:
+        spm_array_summaries, save_spm_results, save_spm_cache
+
+    Created by Walt Menke (2023) - wmenke597@gmail.com
+    """
+    clusters = [
+        (var_idx, cluster)
+        for var_idx, summary in enumerate(summaries)
+        for cluster in summary["clusters"]
+    ]
+    patch_sizes = [len(cluster["patch_x"]) for _, cluster in clusters]
+    cluster_fields = {
+        f"cluster_{field}": np.array([cluster[field] for _, cluster in clusters], dtype=float)
+        for field in SPM_CLUSTER_FIELDS
+    }
+    return dict(
+        stat=np.array([summary["stat"] for summary in summaries], dtype=str),
+        parametric=np.array([summary["parametric"] for summary in summaries], dtype=bool),
+        two_tailed=np.array([summary["two_tailed"] for summary in summaries], dtype=bool),
+        z=np.stack([summary["z"] for summary in summaries]),
+        zstar=np.array([summary["zstar"] for summary in summaries]),
+        df=np.stack([summary["df"] for summary in summaries]),
+        fwhm=np.array([summary["fwhm"] for summary in summaries]),
+        resels=np.stack([summary["resels"] for summary in summaries]),
+        p_set=np.array([summary["p_set"] for summary in summaries]),
+        cluster_var=np.array([var_idx for var_idx, _ in clusters], dtype=int),
+        **cluster_fields,
+        patch_offsets=np.concatenate([[0], np.cumsum(patch_sizes, dtype=int)]).astype(int),
+        patch_x=np.concatenate([cluster["patch_x"] for _, cluster in clusters] or [[]]),
+        patch_z=np.concatenate([cluster["patch_z"] for _, cluster in clusters] or [[]]),
+    )
+
+
+def spm_array_summaries(arrays) -> list:
+    """This function unpacks the arrays written by spm_summary_arrays back into spm_inference_summary dictionaries.
+
+    INPUTS:
+        arrays: Dictionary (or loaded .npz archive) holding the entries spm_summary_arrays returns
+
+    OUTPUTS:
+        spm_inference_summary of every row
+
+    DEPENDENCIES:
+        Numpy
+
+    SEE ALSO:
+        spm_summary_arrays, load_spm_cache
+
+    Created by Walt Menke (2023) - wmenke597@gmail.com
+    """
+    offsets = arrays["patch_offsets"]
+    cluster_var = arrays["cluster_var"]
+    cluster_fields = {field: arrays[f"cluster_{field}"] for field in SPM_CLUSTER_FIELDS}
+    patch_x = arrays["patch_x"]
+    patch_z = arrays["patch_z"]
+    return [
+        {
+            "stat": str(arrays["stat"][var_idx]),
+            "parametric": bool(arrays["parametric"][var_idx]),
+            "z": arrays["z"][var_idx],
+            "zstar": float(arrays["zstar"][var_idx]),
+            "df": arrays["df"][var_idx],
+            "fwhm": float(arrays["fwhm"][var_idx]),
+            "resels": arrays["resels"][var_idx],
+            "p_set": float(arrays["p_set"][var_idx]),
+            "two_tailed": bool(arrays["two_tailed"][var_idx]),
+            "clusters": [
+                dict(
+                    {field: float(values[cluster_idx]) for field, values in cluster_fields.items()},
+                    patch_x=patch_x[offsets[cluster_idx] : offsets[cluster_idx + 1]],
+                    patch_z=patch_z[offsets[cluster_idx] : offsets[cluster_idx + 1]],
+                )
+                for cluster_idx in np.flatnonzero(cluster_var == var_idx)
+            ],
+        }
+        for var_idx in range(len(arrays["stat"]))
+    ]
+
+
+def save_spm_results(
+    results_path: str,
+    select_a_test: str,
+    alpha: float,
+    equal_var: bool,
+    two_tail: bool,
+    design: dict,
+    summaries: list,
+    iterations: int = None,
+    seed: int = 0,
+) -> str:
+    """This function writes the outcome of an SPM run to one compressed .npz results file.
+
+    INPUTS:
+        results_path: Path of the results file
+        select_a_test: Name of the test, as in SPM_TESTS
+        alpha, equal_var, two_tail: Test parameters used
+        design: The loaded design as returned by load_spm_design, kept as the mean and SD curves of every batch
+        summaries: Per variable, one spm_inference_summary per effect, in var_titles order
+        iterations (optional): Permutations per variable for non-parametric runs, None for parametric ones
+        seed (optional): Random seed of the permutations
+
+    OUTPUTS:
+        Path of the results file. Every variable and effect is one plotted row, titled as in "Ankle Angle X" or
+        "Ankle Angle X (Group x Condition)" for two-way designs. Per row it holds the statistic curve "z", threshold
+        "zstar", "df", "fwhm", "resels", "p_set" and whether the inference was "parametric"; clusters are listed in
+        "cluster_*" arrays (row, start, end, extent, p, centroid) with their patch outlines packed in
+        "patch_x"/"patch_z" split at "patch_offsets". "group_mean"/"group_sd" hold the curves of every batch, whose
+        group and condition are in "cell_group"/"cell_condition", and "effects" names the rows of each variable.
+        Vector-field results keep a curve per component in a last axis of "group_mean"/"group_sd", named by
+        "components"
+
+    DEPENDENCIES:
+        Numpy
+
+    SEE ALSO:
+        spm_compute, load_spm_results
+
+    Created by Walt Menke (2023) - wmenke597@gmail.com
+    """
+    effect_count = len(summaries[0])
+    var_titles = [
+        f"{var_title} ({effect})" if effect_count > 1 else var_title
+        for var_title in design["var_titles"]
+        for effect in SPM_EFFECTS[:effect_count]
+    ]
+    summaries = [summary for var_summaries in summaries for summary in var_summaries]
+    cell_rows = [
+        (design["group"] == group) & (design["condition"] == condition)
+        for group, condition in design["cells"]
+    ]
+    with open(results_path, "wb") as results_file:  # np.savez_compressed would append .npz to a path it did not open
+        np.savez_compressed(
+            results_file,
+            format=SPM_RESULTS_FORMAT,
+            version=SPM_RESULTS_VERSION,
+            test=select_a_test,
+            alpha=float(alpha),
+            equal_var=bool(equal_var),
+            two_tail=bool(two_tail),
+            iterations=0 if iterations is None else int(iterations),
+            seed=int(seed),
+            var_titles=np.asarray(var_titles, dtype=str),
+            effects=np.asarray(SPM_EFFECTS[:effect_count] if effect_count > 1 else [""]),
+            components=np.asarray(design["components"]),
+            group_mean=np.stack(
+                [design["y"][rows].mean(axis=0) for rows in cell_rows]
+            ).repeat(effect_count, axis=1),
+            group_sd=np.stack(
+                [design["y"][rows].std(axis=0, ddof=1) for rows in cell_rows]
+            ).repeat(effect_count, axis=1),
+            cell_group=np.array([group for group, _ in design["cells"]], dtype=int),
+            cell_condition=np.array(
+                [condition for _, condition in design["cells"]], dtype=int
+            ),
+            **spm_summary_arrays(summaries),
+        )
+    return results_path
+
+
+def load_spm_results(results_path: str) -> dict:
+    """This function reads an SPM results file written by save_spm_results.
+
+    INPUTS:
+        results_path: Path of the results file
+
+    OUTPUTS:
+        Dictionary of every array in the file, with the scalar entries as plain Python values
+
+    DEPENDENCIES:
+        Numpy
+
+    SEE ALSO:
+        save_spm_results, spm_render
+
+    Created by Walt Menke (2023) - wmenke597@gmail.com
+    """
+    with np.load(results_path, allow_pickle=False) as results_file:
+        results = {
+            key: results_file[key].item() if results_file[key].ndim == 0 else results_file[key]
+            for key in results_file.files
+        }
+    if results.get("format") != SPM_RESULTS_FORMAT:
+        raise ValueError(f"{results_path} is not an SPM results file.")
+    if results["version"] > SPM_RESULTS_VERSION:
+        raise ValueError(
+            f"{results_path} was written by a newer version of the toolbox (results version {results['version']})."
+        )
+    return results
+
+
+class SPMCluster:
+    """A stored suprathreshold cluster, with the attributes spm1d.plot reads from an spm1d cluster."""
+
+    iswrapped = False
+
+    def __init__(self, x, y, p, patch_x, patch_z):
+        self.xy = (x, y)
+        self.P = p
+        self._patch = (patch_x.tolist(), patch_z.tolist())
+
+    def get_patch_vertices(self):
+        return self._patch
+
+
+class SPMResult:
+    """One variable of an SPM results file, with the attributes spm1d.plot reads from an spm1d inference object."""
+
+    roi = None
+
+    def __init__(self, results: dict, var_idx: int):
+        self.STAT = str(results["stat"][var_idx])
+        self.isparametric = bool(results["parametric"][var_idx]) if "parametric" in results else True
+        self.z = results["z"][var_idx]
+        self.Q = len(self.z)
+        self.zstar = float(results["zstar"][var_idx])
+        self.alpha = float(results["alpha"])
+        self.two_tailed = bool(results["two_tailed"][var_idx])
+        offsets = results["patch_offsets"]
+        self.clusters = [
+            SPMCluster(
+                results["cluster_x"][cluster_idx],
+                results["cluster_y"][cluster_idx],
+                float(results["cluster_p"][cluster_idx]),
+                results["patch_x"][offsets[cluster_idx] : offsets[cluster_idx + 1]],
+                results["patch_z"][offsets[cluster_idx] : offsets[cluster_idx + 1]],
+            )
+            for cluster_idx in np.flatnonzero(results["cluster_var"] == var_idx)
+        ]
+        self.nClusters = len(self.clusters)
+        self.p = [cluster.P for cluster in self.clusters]
+
+
+def spm_variable_key(job_args: tuple) -> str:
+    """This function fingerprints one variable's SPM test from its data and test parameters.
+
+    INPUTS:
+        job_args: Tuple of (select_a_test, y, labels, alpha, equal_var, two_tail, permutation) as passed to
+            spm_variable_test
+
+    OUTPUTS:
+        SHA-1 hex digest of the test name, alpha, equal_var, two_tail, permutation settings, the spm1d version, the
+        variable's data and its design labels
+
+    DEPENDENCIES:
+        Numpy, hashlib
+
+    SEE ALSO:
+        spm_compute, spm_variable_test
+
+    Created by Walt Menke (2023) - wmenke597@gmail.com
+    """
+    select_a_test, y, labels, alpha, equal_var, two_tail, permutation = job_args
+    if permutation is not None:
+        permutation = tuple(int(setting) for setting in permutation)
+    digest = hashlib.sha1(
+        repr(
+            (
+                SPM_CACHE_VERSION,
+                spm1d.__version__,
+                select_a_test,
+                float(alpha),
+                bool(equal_var),
+                bool(two_tail),
+                permutation,
+            )
+        ).encode()
+    )
+    for data in (y, *labels):
+        data = np.ascontiguousarray(data, dtype=float)
+        digest.update(repr(data.shape).encode())
+        digest.update(data.tobytes())
+    return digest.hexdigest()
+
+
+def load_spm_cache(cache_path: str) -> dict:
+    """This function reads the per-variable SPM results kept by the last spm_compute run in a folder.
+
+    INPUTS:
+        cache_path: Path of the cache file
+
+    OUTPUTS:
+        Dictionary of spm_variable_key -> list of spm_inference_summary (one per effect), empty if there is no usable
+        cache. The cache is an .npz archive read without pickle, so an unreadable, foreign or outdated file is a miss
+
+    DEPENDENCIES:
+        Numpy
+
+    SEE ALSO:
+        spm_compute, save_spm_cache
+
+    Created by Walt Menke (2023) - wmenke597@gmail.com
+    """
+    try:
+        with np.load(cache_path, allow_pickle=False) as cache:
+            if str(cache["format"]) != SPM_CACHE_FORMAT or int(cache["version"]) != SPM_CACHE_VERSION:
+                return {}
+            summaries = spm_array_summaries(cache)
+            effect_offsets = np.concatenate([[0], np.cumsum(cache["effect_counts"], dtype=int)])
+            return {
+                key: summaries[effect_offsets[key_idx] : effect_offsets[key_idx + 1]]
+                for key_idx, key in enumerate(cache["keys"].tolist())
+            }
+    except (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile):
+        return {}
+
+
+def save_spm_cache(cache_path: str, cached_results: dict) -> None:
+    """This function writes the per-variable SPM results of a run for the next spm_compute in the same folder.
+
+    INPUTS:
+        cache_path: Path of the cache file
+        cached_results: Dictionary of spm_variable_key -> list of spm_inference_summary (one per effect)
+
+    OUTPUTS:
+        None. The summaries are packed as by spm_summary_arrays, with the key and effect count of every variable
+
+    DEPENDENCIES:
+        Numpy
+
+    SEE ALSO:
+        spm_compute, load_spm_cache
+
+    Created by Walt Menke (2023) - wmenke597@gmail.com
+    """
+    temp_path = cache_path + ".tmp"
+    try:
+        with open(temp_path, "wb") as f:  # np.savez would append .npz to a path it did not open
+            np.savez(
+                f,
+                format=SPM_CACHE_FORMAT,
+                version=SPM_CACHE_VERSION,
+                keys=np.asarray(list(cached_results), dtype=str),
+                effect_counts=np.array(
+                    [len(var_summaries) for var_summaries in cached_results.values()], dtype=int
+                ),
+                **spm_summary_arrays(
+                    [summary for var_summaries in cached_results.values() for summary in var_summaries]
+                ),
+            )
+        os.replace(temp_path, cache_path)  # An interrupted run leaves the old cache intact
+    except OSError:
+        pass  # Read-only output folders just run without a cache
+
+
+def spm_compute(
+    select_a_test: str,
+    group_inputs: list,
+    output_path: str,
+    alpha: float = 0.05,
+    equal_var: bool = False,
+    two_tail: bool = True,
+    iterations: int = None,
+    seed: int = 0,
+    workers: int = None,
+    progress=None,
+    use_cache: bool = True,
+    condition_count: int = 1,
+    vector_field: bool = False,
+) -> str:
+    """This function runs an SPM test for every variable without plotting and saves the results to one file.
+
+    Parametric tests are fit for all stale variables at once by spm_field_tests. Non-parametric tests, and variables
+    spm_field_supported rejects, are run one variable at a time by spm_variable_test
+
+    INPUTS:
+        select_a_test: Name of the test, as in SPM_TESTS
+        group_inputs: Paths to the batch file of every group and condition, group by group
+        output_path: Path to the output directory, where SPM_Results.npz is written
+        alpha (optional): Significance level
+        equal_var (optional): Whether to assume equal variances
+        two_tail (optional): Whether to use the two-tailed or one-tailed test
+        iterations (optional): Number of permutations for the non-parametric version of the test. None (default) runs
+            the parametric test
+        seed (optional): Random seed of the permutations, so non-parametric results can be reproduced
+        workers (optional): Number of worker processes the per-variable tests are spread over, defaults to the CPU count.
+            Each variable's permutations run in one worker
+        progress (optional): Callback as in progress(current, total, message), called once per variable test
+        use_cache (optional): Whether to reuse results kept in SPM_Results.cache in the output directory. Variables
+            whose data and test parameters are unchanged since the last run there are not tested again
+        condition_count (optional): Number of conditions per group, above one for two-way designs
+        vector_field (optional): Whether to test the components of each variable jointly, one Hotelling's T² /
+            MANOVA test per variable, instead of one scalar test per component
+
+    OUTPUTS:
+        Path of the results file (see save_spm_results)
+
+    DEPENDENCIES:
+        Numpy, spm1d
+
+    SEE ALSO:
+        spm_render, spm_analysis, spm_variable_test, load_spm_design
+
+    Created by Walt Menke (2023) - wmenke597@gmail.com
+    """
+    design = load_spm_design(select_a_test, group_inputs, condition_count, vector_field)
+    true_var_list = design["var_titles"]
+    labels = (design["group"], design["condition"], design["row"])
+    job_args = [
+        (
+            select_a_test,
+            design["y"][:, i],
+            labels,
+            alpha,
+            equal_var,
+            two_tail,
+            None if iterations is None else (iterations, seed),
+        )
+        for i in range(len(true_var_list))
+    ]
+    cache_path = os.path.join(output_path, SPM_CACHE_NAME)
+    cached_results = load_spm_cache(cache_path) if use_cache else {}
+    keys = [spm_variable_key(args) for args in job_args]
+    stale = [i for i, key in enumerate(keys) if key not in cached_results]
+    field_stale = [i for i in stale if spm_field_supported(job_args[i])]
+    if field_stale:
+        field_summaries = spm_field_tests(
+            select_a_test,
+            design["y"][:, field_stale],
+            labels,
+            alpha,
+            equal_var,
+            two_tail,
+            workers=workers,
+            progress=progress,
+        )  # All variables fit at once, results come back in variable order
+        cached_results.update(
+            (keys[i], summary) for i, summary in zip(field_stale, field_summaries)
+        )
+    variable_stale = [i for i in stale if i not in field_stale]
+    if variable_stale:
+        variable_summaries = parallel_map(
+            spm_variable_test,
+            [job_args[i] for i in variable_stale],
+            workers=workers,
+            progress=progress,
+            message=f"Testing {len(variable_stale)} of {len(true_var_list)} variables",
+        )  # Results come back in variable order
+        cached_results.update(
+            (keys[i], summary)
+            for i, summary in zip(variable_stale, variable_summaries)
+        )
+    summaries = [cached_results[key] for key in keys]
+    if use_cache and (stale or len(cached_results) != len(set(keys))):
+        save_spm_cache(
+            cache_path, {key: cached_results[key] for key in keys}
+        )  # Only this run's variables are kept
+    return save_spm_results(
+        os.path.join(output_path, SPM_RESULTS_NAME),
+        select_a_test,
+        alpha,
+        equal_var,
+        two_tail,
+        design,
+        summaries,
+        iterations=iterations,
+        seed=seed,
+    )
+
+
+def spm_plot_paths(output_path: str, var_titles: list, plot_formats: tuple) -> list:
+    """This function lists the plot files spm_render writes for the given variables and formats.
+
+    INPUTS:
+        output_path: Path to the output directory
+        var_titles: Plot title of every variable, as in "Ankle Angle X"
+        plot_formats: Formats to write, out of SPM_PLOT_FORMATS
+
+    OUTPUTS:
+        Path of every .TIFF and .PNG plot, then All_SPM_Plots.pdf if PDF pages are written
+
+    DEPENDENCIES:
+        None
+
+    SEE ALSO:
+        spm_render, spm_analysis
+
+    Created by Walt Menke (2023) - wmenke597@gmail.com
+    """
+    plot_paths = [
+        os.path.join(output_path, f"{var_title}.{plot_format.lower()}")
+        for var_title in var_titles
+        for plot_format in plot_formats
+        if plot_format != "PDF"
+    ]
+    if "PDF" in plot_formats:
+        plot_paths.append(os.path.join(output_path, SPM_PDF_NAME))
+    return plot_paths
+
+
+def spm_render(
+    results_path: str,
+    output_path: str = None,
+    dpi: int = 300,
+    group_colors: list = None,
+    group_names: list = None,
+    plot_x_label: str = None,
+    plot_y_labels=None,
+    plot_formats: tuple = ("TIFF", "PDF"),
+    condition_names: list = None,
+    progress=None,
+) -> str:
+    """This function draws the SPM plots of a results file, one figure per variable written in each chosen format.
+
+    INPUTS:
+        results_path: Path of a results file written by spm_compute
+        output_path (optional): Path to the output directory, defaults to the folder of the results file
+        dpi (optional): Number of dots per inch for individual .TIFF and .PNG plots
+        group_colors (optional): Line and SD cloud color of each group, reused in turn when there are more groups
+        group_names (optional): Names of the groups for the legend, as in ["Control", "Experimental"] or "Control, Experimental"
+        plot_x_label (optional): Label for the x-axis
+        plot_y_labels (optional): Y-label file (.xlsx) or DataFrame with one label per variable in its first column
+        plot_formats (optional): Formats to write, out of SPM_PLOT_FORMATS. TIFF and PNG plots are encoded from a
+            single raster drawing of each figure, PDF pages are drawn as vector graphics into All_SPM_Plots.pdf
+        condition_names (optional): Names of the conditions for the legend of two-way designs, as for group_names.
+            Each condition of a group is drawn in the group's color with its own line style, as is each component of
+            vector-field results
+        progress (optional): Callback as in progress(current, total, message), called once per plot
+
+    OUTPUTS:
+        Path to the output directory
+
+    DEPENDENCIES:
+        Numpy, spm1d, Matplotlib
+
+    SEE ALSO:
+        spm_compute, load_spm_results
+
+    Created by Walt Menke (2023) - wmenke597@gmail.com
+    """
+    unknown_formats = set(plot_formats) - set(SPM_PLOT_FORMATS)
+    if unknown_formats:
+        raise ValueError(
+            f"Unknown plot format(s): {', '.join(sorted(unknown_formats))}. Choose from {', '.join(SPM_PLOT_FORMATS)}."
+        )
+    raster_formats = [
+        plot_format.lower()
+        for plot_format in ("TIFF", "PNG")
+        if plot_format in plot_formats
+    ]
+    results = load_spm_results(results_path)
+    var_titles = results["var_titles"].tolist()
+    components = results["components"].tolist()
+    cell_count = len(results["group_mean"])
+    group_mean = results["group_mean"].reshape(*results["group_mean"].shape[:3], -1)
+    group_sd = results["group_sd"].reshape(*results["group_sd"].shape[:3], -1)  # Scalar results have one component
+    group_count = int(results["cell_group"].max()) + 1
+    condition_count = int(results["cell_condition"].max()) + 1
+    if output_path is None:
+        output_path = os.path.dirname(results_path)
+    if not group_colors:
+        group_colors = ["black", "blue", "red"]
+    if group_names is None:
+        group_names = []
+    elif isinstance(group_names, str):
+        group_names = [name.strip() for name in group_names.split(",")]
+    group_names = list(group_names) + [
+        f"Group {group_num}" for group_num in range(len(group_names) + 1, group_count + 1)
+    ]
+    if condition_names is None:
+        condition_names = []
+    elif isinstance(condition_names, str):
+        condition_names = [name.strip() for name in condition_names.split(",")]
+    condition_names = list(condition_names) + [
+        f"Condition {condition_num}"
+        for condition_num in range(len(condition_names) + 1, condition_count + 1)
+    ]
+    line_styles = ["-", "--", ":", "-."]
+    if isinstance(plot_y_labels, str):
+        plot_y_labels = pd.read_excel(plot_y_labels, header=None)
+
+    pdf_out = os.path.join(output_path, SPM_PDF_NAME)
+    with (
+        PdfPages(pdf_out) if "PDF" in plot_formats else contextlib.nullcontext()
+    ) as pdf:
+        for i, var_title in enumerate(var_titles):
+            if progress is not None:
+                progress(i, len(var_titles), f"Plotting {var_title}")
+
+            fig = Figure(figsize=(10, 4))
+            axes = fig.subplots(1, 2)
+            fig.subplots_adjust(left=0.1, right=0.95, bottom=0.2, hspace=0.4)
+
+            ax = axes[0]
+            x = np.arange(group_mean.shape[2])
+            for cell_idx in range(cell_count):
+                group_idx = results["cell_group"][cell_idx]
+                condition_idx = results["cell_condition"][cell_idx]
+                line_color = group_colors[group_idx % len(group_colors)]
+                for component_idx, component in enumerate(components):
+                    mean = group_mean[cell_idx, i, :, component_idx]
+                    label = (
+                        f"{group_names[group_idx]} {condition_names[condition_idx]}"
+                        if condition_count > 1
+                        else group_names[group_idx]
+                    )
+                    ax.plot(
+                        x,
+                        mean,
+                        color=line_color,
+                        lw=3,
+                        linestyle=line_styles[
+                            (condition_idx + component_idx) % len(line_styles)
+                        ],  # Vector fields have one condition, two-way designs one component
+                        label=f"{label} {component}" if component else label,
+                    )  # Same mean line and SD cloud as spm1d.plot.plot_mean_sd, from the stored curves
+                    spm1d.plot.plot_errorcloud(
+                        mean,
+                        group_sd[cell_idx, i, :, component_idx],
+                        ax=ax,
+                        x=x,
+                        facecolor=line_color,
+                    )
+                ax.set_xlim(x.min(), x.max())
+            ax.axhline(y=0, color="k", linestyle=":")
+            ax.set_xlabel(plot_x_label)
+            try:
+                ax.set_ylabel(
+                    plot_y_labels.iloc[
+                        i // len(results["effects"]) * len(components), 0
+                    ]
+                )  # Labels follow the batch columns, so a vector field takes its first component's
+            except AttributeError:
+                pass
+            ax.set_title(f"{var_title}")
+
+            ax = axes[1]
+            ti = SPMResult(results, i)
+            spm1d.plot.plot_spmi(ti, ax=ax)
+            spm1d.plot.plot_spmi_threshold_label(ti, fontsize=10, ax=ax)
+            spm1d.plot.plot_spmi_p_values(
+                ti, size=12, offset_all_clusters=(0, 0.3), ax=ax
+            )
+            ax.set_xlabel(plot_x_label)
+
+            fig.legend(
+                loc="lower center",
+                bbox_to_anchor=(0.3, 0),
+                fontsize=10,
+                ncols=(
+                    min(cell_count, 4)
+                    if len(components) == 1
+                    else min(cell_count * len(components), 6)
+                ),  # Component entries of vector fields in one row, clear of the x-axis label
+            )
+
+            if raster_formats:
+                canvas = FigureCanvasAgg(fig)
+                screen_dpi = fig.dpi
+                fig.dpi = int(dpi)
+                canvas.draw()  # Drawn once, then encoded per format as savefig would
+                for plot_format in raster_formats:
+                    plt.imsave(
+                        os.path.join(output_path, f"{var_title}.{plot_format}"),
+                        canvas.buffer_rgba(),
+                        format=plot_format,
+                        dpi=int(dpi),
+                    )
+                fig.dpi = screen_dpi
+            if pdf is not None:
+                pdf.savefig(fig)
+    return output_path
+
+
 def spm_analysis(
     select_a_test: str,
     group_names: list,
-    selected_group: str,
-    g1_in: str,
-    g2_in: str = None,
-    g3_in: str = None,
+    group_inputs: list,
     output_path: str = None,
+    condition_count: int = 1,
     alpha: float = 0.05,
     equal_var: bool = False,
     two_tail: bool = True,
     dpi: int = 300,
-    g1_color: str = "black",
-    g2_color: str = "blue",
-    g3_color: str = "red",
+    group_colors: list = None,
+    condition_names: list = None,
     plot_x_label: str = None,
     plot_y_labels: str = None,
+    plot_formats: tuple = ("TIFF", "PDF"),
+    nonparametric: bool = False,
+    iterations: int = 10000,
+    seed: int = 0,
+    vector_field: bool = False,
+    workers: int = None,
+    progress=None,
 ) -> None:
     """This function perform a Statistical Parametric Mapping analysis with multiple arguments for customization.
 
     INPUTS:
-        g1_in: Path to the first group data cube
-        g2_in: Path to the second group data cube
+        select_a_test: Name of the test, as in SPM_TESTS
+        group_names: Names of the groups for the legend, as in ["Control", "Experimental"]
+        group_inputs: Paths to the batch file of every group and condition, group by group, as in
+            [G1 C1, G1 C2, G2 C1, G2 C2]
         output_path: Path to the output directory
+        condition_count (optional): Number of conditions per group, above one for two-way designs
         alpha (optional): Significance level
-        two_tail (optional): Whether to use the two-tailed or one-tailed test
         equal_var (optional): Whether to assume equal variances
-        dpi (optional): Number of dots per inch for individual .TIFF plots
-        g1_color (optional): Color of the first group
-        g2_color (optional): Color of the second group
+        two_tail (optional): Whether to use the two-tailed or one-tailed test
+        dpi (optional): Number of dots per inch for individual .TIFF and .PNG plots
+        group_colors (optional): Line and SD cloud color of each group
+        condition_names (optional): Names of the conditions for the legend of two-way designs
         plot_x_label (optional): Label for the x-axis
-        group_names (optional): Names of the groups for the legend, as in ["Control", "Experimental"]
+        plot_y_labels (optional): Y-label file (.xlsx) with one label per variable in its first column
+        plot_formats (optional): Formats to draw the plots in after the tests, out of SPM_PLOT_FORMATS. If empty only
+            SPM_Results.npz is written, which spm_render can plot later
+        nonparametric (optional): Whether to run the non-parametric (permutation) version of the test
+        iterations (optional): Number of permutations per variable for non-parametric tests
+        seed (optional): Random seed of the permutations
+        vector_field (optional): Whether to test the X/Y/Z components of each variable jointly with the Hotelling's
+            T² / MANOVA version of the test, giving one test and plot per variable instead of one per component
+        workers (optional): Number of worker processes the per-variable tests are spread over, defaults to the CPU count
+        progress (optional): Callback as in progress(current, total, message), called once per variable test and plot
 
     OUTPUTS:
-        .TIFF file SPM plots for each variable in the original data cube
+        SPM_Results.npz with the statistics of every variable, and an SPM plot in each of plot_formats for each
+        variable in the original data cube (for each effect of two-way designs)
 
     DEPENDENCIES:
         Numpy, spm1d
 
     SEE ALSO:
-        batch
+        batch, spm_compute, spm_render, spm_test_options
 
     Created by Walt Menke (2023) - wmenke597@gmail.com
     """
-    test_options = {
-        "One-sample t test": spm1d.stats.ttest,
-        "Paired t test": spm1d.stats.ttest_paired,
-        "Two-sample t test": spm1d.stats.ttest2,
-        "One-way ANOVA": spm1d.stats.anova1,
-        "One-way Rep. Meas.": spm1d.stats.anova1rm,
-    }
-    selected_test = test_options[select_a_test]
-    group_count = int(selected_group)
-    norm_cubes = []
-    var_list = []
-    comp_list = []
-    if plot_y_labels is None or plot_y_labels == [] or plot_y_labels == "":
-        result = messagebox.askyesno(
+    group_count = len(group_inputs) // int(condition_count)
+    render_plots = bool(plot_formats)
+    if not render_plots:
+        plot_y_labels = None
+    elif plot_y_labels is None or plot_y_labels == [] or plot_y_labels == "":
+        result = call_ui(
+            messagebox.askyesno,
             "Warning",
             "No plot Y-labels provided. Do you want to continue with no labels?",
         )
@@ -964,157 +2386,102 @@ def spm_analysis(
     try:
         if not os.path.exists(output_path):
             raise FileNotFoundError("Output directory does not exist.")
-        if 0 > float(alpha) < 1:
+        if not all(group_inputs) or not all(map(os.path.exists, group_inputs)):
+            raise FileNotFoundError(
+                "Select an existing batch file for every group and condition."
+            )
+        test_options = spm_test_options(group_count, int(condition_count), vector_field)
+        if not test_options:
+            raise ValueError(
+                "spm1d has no vector-field tests for two-way designs. Untick Vector Field to test each component."
+                if vector_field and int(condition_count) > 1
+                else "Two-way designs need at least two groups."
+            )
+        if select_a_test not in test_options:
+            raise ValueError(
+                f"The {select_a_test} is not available for {group_count} group(s) and {condition_count} condition(s){' as a vector field' if vector_field else ''}."
+            )
+        selected_test = (SPM_VECTOR_TESTS if vector_field else SPM_TESTS).get(select_a_test)
+        if selected_test is None:
+            raise ValueError(f"Unknown SPM test: {select_a_test}.")
+        if not 0 < float(alpha) < 1:
             raise ValueError("Significance level must be between 0 and 1.")
         try:
             int(dpi)
-        except TypeError:
+        except (TypeError, ValueError):
             raise TypeError("DPI must be an integer.")
-        if 299 > int(dpi) < 801:
-            raise ValueError("DPI value must be greater than 300 and less than 800.")
-
-        for group in range(1, group_count + 1):
-            group_exists = f"g{group}_in"
-            if group_exists in locals() and locals()[group_exists] is not None:
-                group_norm_cube, group_var_list, _, group_comp_list = batch_reshape(
-                    locals()[f"g{group}_in"]
+        if not 300 <= int(dpi) <= 800:
+            raise ValueError("DPI value must be between 300 and 800.")
+        if nonparametric:
+            try:
+                if int(iterations) < 1:
+                    raise ValueError
+                int(seed)
+            except ValueError:
+                raise ValueError(
+                    "Permutations must be a positive integer and the random seed an integer."
                 )
-                stripped_lists = [
-                    (var.replace("Right", "").replace("Left", ""))
-                    for var in group_var_list
-                ]
-
-                if len(group_var_list) % len(group_comp_list) != 0:
-                    raise ValueError(
-                        "Number of variables not divisible by the number of components."
-                    )
-                try:
-                    if len(group_var_list) != len(plot_y_labels):
-                        raise ValueError(
-                            "Number of variables not equal to number of plot Y-labels."
-                        )
-                except:
-                    pass
-
-                norm_cubes.append(group_norm_cube)
-                var_list = stripped_lists
-                comp_list = group_comp_list
-
-        cube_shape_check = norm_cubes[0].shape
-        if any(cube.shape != cube_shape_check for cube in norm_cubes):
-            raise ValueError(
-                "Inconsistent norm_cubes shapes across iterations. Check all group(s) input data shape at the top of the Batch."
-            )
-        if any(cube.shape[0] != 101 for cube in norm_cubes):
+        elif not equal_var and select_a_test in (
+            SPM_VECTOR_EQUAL_VAR_TESTS if vector_field else SPM_EQUAL_VAR_TESTS
+        ):
             raise ValueError(
-                "Data for the SPM functions must be normalized to 101 points. Check all group(s) input data shape."
+                f"spm1d has no unequal variance version of the {select_a_test}{' for vector fields' if vector_field else ''}. Tick Equal Variance to run it."
             )
 
-        raw_var_list = [
-            f"{original} {xyz}"
-            for original, xyz in zip(
-                var_list, comp_list * (len(var_list) // len(comp_list) + 1)
-            )
-        ]
-        true_var_list = [
-            "".join(
-                [
-                    (
-                        " " + char
-                        if char.isupper()
-                        and i > 0
-                        and raw_var_list[idx][i - 1].islower()
-                        else char
-                    )
-                    for i, char in enumerate(word)
-                ]
-            )
-            for idx, word in enumerate(raw_var_list)
-        ]
-
         output_dir = output_path
-        pdf_out = os.path.join(output_dir, "All_SPM_Plots.pdf")
-        with PdfPages(pdf_out) as pdf:
-            tiff_path = os.path.join(output_dir, f"{true_var_list[0]}.tiff")
-            if os.path.isfile(tiff_path):
-                response = messagebox.askyesno(
-                    "File Already Exists",
-                    f"It looks like the .TIFF files already exist. Do you want to overwrite them?",
-                )
-                if not response:
-                    return
-            for i in range(0, len(true_var_list)):
-                if selected_test == spm1d.stats.ttest_paired:
-                    t = selected_test(
-                        *([norm_cube[:, i, :].T for norm_cube in norm_cubes]),
-                    )  # no equal variance for this test
-                elif selected_test == spm1d.stats.anova1:
-                    t = spm1d.stats.anova1(
-                        tuple(norm_cube[:, i, :].T for norm_cube in norm_cubes),
-                        equal_var=equal_var,
-                    )  # test requires groups to be in a tuple
-                else:
-                    t = selected_test(
-                        *([norm_cube[:, i, :].T for norm_cube in norm_cubes]),
-                        equal_var=equal_var,
-                    )  # all other (current) tests
-                if selected_test == spm1d.stats.anova1:
-                    ti = t.inference(
-                        alpha=float(alpha)
-                    )  # no two_tailed for one way ANOVA
-                else:
-                    ti = t.inference(alpha=float(alpha), two_tailed=two_tail)
-
-                fig, axes = plt.subplots(1, 2, figsize=(10, 4))
-                plt.subplots_adjust(left=0.1, right=0.95, bottom=0.2, hspace=0.4)
-
-                ax = axes[0]
-                for group_num, norm_cube in enumerate(norm_cubes, start=1):
-                    data = norm_cube[:, i, :].T
-                    line_color = locals()[f"g{group_num}_color"]
-                    spm1d.plot.plot_mean_sd(
-                        data,
-                        linecolor=line_color,
-                        facecolor=line_color,
-                        ax=ax,
-                        label=group_names[group_num - 1],
-                    )
-                ax.axhline(y=0, color="k", linestyle=":")
-                ax.set_xlabel(plot_x_label)
-                try:
-                    ax.set_ylabel(plot_y_labels.iloc[i, 0])
-                except AttributeError:
-                    pass
-                ax.set_title(f"{true_var_list[i]}")
-
-                ax = axes[1]
-                ti.plot(ax=ax)
-                ti.plot_threshold_label(fontsize=10, ax=ax)
-                ti.plot_p_values(size=12, offset_all_clusters=(0, 0.3), ax=ax)
-                ax.set_xlabel(plot_x_label)
-
-                fig.legend(
-                    loc="lower center",
-                    bbox_to_anchor=(0.3, 0),
-                    fontsize=10,
-                    ncols=int(selected_group),
+        results_path = spm_compute(
+            select_a_test,
+            group_inputs,
+            output_dir,
+            alpha=alpha,
+            equal_var=equal_var,
+            two_tail=two_tail,
+            iterations=int(iterations) if nonparametric else None,
+            seed=int(seed),
+            workers=workers,
+            progress=progress,
+            condition_count=int(condition_count),
+            vector_field=vector_field,
+        )
+        if render_plots:
+            existing_plots = [
+                plot_path
+                for plot_path in spm_plot_paths(
+                    output_dir,
+                    load_spm_results(results_path)["var_titles"].tolist(),
+                    plot_formats,
                 )
-
-                tiff_path = os.path.join(output_dir, f"{true_var_list[i]}.tiff")
-                plt.savefig(tiff_path, dpi=int(dpi))
-                pdf.savefig()
-
-                plt.close()
-        tk.messagebox.showinfo(
+                if os.path.exists(plot_path)
+            ]
+            if existing_plots and not call_ui(
+                messagebox.askyesno,
+                "File Already Exists",
+                f"{len(existing_plots)} plot file(s) already exist, such as {os.path.basename(existing_plots[0])}. Do you want to overwrite them?\n\nThe results file has been saved either way.",
+            ):
+                return
+            spm_render(
+                results_path,
+                output_dir,
+                dpi=dpi,
+                group_colors=group_colors,
+                group_names=group_names,
+                plot_x_label=plot_x_label,
+                plot_y_labels=plot_y_labels,
+                plot_formats=plot_formats,
+                condition_names=condition_names,
+                progress=progress,
+            )
+        call_ui(
+            messagebox.showinfo,
             "Save Complete",
-            f"SPM conducted with the following parameters:\n\nGroup(s): {selected_group}\nTest: {selected_test.__name__}\nEqual Variance: {equal_var}\nAlpha: {alpha}\nTwo Tailed: {two_tail}\n\nAll plots have been saved here: {output_dir}",
+            f"SPM conducted with the following parameters:\n\nGroup(s): {group_count}\nCondition(s): {condition_count}\nTest: {selected_test.__name__}{f' (non-parametric, {iterations} permutations, seed {seed})' if nonparametric else ''}\nEqual Variance: {equal_var}\nAlpha: {alpha}\nTwo Tailed: {two_tail}\nVector Field: {vector_field}\n\n{'All plots have' if render_plots else 'The results file has'} been saved here: {output_dir}",
         )
     except ValueError as e:
-        tk.messagebox.showerror("Value Error", str(e))
+        call_ui(messagebox.showerror, "Value Error", str(e))
         return
     except TypeError as e:
-        tk.messagebox.showerror("Type Error", str(e))
+        call_ui(messagebox.showerror, "Type Error", str(e))
         return
     except FileNotFoundError as e:
-        tk.messagebox.showerror("File Not Found Error", str(e))
+        call_ui(messagebox.showerror, "File Not Found Error", str(e))
         return
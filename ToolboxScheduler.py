@@ -0,0 +1,182 @@
+import queue
+import threading
+import traceback
+
+
+_worker_state = threading.local()
+
+
+class JobCancelled(Exception):
+    """Raised inside a running job once the user has asked for it to stop."""
+
+
+def current_job():
+    """The Job running on the calling worker thread, or None outside a job (e.g. on the Tk main thread)."""
+    return getattr(_worker_state, "job", None)
+
+
+def call_ui(func, *args, **kwargs):
+    """Runs a Tk call such as a messagebox safely from anywhere.
+
+    Tkinter is not thread-safe, so inside a job the call goes through that job's call_ui to the main thread. Outside a
+    job it is made directly.
+    """
+    job = current_job()
+    if job is None:
+        return func(*args, **kwargs)
+    return job.call_ui(func, *args, **kwargs)
+
+
+class Job:
+    """A single unit of work queued on the JobScheduler.
+
+    The job function receives this object and should call job.progress() between units of work.
+    That call reports progress to the UI and raises JobCancelled if the job was cancelled.
+    """
+
+    def __init__(self, scheduler, name, func, on_done=None):
+        self.scheduler = scheduler
+        self.name = name
+        self.func = func
+        self.on_done = on_done
+        self.status = "Queued"
+        self.current = 0
+        self.total = None
+        self.message = ""
+        self._cancel_event = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    def cancel(self):
+        self._cancel_event.set()
+        if self.status == "Queued":
+            self.status = "Cancelled"
+            self.scheduler._post("update", self)
+
+    def check_cancelled(self):
+        if self.cancelled:
+            raise JobCancelled(f"{self.name} was cancelled.")
+
+    def progress(self, current, total=None, message=""):
+        self.check_cancelled()
+        self.current = current
+        self.total = total
+        self.message = message
+        self.scheduler._post("update", self)
+
+    def call_ui(self, func, *args, **kwargs):
+        """Runs func on the Tk main thread (e.g. a messagebox) and blocks the worker until it returns."""
+        done = threading.Event()
+        outcome = {}
+
+        def run():
+            try:
+                outcome["result"] = func(*args, **kwargs)
+            except Exception as e:
+                outcome["error"] = e
+            finally:
+                done.set()
+
+        self.scheduler._post("call", run)
+        done.wait()
+        if "error" in outcome:
+            raise outcome["error"]
+        return outcome.get("result")
+
+
+class JobScheduler:
+    """Runs long toolbox actions on worker threads so the Tk window stays responsive.
+
+    Jobs wait in a FIFO queue until a worker is free. Workers report back through a queue that the
+    Tk main thread drains with after(), so on_done and on_update callbacks always run on the UI thread.
+    """
+
+    def __init__(self, root, workers=1, poll_ms=100, on_update=None):
+        self.root = root
+        self.poll_ms = poll_ms
+        self.on_update = on_update
+        self.jobs = []
+        self._pending = queue.Queue()
+        self._events = queue.Queue()
+        self._lock = threading.Lock()
+        for _ in range(max(1, int(workers))):
+            worker = threading.Thread(target=self._worker_loop, daemon=True)
+            worker.start()
+        self.root.after(self.poll_ms, self._poll)
+
+    def submit(self, name, func, on_done=None):
+        """Queues func(job) to run on a worker thread. on_done(result) is called on the UI thread."""
+        job = Job(self, name, func, on_done)
+        with self._lock:
+            self.jobs.append(job)
+        self._pending.put(job)
+        self._post("update", job)
+        return job
+
+    def active_jobs(self):
+        with self._lock:
+            return [job for job in self.jobs if job.status in ("Queued", "Running")]
+
+    def running_jobs(self):
+        with self._lock:
+            return [job for job in self.jobs if job.status == "Running"]
+
+    def cancel_all(self):
+        for job in self.active_jobs():
+            job.cancel()
+
+    def _post(self, kind, payload):
+        self._events.put((kind, payload))
+
+    def _worker_loop(self):
+        while True:
+            job = self._pending.get()
+            if job.cancelled:
+                continue
+            job.status = "Running"
+            self._post("update", job)
+            _worker_state.job = job  # Lets call_ui route dialogs raised deep inside the job
+            try:
+                result = job.func(job)
+            except JobCancelled:
+                job.status = "Cancelled"
+                self._post("update", job)
+                continue
+            except Exception:
+                job.status = "Failed"
+                job.message = traceback.format_exc()
+                self._post("update", job)
+                continue
+            finally:
+                _worker_state.job = None
+            job.status = "Done"
+            self._post("done", (job, result))
+
+    def _poll(self):
+        try:
+            while True:
+                kind, payload = self._events.get_nowait()
+                if kind == "call":
+                    payload()
+                elif kind == "done":
+                    job, result = payload
+                    self._finish(job)
+                    if job.on_done is not None:
+                        job.on_done(result)
+                elif payload.status in ("Cancelled", "Failed"):
+                    self._finish(payload)
+                elif self.on_update is not None:
+                    self.on_update(payload)
+        except queue.Empty:
+            pass
+        finally:  # Keeps polling even if a callback raised
+            self.root.after(self.poll_ms, self._poll)
+
+    def _finish(self, job):
+        with self._lock:
+            if job in self.jobs:
+                self.jobs.remove(job)
+        if self.on_update is not None:
+            self.on_update(job)